@@ -9,6 +9,10 @@ from app.models.appointment import Appointment
 from app.models.appointment_document import AppointmentDocument
 from app.models.payment import Payment
 from app.models.token import RefreshToken  
+from app.models.doctor_schedule import DoctorSchedule, DoctorScheduleException
+from app.models.slot_hold import SlotHold
+from app.models.doctor_stats import DoctorStats
+from app.models.daily_appointment_stats import DailyAppointmentStats
 
 config = context.config
 fileConfig(config.config_file_name)
@@ -0,0 +1,85 @@
+"""add analytics materialized views
+
+Revision ID: 7e3a9c1f4b20
+Revises: b5f1c9e2d7a4
+Create Date: 2026-10-18 19:26:05.772314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3a9c1f4b20'
+down_revision: Union[str, Sequence[str], None] = 'b5f1c9e2d7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOCTOR_VIEWS = ("analytics_daily", "analytics_weekly", "analytics_monthly")
+
+MEASURES = """
+    sum(bookings)::integer AS bookings,
+    sum(cancelled)::integer AS cancelled,
+    sum(completed)::integer AS completed,
+    sum(paid_payments)::integer AS paid_payments,
+    sum(revenue)::numeric(12, 2) AS revenue,
+    sum(refunded)::numeric(12, 2) AS refunded
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per (appointment date, doctor); revenue is attributed to the
+    # appointment date so it lines up with bookings
+    op.execute("""
+        CREATE MATERIALIZED VIEW analytics_daily AS
+        SELECT
+            a.appointment_date AS bucket,
+            a.doctor_id,
+            d.speciality,
+            count(*)::integer AS bookings,
+            count(*) FILTER (WHERE a.status = 'CANCELLED')::integer AS cancelled,
+            count(*) FILTER (WHERE a.status = 'COMPLETED')::integer AS completed,
+            count(p.id) FILTER (WHERE p.status = 'PAID')::integer AS paid_payments,
+            coalesce(sum(p.amount) FILTER (WHERE p.status = 'PAID'), 0)::numeric(12, 2) AS revenue,
+            coalesce(sum(p.amount) FILTER (WHERE p.status = 'REFUNDED'), 0)::numeric(12, 2) AS refunded
+        FROM appointments a
+        JOIN doctors d ON d.id = a.doctor_id
+        LEFT JOIN payments p ON p.appointment_id = a.id
+        GROUP BY a.appointment_date, a.doctor_id, d.speciality
+    """)
+    # Coarser buckets are rolled up from the daily view, so they must be
+    # refreshed after it
+    for view, unit in (("analytics_weekly", "week"), ("analytics_monthly", "month")):
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW {view} AS
+            SELECT date_trunc('{unit}', bucket::timestamp)::date AS bucket, doctor_id, speciality, {MEASURES}
+            FROM analytics_daily
+            GROUP BY 1, doctor_id, speciality
+        """)
+    # Unique indexes are required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+    # and serve the bucket-range scans
+    for view in DOCTOR_VIEWS:
+        op.execute(f"CREATE UNIQUE INDEX uq_{view}_bucket_doctor ON {view} (bucket, doctor_id)")
+
+    # Per-speciality copies answer the ungrouped and speciality queries
+    # without summing every doctor's row
+    for view in DOCTOR_VIEWS:
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW {view}_by_speciality AS
+            SELECT bucket, speciality, {MEASURES}
+            FROM {view}
+            GROUP BY bucket, speciality
+        """)
+        op.execute(
+            f"CREATE UNIQUE INDEX uq_{view}_by_speciality_bucket ON {view}_by_speciality (bucket, speciality)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for view in reversed(DOCTOR_VIEWS):
+        op.execute(f"DROP MATERIALIZED VIEW {view}_by_speciality")
+    for view in reversed(DOCTOR_VIEWS):
+        op.execute(f"DROP MATERIALIZED VIEW {view}")
@@ -0,0 +1,45 @@
+"""add slot holds
+
+Revision ID: a6c2e8f41d93
+Revises: f3b9d61e8c24
+Create Date: 2026-10-18 15:11:52.270348
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e8f41d93'
+down_revision: Union[str, Sequence[str], None] = 'f3b9d61e8c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('slot_holds',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('doctor_id', sa.BigInteger(), nullable=False),
+    sa.Column('appointment_date', sa.Date(), nullable=False),
+    sa.Column('appointment_time', sa.Time(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_slot_holds_expires_at'), 'slot_holds', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_slot_holds_user_id'), 'slot_holds', ['user_id'], unique=False)
+    op.create_index('uq_slot_holds_doctor_slot', 'slot_holds', ['doctor_id', 'appointment_date', 'appointment_time'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_slot_holds_doctor_slot', table_name='slot_holds')
+    op.drop_index(op.f('ix_slot_holds_user_id'), table_name='slot_holds')
+    op.drop_index(op.f('ix_slot_holds_expires_at'), table_name='slot_holds')
+    op.drop_table('slot_holds')
@@ -0,0 +1,40 @@
+"""add daily_appointment_stats rollup table
+
+Revision ID: b5f1c9e2d7a4
+Revises: d4e0b7a2c615
+Create Date: 2026-10-18 18:12:40.418903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f1c9e2d7a4'
+down_revision: Union[str, Sequence[str], None] = 'd4e0b7a2c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are filled by `python -m app.scripts.backfill_daily_stats`, which
+    # works in date chunks instead of one long scan inside the migration
+    op.create_table('daily_appointment_stats',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('doctor_id', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('appointments', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('paid_appointments', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('date', 'doctor_id', 'status')
+    )
+    op.create_index('ix_daily_appointment_stats_doctor_date', 'daily_appointment_stats', ['doctor_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_daily_appointment_stats_doctor_date', table_name='daily_appointment_stats')
+    op.drop_table('daily_appointment_stats')
@@ -0,0 +1,39 @@
+"""hash refresh tokens and add token families
+
+Revision ID: b7c41e9d2a10
+Revises: 899d069a1408
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c41e9d2a10'
+down_revision: Union[str, Sequence[str], None] = '899d069a1408'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('family_id', sa.String(length=36), nullable=True))
+    op.create_index(op.f('ix_refresh_tokens_family_id'), 'refresh_tokens', ['family_id'], unique=False)
+    # Existing rows hold raw JWTs; store their SHA-256 digest instead and
+    # give each one its own family.
+    op.execute(
+        "UPDATE refresh_tokens "
+        "SET token = encode(sha256(convert_to(token, 'UTF8')), 'hex'), "
+        "family_id = 'legacy-' || id "
+        "WHERE token IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Hashed tokens cannot be restored; they simply stop matching.
+    op.drop_index(op.f('ix_refresh_tokens_family_id'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'family_id')
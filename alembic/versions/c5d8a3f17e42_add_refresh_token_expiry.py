@@ -0,0 +1,35 @@
+"""add expires_at to refresh_tokens
+
+Revision ID: c5d8a3f17e42
+Revises: b7c41e9d2a10
+Create Date: 2026-10-18 09:48:03.551270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8a3f17e42'
+down_revision: Union[str, Sequence[str], None] = 'b7c41e9d2a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('expires_at', sa.DateTime(), nullable=True))
+    # Tokens were issued with the default 7 day lifetime
+    op.execute(
+        "UPDATE refresh_tokens "
+        "SET expires_at = COALESCE(created_at, now()) + interval '7 days'"
+    )
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'expires_at')
@@ -0,0 +1,33 @@
+"""add doctor agenda index on appointments
+
+Revision ID: c83f5a0e9d16
+Revises: a6c2e8f41d93
+Create Date: 2026-10-18 16:24:07.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c83f5a0e9d16'
+down_revision: Union[str, Sequence[str], None] = 'a6c2e8f41d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_doctor_date', 'appointments',
+            ['doctor_id', 'appointment_date', 'appointment_time', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_appointments_doctor_date', table_name='appointments', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,53 @@
+"""add doctor_stats counter table
+
+Revision ID: d4e0b7a2c615
+Revises: c83f5a0e9d16
+Create Date: 2026-10-18 17:03:38.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e0b7a2c615'
+down_revision: Union[str, Sequence[str], None] = 'c83f5a0e9d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('doctor_stats',
+    sa.Column('doctor_id', sa.BigInteger(), nullable=False),
+    sa.Column('total_appointments', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('booked_appointments', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed_appointments', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cancelled_appointments', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('paid_appointments', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('doctor_id')
+    )
+    op.execute("""
+        INSERT INTO doctor_stats (
+            doctor_id, total_appointments, booked_appointments,
+            completed_appointments, cancelled_appointments, paid_appointments
+        )
+        SELECT
+            doctor_id,
+            count(*),
+            count(*) FILTER (WHERE status = 'BOOKED'),
+            count(*) FILTER (WHERE status = 'COMPLETED'),
+            count(*) FILTER (WHERE status = 'CANCELLED'),
+            count(*) FILTER (WHERE payment_status = 'PAID')
+        FROM appointments
+        GROUP BY doctor_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('doctor_stats')
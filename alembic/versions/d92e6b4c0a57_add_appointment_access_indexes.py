@@ -0,0 +1,61 @@
+"""add appointment, document and payment access indexes
+
+Revision ID: d92e6b4c0a57
+Revises: c5d8a3f17e42
+Create Date: 2026-10-18 11:20:16.402981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd92e6b4c0a57'
+down_revision: Union[str, Sequence[str], None] = 'c5d8a3f17e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_user_date', 'appointments',
+            ['user_id', 'appointment_date', 'appointment_time', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_appointments_doctor_status', 'appointments', ['doctor_id', 'status'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_appointments_doctor_paid', 'appointments', ['doctor_id'],
+            postgresql_where=sa.text("payment_status = 'PAID'"),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_appointments_date', 'appointments', ['appointment_date'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            op.f('ix_appointment_documents_appointment_id'), 'appointment_documents', ['appointment_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            op.f('ix_payments_status'), 'payments', ['status'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_payments_status'), table_name='payments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_appointment_documents_appointment_id'), table_name='appointment_documents', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_appointments_date', table_name='appointments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_appointments_doctor_paid', table_name='appointments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_appointments_doctor_status', table_name='appointments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_appointments_user_date', table_name='appointments', postgresql_concurrently=True, if_exists=True)
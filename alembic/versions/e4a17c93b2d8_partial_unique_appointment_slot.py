@@ -0,0 +1,45 @@
+"""replace uq_doctor_time with a partial unique index on active slots
+
+Revision ID: e4a17c93b2d8
+Revises: d92e6b4c0a57
+Create Date: 2026-10-18 13:05:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a17c93b2d8'
+down_revision: Union[str, Sequence[str], None] = 'd92e6b4c0a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the new index before dropping the constraint so the slot is never unguarded
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_appointments_doctor_slot', 'appointments',
+            ['doctor_id', 'appointment_date', 'appointment_time'],
+            unique=True,
+            postgresql_where=sa.text("status <> 'CANCELLED'"),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+    op.drop_constraint('uq_doctor_time', 'appointments', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if a cancelled slot has since been rebooked
+    op.create_unique_constraint(
+        'uq_doctor_time', 'appointments', ['doctor_id', 'appointment_date', 'appointment_time']
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'uq_appointments_doctor_slot', table_name='appointments',
+            postgresql_concurrently=True, if_exists=True
+        )
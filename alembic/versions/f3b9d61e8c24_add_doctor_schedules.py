@@ -0,0 +1,54 @@
+"""add doctor schedules and schedule exceptions
+
+Revision ID: f3b9d61e8c24
+Revises: e4a17c93b2d8
+Create Date: 2026-10-18 14:02:19.550713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d61e8c24'
+down_revision: Union[str, Sequence[str], None] = 'e4a17c93b2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('doctor_schedules',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('doctor_id', sa.BigInteger(), nullable=False),
+    sa.Column('weekday', sa.SmallInteger(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('slot_minutes', sa.SmallInteger(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_doctor_schedules_doctor_weekday', 'doctor_schedules', ['doctor_id', 'weekday'], unique=False)
+    op.create_table('doctor_schedule_exceptions',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('doctor_id', sa.BigInteger(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=True),
+    sa.Column('end_time', sa.Time(), nullable=True),
+    sa.Column('reason', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_doctor_schedule_exceptions_doctor_date', 'doctor_schedule_exceptions', ['doctor_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_doctor_schedule_exceptions_doctor_date', table_name='doctor_schedule_exceptions')
+    op.drop_table('doctor_schedule_exceptions')
+    op.drop_index('ix_doctor_schedules_doctor_weekday', table_name='doctor_schedules')
+    op.drop_table('doctor_schedules')
@@ -1,8 +1,36 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
 from app.services.doctor_service import create_doctor_by_admin, list_doctors, change_availability
 from app.services.admin_service import list_appointments, cancel_appointment, get_dashboard
+from app.services.user_service import set_user_active
 from app.schemas.doctor import DoctorResponse
+from app.schemas.user import UserResponse
+from app.schemas.appointment import AppointmentResponse
+from app.schemas.pagination import Page
+from app.schemas.payment import PaymentResponse
+from app.models.enums import AppointmentStatus, PaymentStatus
+from app.services.payment_service import update_payment_status
+from app.core.config import settings
 from app.core.dependencies import get_current_admin
+from app.db.pool import pool_stats
+from app.db.routing import replica_router
+from app.db.session import engine, replica_engine, get_db, async_session, replica_session
+from app.core.password_hasher import password_hasher
+from app.core.principal import principal_cache
+from app.core.security import token_cache
+from app.core.revocation import revocation_filter
+from app.core.rate_limit import login_throttle
+from app.services.auth_service import refresh_token_sweeper
+from app.services.schedule_service import schedule_cache
+from app.core.booking_ledger import booking_ledger
+from app.core.events import event_bus
+from app.core.response_cache import response_cache
+from app.services.hold_service import hold_timer, slot_hold_sweeper
+from app.services.stats_service import doctor_stats_reconciler
+from app.services.analytics_service import get_analytics, analytics_refresher
+from app.services.export_service import appointment_export_query, payment_export_query, stream_export
 import os
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -19,7 +47,8 @@ async def add_doctor_route(
     about: str | None = Form(None),
     consultation_fee: float = Form(...),
     image: UploadFile | None = File(None),
-    current_admin=Depends(get_current_admin)
+    current_admin=Depends(get_current_admin),
+    db=Depends(get_db)
 ):
     image_url = None
     if image:
@@ -30,6 +59,7 @@ async def add_doctor_route(
         image_url = f"/media/doctors/{email}_{image.filename}"
 
     doctor = await create_doctor_by_admin(
+        db,
         name=name,
         email=email,
         password=password,
@@ -53,10 +83,16 @@ async def add_doctor_route(
         image_url=doctor.image_url
     )
 
-@router.get("/doctors", response_model=list[DoctorResponse])
-async def get_all_doctors(current_admin=Depends(get_current_admin)):
-    doctors = await list_doctors()
-    return [
+@router.get("/doctors", response_model=Page[DoctorResponse])
+async def get_all_doctors(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    current_admin=Depends(get_current_admin),
+    db=Depends(get_db)
+):
+    page = await list_doctors(db, skip=skip, limit=limit, cursor=cursor)
+    page["items"] = [
         DoctorResponse(
             id=d.id,
             user_id=d.user_id,
@@ -68,12 +104,13 @@ async def get_all_doctors(current_admin=Depends(get_current_admin)):
             is_available=d.is_available,
             image_url=d.image_url
         )
-        for d in doctors
+        for d in page["items"]
     ]
+    return page
 
 @router.patch("/doctors/{id}/availability", response_model=DoctorResponse)
-async def change_doctor_availability(id: int, is_available: bool, current_admin=Depends(get_current_admin)):
-    doctor = await change_availability(id, is_available)
+async def change_doctor_availability(id: int, is_available: bool, current_admin=Depends(get_current_admin), db=Depends(get_db)):
+    doctor = await change_availability(db, id, is_available)
     return DoctorResponse(
         id=doctor.id,
         user_id=doctor.user_id,
@@ -86,14 +123,110 @@ async def change_doctor_availability(id: int, is_available: bool, current_admin=
         image_url=doctor.image_url
     )
 
+@router.patch("/users/{id}/active", response_model=UserResponse)
+async def change_user_active(id: int, is_active: bool, current_admin=Depends(get_current_admin), db=Depends(get_db)):
+    return await set_user_active(db, id, is_active)
+
 @router.get("/appointments")
-async def get_all_appointments(current_admin=Depends(get_current_admin)):
-    return await list_appointments()
+async def get_all_appointments(skip: int = 0, limit: int = 100, cursor: str | None = None, current_admin=Depends(get_current_admin), db=Depends(get_db)):
+    return await list_appointments(db, skip=skip, limit=limit, cursor=cursor)
+
+@router.post("/appointments/{id}/cancel", response_model=AppointmentResponse)
+async def admin_cancel_appointment(id: int, current_admin=Depends(get_current_admin), db=Depends(get_db)):
+    return await cancel_appointment(db, id)
 
-@router.post("/appointments/{id}/cancel")
-async def admin_cancel_appointment(id: int, current_admin=Depends(get_current_admin)):
-    return await cancel_appointment(id)
+@router.patch("/payments/{id}/status", response_model=PaymentResponse)
+async def admin_update_payment_status(id: int, status: PaymentStatus, current_admin=Depends(get_current_admin), db=Depends(get_db)):
+    return await update_payment_status(db, current_admin, id, status.value)
 
 @router.get("/dashboard")
-async def admin_dashboard(skip: int = 0, limit: int = 100, current_admin=Depends(get_current_admin)):
-    return await get_dashboard(skip=skip, limit=limit)
+async def admin_dashboard(
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    current_admin=Depends(get_current_admin),
+    db=Depends(get_db)  # cached, so computed on the primary
+):
+    # The doctor list lives at GET /admin/doctors (paginated)
+    return await get_dashboard(db, current_admin, from_date=from_date, to_date=to_date)
+
+
+@router.get("/analytics/{metric}")
+async def analytics(
+    metric: Literal["bookings", "revenue"],
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    bucket: Literal["day", "week", "month"] = "day",
+    group_by: Literal["none", "speciality", "doctor"] = "none",
+    current_admin=Depends(get_current_admin),
+    db=Depends(get_db)  # cached, so computed on the primary
+):
+    return await get_analytics(db, metric, from_date, to_date, bucket, group_by)
+
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+async def _export_response(name: str, stmt, format: str, admin, auth_db):
+    await auth_db.commit()  # don't pin the guard's connection for the whole stream
+    use_replica = await replica_router.use_replica(admin.id)
+    return StreamingResponse(
+        stream_export(replica_session if use_replica else async_session, stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'}
+    )
+
+
+@router.get("/export/appointments")
+async def export_appointments(
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    status: list[AppointmentStatus] | None = Query(None),
+    format: Literal["csv", "ndjson"] = "csv",
+    current_admin=Depends(get_current_admin),
+    auth_db=Depends(get_db)
+):
+    stmt = appointment_export_query(from_date, to_date, status)
+    return await _export_response("appointments", stmt, format, current_admin, auth_db)
+
+
+@router.get("/export/payments")
+async def export_payments(
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    status: list[PaymentStatus] | None = Query(None),
+    format: Literal["csv", "ndjson"] = "csv",
+    current_admin=Depends(get_current_admin),
+    auth_db=Depends(get_db)
+):
+    stmt = payment_export_query(from_date, to_date, status)
+    return await _export_response("payments", stmt, format, current_admin, auth_db)
+
+
+@router.get("/metrics")
+async def admin_metrics(current_admin=Depends(get_current_admin)):
+    return {
+        "password_hasher": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "revocation_filter": revocation_filter.stats(),
+        "refresh_token_sweeper": refresh_token_sweeper.stats(),
+        "login_throttle": login_throttle.stats(),
+        "schedule_cache": schedule_cache.stats(),
+        "booking_ledger": booking_ledger.stats(),
+        "slot_hold_timer": hold_timer.stats(),
+        "slot_hold_sweeper": slot_hold_sweeper.stats(),
+        "doctor_stats_reconciler": doctor_stats_reconciler.stats(),
+        "response_cache": response_cache.stats(),
+        "event_bus": event_bus.stats(),
+        "analytics_refresher": analytics_refresher.stats()
+    }
+
+
+@router.get("/db/pool")
+async def db_pool_stats(current_admin=Depends(get_current_admin)):
+    return {
+        "profile": settings.DB_PROFILE,
+        "primary": pool_stats(engine),
+        "replica": pool_stats(replica_engine) if replica_engine else None,
+        "routing": replica_router.stats()
+    }
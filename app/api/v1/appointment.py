@@ -1,34 +1,41 @@
 from fastapi import APIRouter, Depends, UploadFile, HTTPException
 from typing import List
+from datetime import date, time
+from app.schemas.pagination import Page
 from app.schemas.appointment import AppointmentResponse
 from app.schemas.document import AppointmentDocumentResponse, AppointmentDocumentCreate
 from app.services.appointment_service import get_appointment_documents, create_appointment, list_user_appointments, cancel_appointment
 from app.services.document_service import upload_appointment_document
-from app.core.dependencies import get_current_active_user  # JWT user dependency
+from app.core.dependencies import get_current_active_user, get_read_db  # JWT user dependency
 from app.models.user import User
+from app.db.session import get_db
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
 
 # List user's appointments
-@router.get("/", response_model=List[AppointmentResponse])
+@router.get("/", response_model=Page[AppointmentResponse])
 async def my_appointments(
     skip: int = 0,
     limit: int = 10,
-    current_user: User = Depends(get_current_active_user)
+    cursor: str | None = None,
+    current_user: User = Depends(get_current_active_user),
+    db=Depends(get_read_db)
 ):
-    return await list_user_appointments(current_user, skip, limit)
+    return await list_user_appointments(db, current_user, skip, limit, cursor)
 
 
 # Create an appointment
 @router.post("/", response_model=AppointmentResponse)
 async def book_appointment(
     doctor_id: int,
-    appointment_date: str,
-    appointment_time: str,
-    current_user: User = Depends(get_current_active_user)
+    appointment_date: date,
+    appointment_time: time,
+    current_user: User = Depends(get_current_active_user),
+    db=Depends(get_db)
 ):
     return await create_appointment(
+        db,
         current_user,
         doctor_id,
         appointment_date,
@@ -38,8 +45,8 @@ async def book_appointment(
 
 # Cancel appointment
 @router.post("/{appointment_id}/cancel", response_model=AppointmentResponse)
-async def cancel(appointment_id: int, current_user: User = Depends(get_current_active_user)):
-    return await cancel_appointment(current_user, appointment_id)
+async def cancel(appointment_id: int, current_user: User = Depends(get_current_active_user), db=Depends(get_db)):
+    return await cancel_appointment(db, current_user, appointment_id)
 
 
 # Upload document for an appointment
@@ -48,12 +55,14 @@ async def upload_docs(
     appointment_id: int,
     file: UploadFile,
     file_type: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db=Depends(get_db)
 ):
     if not file:
         raise HTTPException(status_code=400, detail="No file uploaded")
 
     return await upload_appointment_document(
+        db,
         user=current_user,
         appointment_id=appointment_id,
         file=file,
@@ -65,6 +74,7 @@ async def upload_docs(
 @router.get("/{appointment_id}/documents", response_model=List[AppointmentDocumentResponse])
 async def list_documents(
     appointment_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db=Depends(get_db)
 ):
-    return await get_appointment_documents(current_user, appointment_id)
+    return await get_appointment_documents(db, current_user, appointment_id)
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Form
-from app.services.auth_service import register_user, login_user, logout_user
+from fastapi import APIRouter, Depends, Form, Request
+from app.db.session import get_db
+from app.services.auth_service import register_user, login_user, logout_user, refresh_tokens
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -11,9 +12,11 @@ async def register(
     phone: str | None = Form(None),
     dob: str | None = Form(None),
     gender: str | None = Form(None),
-    image_url: str | None = Form(None)
+    image_url: str | None = Form(None),
+    db=Depends(get_db)
 ):
     user = await register_user(
+        db,
         name=name,
         email=email,
         password=password,
@@ -25,8 +28,9 @@ async def register(
     return {"message": "Registered", "user_id": user.id}
 
 @router.post("/login")
-async def login(email: str = Form(...), password: str = Form(...)):
-    access, refresh, user = await login_user(email, password)
+async def login(request: Request, email: str = Form(...), password: str = Form(...), db=Depends(get_db)):
+    client_ip = request.client.host if request.client else None
+    access, refresh, user = await login_user(db, email, password, client_ip)
     return {
         "access_token": access,
         "refresh_token": refresh,
@@ -34,7 +38,17 @@ async def login(email: str = Form(...), password: str = Form(...)):
         "user_id": user.id
     }
 
+@router.post("/refresh")
+async def refresh(refresh_token: str = Form(...), db=Depends(get_db)):
+    access, new_refresh, user = await refresh_tokens(db, refresh_token)
+    return {
+        "access_token": access,
+        "refresh_token": new_refresh,
+        "role": user.role,
+        "user_id": user.id
+    }
+
 @router.post("/logout")
-async def logout(refresh_token: str = Form(...)):
-    await logout_user(refresh_token)
+async def logout(refresh_token: str = Form(...), db=Depends(get_db)):
+    await logout_user(db, refresh_token)
     return {"message": "Logged out"}
@@ -1,17 +1,39 @@
-from fastapi import APIRouter, Depends, UploadFile
-
-from app.core.dependencies import get_current_doctor
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter, Depends, UploadFile, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.dependencies import get_current_doctor, get_read_db
+from app.db.routing import replica_router
+from app.db.session import get_db, async_session, replica_session
+from app.models.enums import AppointmentStatus
 from app.services.doctor_service import (
     get_doctor_profile,
     update_doctor_profile,
     list_doctor_appointments,
+    stream_doctor_appointments,
     complete_appointment,
     get_doctor_dashboard,
     list_public_doctors
 )
 from app.services.document_service import upload_appointment_document
+from app.services.schedule_service import (
+    get_schedule,
+    replace_schedule,
+    add_schedule_exception,
+    delete_schedule_exception,
+    get_free_slots
+)
 from app.schemas.doctor import DoctorUpdate, DoctorResponse
 from app.schemas.appointment import AppointmentResponse
+from app.schemas.pagination import Page
+from app.schemas.schedule import (
+    ScheduleUpdate,
+    ScheduleResponse,
+    ScheduleExceptionCreate,
+    ScheduleExceptionResponse,
+    DoctorSlotsResponse
+)
 from app.schemas.document import (
     AppointmentDocumentUploadRequest,
     AppointmentDocumentResponse
@@ -21,26 +43,61 @@ router = APIRouter(prefix="/doctor", tags=["Doctor"])
 
 
 @router.get("/list")
-async def get_public_doctors():
-    return await list_public_doctors()
+async def get_public_doctors(limit: int = 100, cursor: str | None = None, db=Depends(get_read_db)):
+    return await list_public_doctors(db, limit=limit, cursor=cursor)
+
+
+@router.get("/{doctor_id}/slots", response_model=DoctorSlotsResponse)
+async def free_slots(
+    doctor_id: int,
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    db=Depends(get_read_db)
+):
+    return await get_free_slots(db, doctor_id, from_date, to_date)
 
 
 @router.get("/profile", response_model=DoctorResponse)
-async def profile(current_doctor=Depends(get_current_doctor)):
-    return await get_doctor_profile(current_doctor.id)
+async def profile(current_doctor=Depends(get_current_doctor), db=Depends(get_db)):
+    return await get_doctor_profile(db, current_doctor.id)
 
 
 @router.patch("/profile", response_model=DoctorResponse)
 async def update_profile(
     data: DoctorUpdate,
-    current_doctor=Depends(get_current_doctor)
+    current_doctor=Depends(get_current_doctor),
+    db=Depends(get_db)
 ):
-    return await update_doctor_profile(current_doctor.id, data)
-
-
-@router.get("/appointments", response_model=list[AppointmentResponse])
-async def my_appointments(current_doctor=Depends(get_current_doctor)):
-    return await list_doctor_appointments(current_doctor)
+    return await update_doctor_profile(db, current_doctor.id, data)
+
+
+@router.get("/appointments", response_model=Page[AppointmentResponse])
+async def my_appointments(
+    limit: int = 50,
+    cursor: str | None = None,
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    status: list[AppointmentStatus] | None = Query(None),
+    format: Literal["json", "ndjson"] = "json",
+    current_doctor=Depends(get_current_doctor),
+    auth_db=Depends(get_db),
+    db=Depends(get_read_db)
+):
+    if format == "ndjson":
+        await auth_db.commit()  # don't pin the guard's connection for the whole stream
+        use_replica = await replica_router.use_replica(current_doctor.id)
+        return StreamingResponse(
+            stream_doctor_appointments(
+                replica_session if use_replica else async_session,
+                current_doctor.doctor_id, from_date, to_date, status
+            ),
+            media_type="application/x-ndjson"
+        )
+    return await list_doctor_appointments(
+        db, current_doctor,
+        limit=limit, cursor=cursor,
+        from_date=from_date, to_date=to_date, statuses=status
+    )
 
 
 @router.patch(
@@ -49,9 +106,10 @@ async def my_appointments(current_doctor=Depends(get_current_doctor)):
 )
 async def complete(
     appointment_id: int,
-    current_doctor=Depends(get_current_doctor)
+    current_doctor=Depends(get_current_doctor),
+    db=Depends(get_db)
 ):
-    return await complete_appointment(current_doctor, appointment_id)
+    return await complete_appointment(db, current_doctor, appointment_id)
 
 
 @router.post(
@@ -62,9 +120,11 @@ async def upload_docs(
     appointment_id: int,
     file: UploadFile,
     data: AppointmentDocumentUploadRequest,
-    current_doctor=Depends(get_current_doctor)
+    current_doctor=Depends(get_current_doctor),
+    db=Depends(get_db)
 ):
     return await upload_appointment_document(
+        db,
         user=current_doctor,
         appointment_id=appointment_id,
         file=file,
@@ -73,5 +133,39 @@ async def upload_docs(
 
 
 @router.get("/dashboard")
-async def dashboard(current_doctor=Depends(get_current_doctor)):
-    return await get_doctor_dashboard(current_doctor)
+async def dashboard(current_doctor=Depends(get_current_doctor), db=Depends(get_db)):
+    # Cached, so computed on the primary
+    return await get_doctor_dashboard(db, current_doctor)
+
+
+# ---------- SCHEDULE ----------
+@router.get("/schedule", response_model=ScheduleResponse)
+async def my_schedule(current_doctor=Depends(get_current_doctor), db=Depends(get_db)):
+    return await get_schedule(db, current_doctor.doctor_id)
+
+
+@router.put("/schedule", response_model=ScheduleResponse)
+async def update_schedule(
+    data: ScheduleUpdate,
+    current_doctor=Depends(get_current_doctor),
+    db=Depends(get_db)
+):
+    return await replace_schedule(db, current_doctor.doctor_id, data.windows)
+
+
+@router.post("/schedule/exceptions", response_model=ScheduleExceptionResponse)
+async def add_exception(
+    data: ScheduleExceptionCreate,
+    current_doctor=Depends(get_current_doctor),
+    db=Depends(get_db)
+):
+    return await add_schedule_exception(db, current_doctor.doctor_id, data)
+
+
+@router.delete("/schedule/exceptions/{exception_id}")
+async def remove_exception(
+    exception_id: int,
+    current_doctor=Depends(get_current_doctor),
+    db=Depends(get_db)
+):
+    return await delete_schedule_exception(db, current_doctor.doctor_id, exception_id)
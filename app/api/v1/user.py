@@ -1,14 +1,30 @@
 from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
 from app.models.user import GenderEnum
 from app.services.user_service import get_user_profile, update_user_profile
-from app.services.appointment_service import create_appointment, list_user_appointments, cancel_appointment
+from app.services.appointment_service import (
+    create_appointment,
+    create_appointments_batch,
+    expand_recurrence,
+    list_user_appointments,
+    cancel_appointment
+)
 from app.services.document_service import upload_appointment_document
+from app.services.hold_service import create_hold, confirm_hold, release_hold
 from app.services.payment_service import create_payment
 from app.schemas.user import UserUpdate, UserResponse
-from app.schemas.appointment import AppointmentCreate, AppointmentResponse
+from app.schemas.pagination import Page
+from app.schemas.appointment import (
+    AppointmentCreate,
+    AppointmentResponse,
+    BatchAppointmentCreate,
+    BatchAppointmentResponse,
+    SlotHoldCreate,
+    SlotHoldResponse
+)
 from app.schemas.document import AppointmentDocumentResponse
 from app.schemas.payment import PaymentCreate, PaymentResponse
-from app.core.dependencies import role_guard
+from app.core.dependencies import role_guard, get_read_db
+from app.db.session import get_db
 import os
 
 router = APIRouter(prefix="/user", tags=["User"])
@@ -16,8 +32,8 @@ router = APIRouter(prefix="/user", tags=["User"])
 
 # ----------------------- USER PROFILE -----------------------
 @router.get("/profile", response_model=UserResponse)
-async def profile(current_user=Depends(role_guard("USER"))):
-    user = await get_user_profile(current_user.id)
+async def profile(current_user=Depends(role_guard("USER")), db=Depends(get_db)):
+    user = await get_user_profile(db, current_user.id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -30,7 +46,8 @@ async def update_profile(
     dob: str | None = Form(None),
     gender: str | None = Form(None),
     image: UploadFile | None = File(None),
-    current_user=Depends(role_guard("USER"))
+    current_user=Depends(role_guard("USER")),
+    db=Depends(get_db)
 ):
     image_url = None
     if image:
@@ -61,7 +78,7 @@ async def update_profile(
         image_url=image_url
     )
 
-    updated_user = await update_user_profile(current_user.id, data)
+    updated_user = await update_user_profile(db, current_user.id, data)
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
     return updated_user
@@ -71,9 +88,11 @@ async def update_profile(
 @router.post("/appointments", response_model=AppointmentResponse)
 async def book_appointment(
     data: AppointmentCreate,
-    current_user=Depends(role_guard("USER"))
+    current_user=Depends(role_guard("USER")),
+    db=Depends(get_db)
 ):
     return await create_appointment(
+        db,
         current_user,
         data.doctor_id,
         data.appointment_date,
@@ -81,18 +100,66 @@ async def book_appointment(
     )
 
 
-@router.get("/appointments", response_model=list[AppointmentResponse])
+@router.post("/appointments/batch", response_model=BatchAppointmentResponse)
+async def book_appointments_batch(
+    data: BatchAppointmentCreate,
+    current_user=Depends(role_guard("USER")),
+    db=Depends(get_db)
+):
+    if (data.slots is None) == (data.recurrence is None):
+        raise HTTPException(status_code=400, detail="Give either slots or a recurrence rule")
+    if data.recurrence:
+        slots = expand_recurrence(data.recurrence)
+    else:
+        slots = [(s.appointment_date, s.appointment_time) for s in data.slots]
+    return await create_appointments_batch(
+        db,
+        current_user,
+        data.doctor_id,
+        slots,
+        all_or_nothing=data.all_or_nothing
+    )
+
+
+@router.post("/holds", response_model=SlotHoldResponse)
+async def hold_slot(
+    data: SlotHoldCreate,
+    current_user=Depends(role_guard("USER")),
+    db=Depends(get_db)
+):
+    return await create_hold(
+        db,
+        current_user,
+        data.doctor_id,
+        data.appointment_date,
+        data.appointment_time
+    )
+
+
+@router.post("/holds/{hold_id}/confirm", response_model=AppointmentResponse)
+async def confirm_slot_hold(hold_id: int, current_user=Depends(role_guard("USER")), db=Depends(get_db)):
+    return await confirm_hold(db, current_user, hold_id)
+
+
+@router.delete("/holds/{hold_id}")
+async def release_slot_hold(hold_id: int, current_user=Depends(role_guard("USER")), db=Depends(get_db)):
+    return await release_hold(db, current_user, hold_id)
+
+
+@router.get("/appointments", response_model=Page[AppointmentResponse])
 async def my_appointments(
     skip: int = 0,
     limit: int = 10,
-    current_user=Depends(role_guard("USER"))
+    cursor: str | None = None,
+    current_user=Depends(role_guard("USER")),
+    db=Depends(get_read_db)
 ):
-    return await list_user_appointments(current_user, skip, limit)
+    return await list_user_appointments(db, current_user, skip, limit, cursor)
 
 
 @router.post("/appointments/{id}/cancel", response_model=AppointmentResponse)
-async def cancel(id: int, current_user=Depends(role_guard("USER"))):
-    return await cancel_appointment(current_user, id)
+async def cancel(id: int, current_user=Depends(role_guard("USER")), db=Depends(get_db)):
+    return await cancel_appointment(db, current_user, id)
 
 
 # ----------------------- DOCUMENT UPLOAD -----------------------
@@ -101,7 +168,8 @@ async def upload_docs(
     id: int,
     file: UploadFile = File(...),
     file_type: str = Form(...),
-    current_user=Depends(role_guard("USER"))
+    current_user=Depends(role_guard("USER")),
+    db=Depends(get_db)
 ):
     """
     Upload a document for a user appointment.
@@ -109,6 +177,7 @@ async def upload_docs(
     - file_type: IMAGE, PDF etc.
     """
     doc = await upload_appointment_document(
+        db,
         user=current_user,
         appointment_id=id,
         file=file,
@@ -121,9 +190,11 @@ async def upload_docs(
 @router.post("/payments", response_model=PaymentResponse)
 async def make_payment(
     data: PaymentCreate,
-    current_user=Depends(role_guard("USER"))
+    current_user=Depends(role_guard("USER")),
+    db=Depends(get_db)
 ):
     return await create_payment(
+        db,
         current_user,
         data.appointment_id,
         data.amount,
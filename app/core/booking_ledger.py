@@ -0,0 +1,131 @@
+import time as clock
+from datetime import date, time
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+class _Day:
+    __slots__ = ("bits", "changed_at")
+
+    def __init__(self, bits: int = 0, changed_at: float = 0.0):
+        self.bits = bits
+        self.changed_at = changed_at
+
+
+class BookingLedger:
+    """
+    Per-worker bitsets of taken start minutes, keyed by (doctor_id, date).
+    The ledger only ever rejects: a set bit means the slot was taken when we
+    last looked, so the booking fails fast with a 409. A clear bit or a
+    missing day falls through to the INSERT, and Postgres decides.
+
+    Only `load_day` (a read from the primary) starts an entry's TTL again;
+    this worker's own bookings and cancellations update it in place, so a
+    slot cancelled by another worker is refused for at most `ttl`, which is
+    kept short. A snapshot read before this worker's latest change to a day
+    is ignored, so a load never re-sets a bit freed after its query started.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, enabled: bool = True):
+        self.enabled = enabled
+        self._days = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stats = {
+            "checks": 0,
+            "rejected": 0,
+            "passed": 0,
+            "misses": 0,
+            "stale_passes": 0,
+            "loads": 0,
+            "stale_loads": 0,
+        }
+
+    @staticmethod
+    def _bit(t: time) -> int | None:
+        # Only whole-minute times map onto the bitset without aliasing
+        if t.second or t.microsecond:
+            return None
+        return 1 << (t.hour * 60 + t.minute)
+
+    def knows(self, doctor_id: int, day: date) -> bool:
+        """Whether `day` has a live entry; a miss should be loaded before trusting `is_taken`."""
+        return self.enabled and self._days.get((doctor_id, day)) is not None
+
+    def is_taken(self, doctor_id: int, day: date, t: time) -> bool:
+        if not self.enabled:
+            return False
+        self._stats["checks"] += 1
+        entry = self._days.get((doctor_id, day))
+        bit = self._bit(t)
+        if entry is None or bit is None:
+            self._stats["misses"] += 1
+            return False
+        if entry.bits & bit:
+            self._stats["rejected"] += 1
+            return True
+        self._stats["passed"] += 1
+        return False
+
+    def load_day(self, doctor_id: int, day: date, times, as_of: float):
+        """Replace a day with a primary snapshot taken at `as_of` (time.monotonic())."""
+        if not self.enabled:
+            return
+        entry = self._days.get((doctor_id, day))
+        if entry is not None and entry.changed_at >= as_of:
+            self._stats["stale_loads"] += 1
+            return
+        bits = 0
+        for t in times:
+            bit = self._bit(t)
+            if bit is not None:
+                bits |= bit
+        self._days.set((doctor_id, day), _Day(bits, as_of))
+        self._stats["loads"] += 1
+
+    def mark_booked(self, doctor_id: int, day: date, t: time):
+        bit = self._bit(t)
+        if not self.enabled or bit is None:
+            return
+        entry = self._days.get((doctor_id, day))
+        if entry is None:
+            self._days.set((doctor_id, day), _Day(bit, clock.monotonic()))
+        else:
+            entry.bits |= bit
+            entry.changed_at = clock.monotonic()
+
+    def mark_free(self, doctor_id: int, day: date, t: time):
+        bit = self._bit(t)
+        if not self.enabled or bit is None:
+            return
+        entry = self._days.get((doctor_id, day))
+        if entry is None:
+            # Keep an empty day so an in-flight snapshot cannot re-set the bit
+            self._days.set((doctor_id, day), _Day(0, clock.monotonic()))
+        else:
+            entry.bits &= ~bit
+            entry.changed_at = clock.monotonic()
+
+    def record_conflict(self, doctor_id: int, day: date, t: time):
+        """Postgres reported a conflict the ledger did not know about."""
+        self._stats["stale_passes"] += 1
+        self.mark_booked(doctor_id, day, t)
+
+    def stats(self) -> dict:
+        cache = self._days.stats()
+        checks = self._stats["checks"]
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "days": cache["size"],
+            "maxsize": cache["maxsize"],
+            "evictions": cache["evictions"],
+            "ttl_seconds": self._days.ttl,
+            "reject_ratio": self._stats["rejected"] / checks if checks else 0.0,
+        }
+
+
+booking_ledger = BookingLedger(
+    maxsize=settings.BOOKING_LEDGER_MAX_SIZE,
+    ttl=settings.BOOKING_LEDGER_TTL_SECONDS,
+    enabled=settings.BOOKING_LEDGER_ENABLED,
+)
@@ -1,5 +1,39 @@
 from pydantic_settings import BaseSettings
 
+# Named database engine profiles; individual DB_* settings override them
+DB_PROFILES = {
+    "dev": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_pre_ping": False,
+        "pool_recycle": -1,
+        "statement_cache_size": 100,
+        "statement_timeout_ms": 0,
+    },
+    "prod": {
+        "echo": False,
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "statement_cache_size": 500,
+        "statement_timeout_ms": 5000,
+    },
+    "bench": {
+        "echo": False,
+        "pool_size": 50,
+        "max_overflow": 0,
+        "pool_timeout": 30,
+        "pool_pre_ping": False,
+        "pool_recycle": -1,
+        "statement_cache_size": 1000,
+        "statement_timeout_ms": 0,
+    },
+}
+
 class Settings(BaseSettings):
     
     POSTGRES_USER: str
@@ -11,12 +45,118 @@ class Settings(BaseSettings):
     
     DATABASE_URL: str
 
+    DB_PROFILE: str = "dev"
+    DB_ECHO: bool | None = None
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_TIMEOUT: float | None = None
+    DB_POOL_PRE_PING: bool | None = None
+    DB_POOL_RECYCLE: int | None = None
+    DB_STATEMENT_CACHE_SIZE: int | None = None
+    DB_STATEMENT_TIMEOUT_MS: int | None = None
+
+    # Optional read replica for read-only service calls
+    REPLICA_DATABASE_URL: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    # After a write, the client's reads stay on the primary this long; tracked
+    # by a cookie/X-Last-Write marker (any worker) and per worker by principal
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+
     
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Password hashing (bcrypt runs in a process pool)
+    PASSWORD_HASH_WORKERS: int | None = None  # defaults to CPU count
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    BCRYPT_ROUNDS: int | None = None  # fixed cost; ignored when calibrating
+    BCRYPT_CALIBRATE: bool = False
+    BCRYPT_TARGET_MS: float = 50.0
+    BCRYPT_MIN_ROUNDS: int = 10
+
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+
+    # Verified-token memo cache for decode_token
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 50_000
+
+    # Refresh-token revocation filter
+    REVOCATION_FILTER_CAPACITY: int = 100_000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+
+    # Background sweep of expired/revoked refresh tokens
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: float = 3600
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = 1000
+    REFRESH_TOKEN_SWEEP_PAUSE_SECONDS: float = 0.1
+
+    # Login attempt throttling (checked before any DB or bcrypt work)
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5
+    LOGIN_RATE_LIMIT_PER_IP: int = 50
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 300
+
+    # Doctor weekly schedules and free-slot search
+    SCHEDULE_CACHE_TTL_SECONDS: float = 300
+    SCHEDULE_CACHE_MAX_SIZE: int = 10_000
+    SLOT_SEARCH_MAX_DAYS: int = 62
+
+    # Per-worker booked-slot ledger used to reject taken slots before the INSERT;
+    # the TTL bounds how long another worker's cancellation can be refused
+    BOOKING_LEDGER_ENABLED: bool = True
+    BOOKING_LEDGER_MAX_SIZE: int = 50_000
+    BOOKING_LEDGER_TTL_SECONDS: float = 5
+
+    # Short-lived slot holds (reserve, then confirm into an appointment)
+    SLOT_HOLD_SECONDS: int = 180
+    SLOT_HOLD_MAX_PER_USER: int = 3
+    SLOT_HOLD_SWEEP_INTERVAL_SECONDS: float = 300
+
+    # Batch / recurring booking
+    BATCH_BOOKING_MAX_SLOTS: int = 24
+
+    # Rows fetched per server-side cursor round trip when streaming agendas
+    AGENDA_STREAM_BATCH_SIZE: int = 500
+
+    # Repair job comparing doctor_stats counters with the appointments table
+    DOCTOR_STATS_RECONCILE_INTERVAL_SECONDS: float = 900
+
+    # /admin/analytics: result TTL and the materialized view refresh
+    ANALYTICS_CACHE_TTL_SECONDS: float = 60
+    ANALYTICS_DEFAULT_DAYS: int = 30
+    ANALYTICS_MAX_DAYS: int = 1100
+    ANALYTICS_MAX_POINTS: int = 5000
+
+    # Rows fetched per server-side cursor round trip for /admin/export
+    EXPORT_STREAM_BATCH_SIZE: int = 2000
+
+    # Per-worker cache for dashboard/statistics responses, invalidated by domain events
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 30
+    RESPONSE_CACHE_MAX_SIZE: int = 10_000
+    ANALYTICS_REFRESH_INTERVAL_SECONDS: float = 300
+
+    def db_engine_options(self) -> dict:
+        if self.DB_PROFILE not in DB_PROFILES:
+            raise ValueError(f"Unknown DB_PROFILE {self.DB_PROFILE!r}, expected one of {sorted(DB_PROFILES)}")
+        options = dict(DB_PROFILES[self.DB_PROFILE])
+        overrides = {
+            "echo": self.DB_ECHO,
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "statement_cache_size": self.DB_STATEMENT_CACHE_SIZE,
+            "statement_timeout_ms": self.DB_STATEMENT_TIMEOUT_MS,
+        }
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return options
+
     class Config:
         env_file = ".env"
         extra = "ignore"  
@@ -1,51 +1,73 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer
 from app.core.security import decode_token
-from app.services.user_service import get_user_by_id
+from app.core.principal import get_principal
+from app.db.routing import replica_router
+from app.db.session import get_db, replica_session
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+async def get_read_db(credentials=Depends(optional_security), db=Depends(get_db)):
+    """
+    Session for read-only service calls: the replica when safe, otherwise the
+    request's own primary session so a request never holds two connections.
+    """
+    principal_id = None
+    if credentials:
+        try:
+            principal_id = int(decode_token(credentials.credentials)["sub"])
+        except (HTTPException, KeyError, ValueError):
+            pass  # the auth guard reports bad tokens
+
+    if not await replica_router.use_replica(principal_id):
+        yield db
+        return
+    await db.commit()  # release any connection the auth guard checked out
+    async with replica_session() as session:
+        yield session
+
+
+def _check_principal(user, missing_detail: str):
+    if not user:
+        raise HTTPException(404, missing_detail)
+    if not user.is_active:
+        raise HTTPException(403, "Account is disabled")
+    return user
 
 
 def role_guard(required_role: str):
-    async def _guard(credentials=Depends(security)):
+    async def _guard(credentials=Depends(security), db=Depends(get_db)):
         payload = decode_token(credentials.credentials)
         if payload.get("type") != "access":
             raise HTTPException(401, "Invalid token type")
         if payload.get("role") != required_role:
             raise HTTPException(403, "Permission denied")
-        user = await get_user_by_id(int(payload["sub"]))
-        if not user:
-            raise HTTPException(404, "User not found")
-        return user
+        user = await get_principal(db, int(payload["sub"]))
+        return _check_principal(user, "User not found")
     return _guard
 
 
-async def get_current_active_user(credentials=Depends(security)):
+async def get_current_active_user(credentials=Depends(security), db=Depends(get_db)):
     payload = decode_token(credentials.credentials)
     if payload.get("role") != "USER":
         raise HTTPException(401, "Invalid role")
-    user = await get_user_by_id(int(payload.get("sub")))
-    if not user:
-        raise HTTPException(404, "User not found")
-    return user
+    user = await get_principal(db, int(payload.get("sub")))
+    return _check_principal(user, "User not found")
 
 
-async def get_current_doctor(credentials=Depends(security)):
+async def get_current_doctor(credentials=Depends(security), db=Depends(get_db)):
     payload = decode_token(credentials.credentials)
     if payload.get("role") != "DOCTOR":
         raise HTTPException(401, "Invalid role")
-    user = await get_user_by_id(int(payload.get("sub")))
-    if not user:
-        raise HTTPException(404, "Doctor profile not found")
-    return user
+    user = await get_principal(db, int(payload.get("sub")))
+    return _check_principal(user, "Doctor profile not found")
 
 
-async def get_current_admin(credentials=Depends(security)):
+async def get_current_admin(credentials=Depends(security), db=Depends(get_db)):
     payload = decode_token(credentials.credentials)
     if payload.get("role") != "ADMIN":
         raise HTTPException(401, "Invalid role")
-    user = await get_user_by_id(int(payload.get("sub")))
-    if not user:
-        raise HTTPException(404, "Admin not found")
-    return user
-
+    user = await get_principal(db, int(payload.get("sub")))
+    return _check_principal(user, "Admin not found")
@@ -0,0 +1,46 @@
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Domain events; payloads carry at least `doctor_id`
+APPOINTMENT_BOOKED = "appointment.booked"
+APPOINTMENT_CANCELLED = "appointment.cancelled"
+APPOINTMENT_COMPLETED = "appointment.completed"
+PAYMENT_UPDATED = "payment.updated"
+
+APPOINTMENT_EVENTS = (APPOINTMENT_BOOKED, APPOINTMENT_CANCELLED, APPOINTMENT_COMPLETED, PAYMENT_UPDATED)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe. Publishers emit after their commit, and
+    handlers run inline, so they must be cheap (cache invalidation, not
+    I/O). A failing handler is logged and skipped. Events stay inside the
+    worker that published them.
+    """
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self._stats = {"published": 0, "handler_failures": 0}
+
+    def subscribe(self, event: str, handler):
+        self._handlers[event].append(handler)
+
+    def publish(self, event: str, **payload):
+        self._stats["published"] += 1
+        for handler in self._handlers.get(event, ()):
+            try:
+                handler(**payload)
+            except Exception:
+                self._stats["handler_failures"] += 1
+                logger.exception("Handler %r for %s failed", handler, event)
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "subscriptions": {event: len(handlers) for event, handlers in self._handlers.items()},
+        }
+
+
+event_bus = EventBus()
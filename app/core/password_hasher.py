@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+MAX_BCRYPT_ROUNDS = 16
+
+
+# ---------- WORKER FUNCTIONS (run inside the pool processes) ----------
+@lru_cache(maxsize=None)
+def _context_for(rounds: int | None) -> CryptContext:
+    if rounds is None:
+        return pwd_context
+    # needs_update() only reports cheaper hashes: workers calibrate separately,
+    # and a slower node must not downgrade hashes written by a faster one
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+def _hash(password: str, rounds: int | None = None) -> str:
+    return _context_for(rounds).hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+def _calibrate(target_ms: float, min_rounds: int) -> int:
+    """Highest bcrypt cost whose single hash stays within `target_ms`."""
+    _context_for(min_rounds).hash("warm-up")  # load the bcrypt backend first
+    rounds = min_rounds
+    for candidate in range(min_rounds, MAX_BCRYPT_ROUNDS + 1):
+        started = time.perf_counter()
+        _context_for(candidate).hash("calibration-password")
+        elapsed = (time.perf_counter() - started) * 1000
+        if elapsed > target_ms:
+            break
+        rounds = candidate
+        # Each extra round doubles the cost, so stop before overshooting badly
+        if elapsed * 2 > target_ms:
+            break
+    return rounds
+
+
+# ---------- ASYNC HASHER ----------
+class PasswordHasher:
+    """
+    Runs bcrypt in a process pool so hashing never blocks the event loop.
+    At most `workers + max_queue` jobs may be pending; beyond that callers
+    get a 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int | None = None, max_queue: int = 64, rounds: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._stats = {
+            "hash_calls": 0,
+            "verify_calls": 0,
+            "rejected": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "max_pending": 0,
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.workers + self.max_queue:
+            self._stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self._pending -= 1
+            elapsed = (time.perf_counter() - started) * 1000
+            self._stats["total_ms"] += elapsed
+            self._stats["max_ms"] = max(self._stats["max_ms"], elapsed)
+
+    async def hash(self, password: str) -> str:
+        self._stats["hash_calls"] += 1
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        self._stats["verify_calls"] += 1
+        return await self._submit(_verify, password, hashed)
+
+    async def calibrate(self, target_ms: float, min_rounds: int) -> int:
+        loop = asyncio.get_running_loop()
+        rounds = await loop.run_in_executor(self._get_pool(), _calibrate, target_ms, min_rounds)
+        self.rounds = rounds
+        logger.info("bcrypt calibrated to %d rounds for a %.0f ms budget", rounds, target_ms)
+        return rounds
+
+    def needs_update(self, hashed: str) -> bool:
+        return _context_for(self.rounds).needs_update(hashed)
+
+    def stats(self) -> dict:
+        calls = self._stats["hash_calls"] + self._stats["verify_calls"]
+        completed = calls - self._stats["rejected"]
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "avg_ms": self._stats["total_ms"] / completed if completed else 0.0,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    rounds=settings.BCRYPT_ROUNDS,
+)
@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.doctor import Doctor
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Slim, immutable snapshot of the authenticated user."""
+    id: int
+    role: str
+    is_active: bool
+    doctor_id: Optional[int] = None
+
+
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+async def _load_principal(session: AsyncSession, user_id: int) -> Optional[Principal]:
+    result = await session.execute(
+        select(User.id, User.role, User.is_active, Doctor.id.label("doctor_id"))
+        .outerjoin(Doctor, Doctor.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    row = result.first()
+    if not row:
+        return None
+    return Principal(
+        id=row.id,
+        role=getattr(row.role, "value", row.role),
+        is_active=bool(row.is_active),
+        doctor_id=row.doctor_id,
+    )
+
+
+async def get_principal(session: AsyncSession, user_id: int) -> Optional[Principal]:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = await _load_principal(session, user_id)
+        if principal is not None:
+            principal_cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_principal(user_id: int):
+    principal_cache.invalidate(user_id)
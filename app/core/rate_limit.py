@@ -0,0 +1,99 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for sliding-window attempt counters. Subclass this to share
+    limits between workers (e.g. Redis); `hit` returns 0 when the attempt is
+    allowed, otherwise the number of seconds until it would be.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process sliding-window log, bounded to `max_keys` most recent keys.
+    `hit` never awaits, so it runs to completion on the event loop and needs
+    no lock.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._windows: OrderedDict[str, deque] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        now = self.clock()
+        attempts = self._windows.get(key)
+        if attempts is None:
+            attempts = self._windows[key] = deque()
+        self._windows.move_to_end(key)
+
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+        if len(attempts) >= limit:
+            return attempts[0] + window - now
+
+        attempts.append(now)
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+        return 0.0
+
+
+class LoginThrottle:
+    """Limits login attempts per email and per client IP before any real work."""
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.allowed = 0
+        self.rejected_email = 0
+        self.rejected_ip = 0
+
+    async def check(self, email: str, client_ip: str | None):
+        if not settings.LOGIN_RATE_LIMIT_ENABLED:
+            return
+
+        window = settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+        retry_after = 0.0
+        if client_ip:
+            retry_after = await self.backend.hit(f"login:ip:{client_ip}", settings.LOGIN_RATE_LIMIT_PER_IP, window)
+            if retry_after:
+                self.rejected_ip += 1
+        if not retry_after:
+            retry_after = await self.backend.hit(
+                f"login:email:{email.strip().lower()}", settings.LOGIN_RATE_LIMIT_PER_EMAIL, window
+            )
+            if retry_after:
+                self.rejected_email += 1
+
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+            )
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "allowed": self.allowed,
+            "rejected_email": self.rejected_email,
+            "rejected_ip": self.rejected_ip,
+        }
+
+
+login_throttle = LoginThrottle(InMemoryRateLimitBackend())
+
+
+def set_rate_limit_backend(backend: RateLimitBackend):
+    login_throttle.backend = backend
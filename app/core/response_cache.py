@@ -0,0 +1,110 @@
+import asyncio
+from collections import defaultdict
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+_MISSING = object()
+
+
+class ResponseCache:
+    """
+    Per-worker cache for computed responses (dashboards, statistics).
+
+    Entries carry tags, and `invalidate(tag)` drops them ahead of their TTL.
+    Each tag also has a generation, so a computation that overlaps an
+    invalidation is returned to its callers but not stored; otherwise a
+    result read just before a commit could outlive the event for that commit.
+    This only holds if `compute` reads the primary: a lagging replica can
+    return pre-commit data after the invalidation, under the new generation.
+
+    Concurrent misses for one key share a single computation: the first
+    caller computes, the rest await its result.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, enabled: bool = True):
+        self.enabled = enabled
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._keys_by_tag = defaultdict(set)
+        self._generations = defaultdict(int)
+        self._inflight: dict = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "stale_skips": 0,
+        }
+
+    async def get_or_compute(self, key, tags, compute, ttl: float | None = None):
+        if not self.enabled:
+            return await compute()
+
+        value = self._entries.get(key, _MISSING)
+        if value is not _MISSING:
+            self._stats["hits"] += 1
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The computing request went away; take over
+                return await self.get_or_compute(key, tags, compute, ttl)
+
+        self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generations = [self._generations[tag] for tag in tags]
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        if generations == [self._generations[tag] for tag in tags]:
+            self._entries.set(key, value, ttl=ttl)
+            for tag in tags:
+                self._keys_by_tag[tag].add(key)
+        else:
+            self._stats["stale_skips"] += 1
+        return value
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self._generations[tag] += 1
+            for key in self._keys_by_tag.pop(tag, ()):
+                self._entries.invalidate(key)
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> dict:
+        cache = self._entries.stats()
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "size": cache["size"],
+            "maxsize": cache["maxsize"],
+            "evictions": cache["evictions"],
+            "inflight": len(self._inflight),
+            "tags": len(self._keys_by_tag),
+            "hit_ratio": (self._stats["hits"] + self._stats["coalesced"]) / lookups if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
@@ -0,0 +1,59 @@
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.session import async_session
+from app.models.token import RefreshToken
+from app.utils.bloom import BloomFilter
+
+
+class RevocationFilter:
+    """
+    In-memory Bloom filter of revoked refresh-token hashes. A negative answer
+    means the token is definitely not revoked, so the database is only
+    consulted for the (rare) positives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self.checks = 0
+        self.positives = 0
+
+    def add(self, token_hash: str):
+        self._filter.add(token_hash)
+
+    def might_be_revoked(self, token_hash: str) -> bool:
+        self.checks += 1
+        if self._filter.might_contain(token_hash):
+            self.positives += 1
+            return True
+        return False
+
+    async def rebuild(self):
+        async with async_session() as session:
+            result = await session.execute(
+                select(RefreshToken.token).where(RefreshToken.is_revoked == True)
+            )
+            hashes = result.scalars().all()
+
+        bloom = BloomFilter(
+            max(settings.REVOCATION_FILTER_CAPACITY, len(hashes) * 2),
+            self.error_rate,
+        )
+        for token_hash in hashes:
+            bloom.add(token_hash)
+        self._filter = bloom
+
+    def stats(self) -> dict:
+        return {
+            "entries": self._filter.count,
+            "capacity": self._filter.capacity,
+            "checks": self.checks,
+            "positives": self.positives,
+        }
+
+
+revocation_filter = RevocationFilter(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+)
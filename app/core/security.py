@@ -1,17 +1,25 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.utils.cache import TTLCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Decoded claims keyed by a digest of the raw token, kept until `exp`
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE)
 
 # ---------- PASSWORD FUNCTIONS ----------
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)  # same as before
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
 
-def verify_password(password: str, hashed: str) -> bool:
-    return pwd_context.verify(password, hashed)  # same as before
+async def verify_password(password: str, hashed: str) -> bool:
+    return await password_hasher.verify(password, hashed)
+
+def password_needs_rehash(hashed: str) -> bool:
+    return password_hasher.needs_update(hashed)
 
 # ---------- TOKEN FUNCTIONS ----------
 def _create_token(data: dict, expires_delta: timedelta):
@@ -29,13 +37,17 @@ def create_access_token(user_id: int, role: str):
         timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)  # CORRECTION: use settings
     )
 
-def create_refresh_token(user_id: int):
+def create_refresh_token(user_id: int, family_id: str):
     return _create_token(
-        {"sub": str(user_id), "type": "refresh"},
+        {"sub": str(user_id), "type": "refresh", "fam": family_id, "jti": uuid.uuid4().hex},
         timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)  # CORRECTION: use settings
     )
 
-def decode_token(token: str):
+def token_digest(token: str) -> str:
+    """Stable key for a raw token; refresh tokens are stored as this digest."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _decode_token(token: str):
     try:
         return jwt.decode(
             token,
@@ -48,4 +60,20 @@ def decode_token(token: str):
             detail="Invalid or expired token"
         )
 
+def decode_token(token: str):
+    if not settings.TOKEN_CACHE_ENABLED:
+        return _decode_token(token)
+
+    key = token_digest(token)
+    claims = token_cache.get(key)
+    if claims is None:
+        claims = _decode_token(token)
+        # Only cache until the token expires, so expiry is still enforced by jose
+        remaining = claims.get("exp", 0) - time.time()
+        if remaining > 0:
+            token_cache.set(key, claims, ttl=remaining)
+    return dict(claims)
 
+def forget_token(token: str):
+    """Drop a token from the memo cache, e.g. after it has been revoked."""
+    token_cache.invalidate(token_digest(token))
@@ -0,0 +1,162 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs `func` every `interval` seconds for the lifetime of the app. With a
+    `leader` (see app.db.locks.AdvisoryLeader) only the elected worker runs
+    it; the others count the run as skipped.
+    """
+
+    def __init__(self, name: str, func, interval: float, leader=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.leader = leader
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_run: float | None = None
+        self.last_result = None
+
+    async def run_once(self):
+        try:
+            if self.leader is not None and not await self.leader.is_leader():
+                self.skipped += 1
+                return None
+        except Exception:
+            self.failures += 1
+            logger.exception("Periodic task %s could not check leadership", self.name)
+            return None
+        try:
+            self.last_result = await self.func()
+        except Exception:
+            self.failures += 1
+            logger.exception("Periodic task %s failed", self.name)
+        finally:
+            self.runs += 1
+            self.last_run = time.time()
+        return self.last_result
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.leader is not None:
+            await self.leader.release()
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "leader": None if self.leader is None else self.leader.held,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_result": self.last_result,
+        }
+
+
+class DeadlineTimer:
+    """
+    Fires `on_expire(keys)` when deadlines pass, using one min-heap and one
+    task instead of a sleeping task per entry. Rescheduled or cancelled
+    entries stay in the heap and are skipped when popped.
+    """
+
+    def __init__(self, name: str, on_expire, clock=datetime.utcnow):
+        self.name = name
+        self.on_expire = on_expire
+        self.clock = clock
+        self._heap: list = []
+        self._deadlines: dict = {}
+        self._seq = 0
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.fired = 0
+        self.failures = 0
+
+    def schedule(self, key, deadline: datetime):
+        self._deadlines[key] = deadline
+        self._seq += 1
+        heapq.heappush(self._heap, (deadline, self._seq, key))
+        if self._heap[0][2] == key:
+            self._wake.set()
+
+    def cancel(self, key):
+        self._deadlines.pop(key, None)
+
+    def _pop_due(self, now: datetime) -> list:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+        # Drop stale entries so the heap does not outgrow the live set
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [entry for entry in self._heap if self._deadlines.get(entry[2]) == entry[0]]
+            heapq.heapify(self._heap)
+        return due
+
+    async def _loop(self):
+        while True:
+            due = self._pop_due(self.clock())
+            if due:
+                try:
+                    await self.on_expire(due)
+                    self.fired += len(due)
+                except Exception:
+                    self.failures += 1
+                    logger.exception("Deadline timer %s failed", self.name)
+
+            self._wake.clear()
+            timeout = None
+            if self._heap:
+                timeout = max((self._heap[0][0] - self.clock()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._deadlines),
+            "heap_size": len(self._heap),
+            "fired": self.fired,
+            "failures": self.failures,
+            "next_deadline": self._heap[0][0].isoformat() if self._heap else None,
+        }
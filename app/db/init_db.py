@@ -15,7 +15,7 @@ async def create_admin():
         admin = User(
             name="Admin",
             email="admin@gmail.com",
-            password=get_password_hash("admin123"),
+            password=await get_password_hash("admin123"),
             role="ADMIN"
         )
         session.add(admin)
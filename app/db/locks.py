@@ -0,0 +1,67 @@
+import logging
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+class AdvisoryLeader:
+    """
+    Elects one worker (across processes and hosts) to run a periodic job.
+    The first worker to take the session-level advisory lock keeps it, and
+    the connection holding it, until shutdown; the others skip their runs
+    and retry the lock each time, so a dead leader is replaced within one
+    interval.
+    """
+
+    def __init__(self, name: str, engine=engine):
+        self.name = name
+        self.engine = engine
+        self._conn = None
+
+    async def is_leader(self) -> bool:
+        if self._conn is not None:
+            try:
+                await self._conn.execute(text("SELECT 1"))
+                await self._conn.commit()
+                return True
+            except Exception:
+                # The lock went with the connection; let someone else have it
+                logger.warning("Lost advisory lock %s", self.name, exc_info=True)
+                await self._close()
+
+        conn = await self.engine.connect()
+        try:
+            acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": self.name})
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        logger.info("Took advisory lock %s", self.name)
+        self._conn = conn
+        return True
+
+    async def release(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": self.name})
+            await self._conn.commit()
+        finally:
+            await self._close()
+
+    async def _close(self):
+        conn, self._conn = self._conn, None
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    @property
+    def held(self) -> bool:
+        return self._conn is not None
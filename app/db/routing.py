@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import replica_engine
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+# Per-request write marker: when the client last wrote (sent back by the
+# client) and whether this request wrote; see ReadYourWritesMiddleware
+request_writes: ContextVar[dict | None] = ContextVar("request_writes", default=None)
+
+
+class ReplicaRouter:
+    """
+    Decides whether a read-only call may go to the replica. Reads fall back
+    to the primary when no replica is configured, when its lag exceeds
+    REPLICA_MAX_LAG_SECONDS, or when the principal wrote recently.
+
+    "Recently" is known two ways: the client echoes the write marker set on
+    its last write response, which works whichever worker serves it, and
+    this worker remembers principals it wrote for, which also covers writes
+    made on someone's behalf (a doctor cancelling a patient's booking).
+    """
+
+    def __init__(self, engine, max_lag: float, check_interval: float, read_your_writes: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.read_your_writes = read_your_writes
+        self._recent_writers = TTLCache(maxsize=100_000, ttl=read_your_writes)
+        self._lag: float | None = None
+        self._lag_checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def record_write(self, principal_id: int):
+        self._recent_writers.set(principal_id, True)
+        writes = request_writes.get()
+        if writes is not None:
+            writes["wrote_at"] = time.time()
+
+    def _client_wrote_recently(self) -> bool:
+        writes = request_writes.get()
+        last_write = writes and (writes["wrote_at"] or writes["last_write"])
+        return bool(last_write) and time.time() - last_write < self.read_your_writes
+
+    async def _current_lag(self) -> float:
+        if time.monotonic() - self._lag_checked_at < self.check_interval:
+            return self._lag
+        async with self._lock:
+            if time.monotonic() - self._lag_checked_at >= self.check_interval:
+                try:
+                    async with self.engine.connect() as conn:
+                        self._lag = float(await conn.scalar(REPLICA_LAG_SQL))
+                except Exception:
+                    logger.warning("Replica lag check failed; reading from primary", exc_info=True)
+                    self._lag = float("inf")
+                self._lag_checked_at = time.monotonic()
+        return self._lag
+
+    async def use_replica(self, principal_id: int | None = None) -> bool:
+        use = (
+            self.engine is not None
+            and (principal_id is None or self._recent_writers.get(principal_id) is None)
+            and not self._client_wrote_recently()
+            and await self._current_lag() <= self.max_lag
+        )
+        if use:
+            self.replica_reads += 1
+        else:
+            self.primary_reads += 1
+        return use
+
+    def stats(self) -> dict:
+        return {
+            "configured": self.engine is not None,
+            "lag_seconds": self._lag,
+            "max_lag_seconds": self.max_lag,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+        }
+
+
+replica_router = ReplicaRouter(
+    replica_engine,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    read_your_writes=settings.READ_YOUR_WRITES_SECONDS,
+)
@@ -1,13 +1,29 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool
+
+
+def build_engine(url: str, options: dict):
+    connect_args = {"statement_cache_size": options["statement_cache_size"]}
+    if options["statement_timeout_ms"]:
+        connect_args["server_settings"] = {"statement_timeout": str(options["statement_timeout_ms"])}
+
+    return create_async_engine(
+        str(url),  # must be string
+        echo=options["echo"],
+        poolclass=InstrumentedQueuePool,
+        pool_size=options["pool_size"],
+        max_overflow=options["max_overflow"],
+        pool_timeout=options["pool_timeout"],
+        pool_pre_ping=options["pool_pre_ping"],
+        pool_recycle=options["pool_recycle"],
+        connect_args=connect_args,
+    )
+
 
 # Async Engine
-engine = create_async_engine(
-    str(settings.DATABASE_URL),  # must be string
-    echo=True,
-    future=True
-)
+engine = build_engine(settings.DATABASE_URL, settings.db_engine_options())
 
 # Async Session
 async_session = sessionmaker(
@@ -15,3 +31,26 @@ async_session = sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
+
+# Optional read replica; falls back to the primary when not configured
+replica_engine = (
+    build_engine(settings.REPLICA_DATABASE_URL, settings.db_engine_options())
+    if settings.REPLICA_DATABASE_URL else None
+)
+
+replica_session = sessionmaker(
+    bind=replica_engine or engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+# Request-scoped unit of work
+async def get_db():
+    async with async_session() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
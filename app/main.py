@@ -1,10 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from app.api.v1 import auth, user, doctor, admin
+from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.revocation import revocation_filter
 from app.middleware.cors_middleware import setup_cors
+from app.middleware.read_your_writes import setup_read_your_writes
+from app.services.auth_service import refresh_token_sweeper
+from app.services.hold_service import hold_timer, slot_hold_sweeper, load_pending_holds, sweep_expired_holds
+from app.services.stats_service import doctor_stats_reconciler
+from app.services.analytics_service import analytics_refresher
 
-app = FastAPI(title="Doctor Appointment System")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.BCRYPT_CALIBRATE:
+        await password_hasher.calibrate(settings.BCRYPT_TARGET_MS, settings.BCRYPT_MIN_ROUNDS)
+    await revocation_filter.rebuild()
+    refresh_token_sweeper.start()
+    await sweep_expired_holds()
+    await load_pending_holds()
+    hold_timer.start()
+    slot_hold_sweeper.start()
+    doctor_stats_reconciler.start()
+    analytics_refresher.start()
+    yield
+    await analytics_refresher.stop()
+    await doctor_stats_reconciler.stop()
+    await slot_hold_sweeper.stop()
+    await hold_timer.stop()
+    await refresh_token_sweeper.stop()
+    password_hasher.shutdown()
+
+
+app = FastAPI(title="Doctor Appointment System", lifespan=lifespan)
 setup_cors(app)
+setup_read_your_writes(app)
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(user.router, prefix="/api")
@@ -0,0 +1,63 @@
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.db.routing import request_writes
+
+WRITE_MARKER_COOKIE = "last_write"
+WRITE_MARKER_HEADER = "X-Last-Write"
+
+
+def _parse_marker(value: str | None) -> float | None:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Carries the read-your-writes marker across workers. A response to a
+    request that wrote gets the write time as a cookie and a header; the
+    client sends either back, and until READ_YOUR_WRITES_SECONDS have passed
+    its reads skip the replica.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        writes = {
+            "last_write": _parse_marker(
+                request.headers.get(WRITE_MARKER_HEADER) or request.cookies.get(WRITE_MARKER_COOKIE)
+            ),
+            "wrote_at": None,
+        }
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and writes["wrote_at"]:
+                marker = f"{writes['wrote_at']:.3f}"
+                max_age = int(settings.READ_YOUR_WRITES_SECONDS) + 1
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (WRITE_MARKER_HEADER.lower().encode(), marker.encode()),
+                    (
+                        b"set-cookie",
+                        f"{WRITE_MARKER_COOKIE}={marker}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax".encode(),
+                    ),
+                ]
+            await send(message)
+
+        token = request_writes.set(writes)
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            request_writes.reset(token)
+
+
+def setup_read_your_writes(app):
+    app.add_middleware(ReadYourWritesMiddleware)
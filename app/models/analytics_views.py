@@ -0,0 +1,33 @@
+from sqlalchemy import table, column, BigInteger, Date, Integer, Numeric, String
+
+# Materialized views behind /admin/analytics, per bucket size and per level
+# (doctor or speciality); see migration 7e3a9c1f4b20. Declared with table()
+# so they stay out of Base.metadata and autogenerate.
+
+
+def _analytics_view(name: str, by_doctor: bool):
+    keys = [column("bucket", Date), column("speciality", String)]
+    if by_doctor:
+        keys.append(column("doctor_id", BigInteger))
+    return table(
+        name,
+        *keys,
+        column("bookings", Integer),
+        column("cancelled", Integer),
+        column("completed", Integer),
+        column("paid_payments", Integer),
+        column("revenue", Numeric(12, 2)),
+        column("refunded", Numeric(12, 2)),
+    )
+
+
+# (bucket, level) -> view, in refresh order: weekly and monthly views read
+# the daily one, and the speciality views read the doctor views
+ANALYTICS_VIEWS = {
+    ("day", "doctor"): _analytics_view("analytics_daily", by_doctor=True),
+    ("week", "doctor"): _analytics_view("analytics_weekly", by_doctor=True),
+    ("month", "doctor"): _analytics_view("analytics_monthly", by_doctor=True),
+    ("day", "speciality"): _analytics_view("analytics_daily_by_speciality", by_doctor=False),
+    ("week", "speciality"): _analytics_view("analytics_weekly_by_speciality", by_doctor=False),
+    ("month", "speciality"): _analytics_view("analytics_monthly_by_speciality", by_doctor=False),
+}
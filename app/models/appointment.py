@@ -1,7 +1,11 @@
-from sqlalchemy import Column, BigInteger, Date, Time, String, ForeignKey, TIMESTAMP, UniqueConstraint
+from sqlalchemy import Column, BigInteger, Date, Time, String, ForeignKey, TIMESTAMP, Index, text
 from sqlalchemy.sql import func
 from app.db.base import Base
 
+# Cancelled rows keep their history but no longer hold the slot
+ACTIVE_SLOT = text("status <> 'CANCELLED'")
+
+
 class Appointment(Base):
     __tablename__ = "appointments"
 
@@ -16,5 +20,13 @@ class Appointment(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     __table_args__ = (
-        UniqueConstraint("doctor_id", "appointment_date", "appointment_time", name="uq_doctor_time"),
+        Index(
+            "uq_appointments_doctor_slot", "doctor_id", "appointment_date", "appointment_time",
+            unique=True, postgresql_where=ACTIVE_SLOT
+        ),
+        Index("ix_appointments_user_date", "user_id", "appointment_date", "appointment_time", "id"),
+        Index("ix_appointments_doctor_date", "doctor_id", "appointment_date", "appointment_time", "id"),
+        Index("ix_appointments_doctor_status", "doctor_id", "status"),
+        Index("ix_appointments_doctor_paid", "doctor_id", postgresql_where=text("payment_status = 'PAID'")),
+        Index("ix_appointments_date", "appointment_date"),
     )
@@ -6,7 +6,7 @@ class AppointmentDocument(Base):
     __tablename__ = "appointment_documents"
 
     id = Column(BigInteger, primary_key=True)
-    appointment_id = Column(BigInteger, ForeignKey("appointments.id", ondelete="CASCADE"), nullable=False)
+    appointment_id = Column(BigInteger, ForeignKey("appointments.id", ondelete="CASCADE"), nullable=False, index=True)
     uploaded_by = Column(String(20), nullable=False)
     file_url = Column(String, nullable=False)
     file_type = Column(String(20), nullable=False)
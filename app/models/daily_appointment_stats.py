@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, Integer, Date, String, ForeignKey, Index
+from app.db.base import Base
+
+# Appointments per (date, doctor, status), maintained alongside doctor_stats
+class DailyAppointmentStats(Base):
+    __tablename__ = "daily_appointment_stats"
+
+    date = Column(Date, primary_key=True)
+    doctor_id = Column(BigInteger, ForeignKey("doctors.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    appointments = Column(Integer, nullable=False, default=0, server_default="0")
+    paid_appointments = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_daily_appointment_stats_doctor_date", "doctor_id", "date"),
+    )
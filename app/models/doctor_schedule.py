@@ -0,0 +1,36 @@
+from sqlalchemy import Column, BigInteger, SmallInteger, String, Date, Time, ForeignKey, TIMESTAMP, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+# One working window of a doctor's weekly template (weekday 0 = Monday)
+class DoctorSchedule(Base):
+    __tablename__ = "doctor_schedules"
+
+    id = Column(BigInteger, primary_key=True)
+    doctor_id = Column(BigInteger, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False)
+    weekday = Column(SmallInteger, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    slot_minutes = Column(SmallInteger, nullable=False, default=30)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_doctor_schedules_doctor_weekday", "doctor_id", "weekday"),
+    )
+
+
+# Leave or a blocked period on one date; no times means the whole day is off
+class DoctorScheduleException(Base):
+    __tablename__ = "doctor_schedule_exceptions"
+
+    id = Column(BigInteger, primary_key=True)
+    doctor_id = Column(BigInteger, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    start_time = Column(Time)
+    end_time = Column(Time)
+    reason = Column(String(255))
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_doctor_schedule_exceptions_doctor_date", "doctor_id", "date"),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, Integer, ForeignKey, TIMESTAMP
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+# Per-doctor appointment counters, bumped in the same transaction as each change
+class DoctorStats(Base):
+    __tablename__ = "doctor_stats"
+
+    doctor_id = Column(BigInteger, ForeignKey("doctors.id", ondelete="CASCADE"), primary_key=True)
+    total_appointments = Column(Integer, nullable=False, default=0, server_default="0")
+    booked_appointments = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_appointments = Column(Integer, nullable=False, default=0, server_default="0")
+    cancelled_appointments = Column(Integer, nullable=False, default=0, server_default="0")
+    paid_appointments = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
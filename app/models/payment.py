@@ -9,5 +9,5 @@ class Payment(Base):
     appointment_id = Column(BigInteger, ForeignKey("appointments.id", ondelete="CASCADE"), unique=True, nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
     method = Column(String(20))
-    status = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
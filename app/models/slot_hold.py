@@ -0,0 +1,19 @@
+from sqlalchemy import Column, BigInteger, Date, Time, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.db.base import Base
+
+# A short-lived reservation of one doctor slot, confirmed into an Appointment
+class SlotHold(Base):
+    __tablename__ = "slot_holds"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    doctor_id = Column(BigInteger, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False)
+    appointment_date = Column(Date, nullable=False)
+    appointment_time = Column(Time, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_slot_holds_doctor_slot", "doctor_id", "appointment_date", "appointment_time", unique=True),
+    )
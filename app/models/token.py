@@ -7,6 +7,8 @@ class RefreshToken(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, index=True)
-    token = Column(String, unique=True, index=True)
+    token = Column(String, unique=True, index=True)  # SHA-256 hex digest of the JWT
+    family_id = Column(String(36), index=True)
     is_revoked = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from datetime import date, time
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import date, time, datetime
 from app.models.enums import AppointmentStatus, PaymentStatus
 
 class AppointmentCreate(BaseModel):
@@ -19,3 +20,48 @@ class AppointmentResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class SlotHoldCreate(BaseModel):
+    doctor_id: int
+    appointment_date: date
+    appointment_time: time
+
+
+class SlotHoldResponse(BaseModel):
+    id: int
+    doctor_id: int
+    appointment_date: date
+    appointment_time: time
+    expires_at: datetime
+
+
+class SlotRef(BaseModel):
+    appointment_date: date
+    appointment_time: time
+
+
+class RecurrenceRule(BaseModel):
+    start_date: date
+    appointment_time: time
+    every_days: int = Field(default=7, ge=1, le=28)
+    count: int = Field(ge=1)
+
+
+class BatchAppointmentCreate(BaseModel):
+    doctor_id: int
+    slots: Optional[List[SlotRef]] = None
+    recurrence: Optional[RecurrenceRule] = None
+    all_or_nothing: bool = False
+
+
+class BatchSlotResult(BaseModel):
+    appointment_date: date
+    appointment_time: time
+    status: Literal["booked", "conflict", "held", "duplicate", "skipped"]
+    appointment_id: Optional[int] = None
+
+
+class BatchAppointmentResponse(BaseModel):
+    booked: List[AppointmentResponse]
+    results: List[BatchSlotResult]
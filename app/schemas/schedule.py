@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from datetime import date, time
+from typing import List, Optional
+
+class ScheduleWindow(BaseModel):
+    weekday: int = Field(ge=0, le=6)  # 0 = Monday
+    start_time: time
+    end_time: time
+    slot_minutes: int = Field(default=30, ge=5, le=240)
+
+    class Config:
+        from_attributes = True
+
+
+class ScheduleUpdate(BaseModel):
+    windows: List[ScheduleWindow]
+
+
+class ScheduleExceptionCreate(BaseModel):
+    date: date
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    reason: Optional[str] = None
+
+
+class ScheduleExceptionResponse(ScheduleExceptionCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class ScheduleResponse(BaseModel):
+    windows: List[ScheduleWindow]
+    exceptions: List[ScheduleExceptionResponse]
+
+
+class SlotDay(BaseModel):
+    date: date
+    slots: List[time]
+
+
+class DoctorSlotsResponse(BaseModel):
+    doctor_id: int
+    days: List[SlotDay]
@@ -0,0 +1,59 @@
+"""
+Backfill (or repair) the daily_appointment_stats rollup from appointments.
+
+    python -m app.scripts.backfill_daily_stats
+    python -m app.scripts.backfill_daily_stats --from 2025-01-01 --to 2025-12-31 --chunk-days 31
+
+Works through the date range in chunks, one transaction each, so no single
+statement scans the whole appointments table or holds locks for long.
+Safe to re-run: each chunk is recounted and only rows that drifted change.
+A booking committed while its chunk is being recounted can be overwritten
+by the older count; running the script again puts it right.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select, func
+
+from app.db.session import async_session, engine
+from app.models.appointment import Appointment
+from app.models.doctor import Doctor  # noqa: F401  (registers the User.doctor mapper)
+from app.models.user import User  # noqa: F401  (registers the Doctor.user mapper)
+from app.services.stats_service import rebuild_daily_stats
+
+
+async def main(start: date | None, end: date | None, chunk_days: int):
+    async with async_session() as session:
+        first, last = (await session.execute(
+            select(func.min(Appointment.appointment_date), func.max(Appointment.appointment_date))
+        )).one()
+    if first is None and (start is None or end is None):
+        print("no appointments, nothing to backfill")
+        return
+    start, end = start or first, end or last
+
+    changed = 0
+    started = time.perf_counter()
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+        async with async_session() as session:
+            rows = await rebuild_daily_stats(session, chunk_start, chunk_end)
+            await session.commit()
+        changed += rows
+        print(f"{chunk_start} .. {chunk_end}: {rows} rows changed")
+        chunk_start = chunk_end + timedelta(days=1)
+
+    print(f"done: {changed} rows changed in {time.perf_counter() - started:.1f}s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, default=None)
+    parser.add_argument("--chunk-days", type=int, default=31)
+    args = parser.parse_args()
+    asyncio.run(main(args.start, args.end, args.chunk_days))
@@ -0,0 +1,139 @@
+"""
+Benchmark the /admin/analytics queries over two years of data.
+
+    python -m app.scripts.bench_analytics --iterations 20
+
+Seeds (or reuses) 100 doctors across 10 specialities with 14 appointments
+a day each for the last 730 days (~1M appointments, payments for the
+completed and cancelled ones), rebuilds the daily rollup and the analytics
+views, then times every bucket/grouping combination uncached and cached.
+Only run this against a scratch database: seeded rows are kept.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.db.session import async_session, engine
+from app.core.response_cache import response_cache
+from app.services.analytics_service import ANALYTICS_TAG, get_analytics, refresh_analytics_views
+from app.services.stats_service import rebuild_daily_stats
+
+DOCTORS = 100
+DAYS = 730
+SLOTS_PER_DAY = 14
+
+SEED_SQL = [
+    """
+    INSERT INTO users (name, email, password, role, is_active)
+    SELECT 'Analytics Doctor ' || g, 'bench-analytics-' || g || '@example.com', 'x', 'DOCTOR', true
+    FROM generate_series(1, :doctors) g
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO doctors (user_id, speciality, consultation_fee, is_available)
+    SELECT u.id, 'Speciality ' || (u.id % 10), 300 + (u.id % 7) * 50, true FROM users u
+    WHERE u.email LIKE 'bench-analytics-%' AND NOT EXISTS (SELECT 1 FROM doctors d WHERE d.user_id = u.id)
+    """,
+    """
+    INSERT INTO appointments (user_id, doctor_id, appointment_date, appointment_time, status, payment_status)
+    SELECT
+        :user_id, d.id, CURRENT_DATE - g, time '08:00' + s * interval '30 minutes',
+        CASE WHEN (d.id + g + s) % 9 = 0 THEN 'CANCELLED' ELSE 'COMPLETED' END,
+        CASE WHEN (d.id + g + s) % 9 = 0 THEN 'REFUNDED' ELSE 'PAID' END
+    FROM doctors d
+    JOIN users u ON u.id = d.user_id AND u.email LIKE 'bench-analytics-%'
+    CROSS JOIN generate_series(1, :days) g
+    CROSS JOIN generate_series(0, :slots - 1) s
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO payments (appointment_id, amount, method, status)
+    SELECT a.id, d.consultation_fee, 'card', a.payment_status
+    FROM appointments a
+    JOIN doctors d ON d.id = a.doctor_id
+    JOIN users u ON u.id = d.user_id AND u.email LIKE 'bench-analytics-%'
+    ON CONFLICT (appointment_id) DO NOTHING
+    """,
+]
+
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        params = {"doctors": DOCTORS, "days": DAYS, "slots": SLOTS_PER_DAY}
+        params["user_id"] = (await conn.execute(text(
+            "SELECT id FROM users WHERE role = 'USER' ORDER BY id LIMIT 1"
+        ))).scalar_one()
+        for statement in SEED_SQL:
+            await conn.execute(text(statement), params)
+        await conn.execute(text("ANALYZE appointments"))
+        await conn.execute(text("ANALYZE payments"))
+
+    start, end = date.today() - timedelta(days=DAYS), date.today()
+    chunk = start
+    while chunk <= end:
+        async with async_session() as session:
+            await rebuild_daily_stats(session, chunk, min(chunk + timedelta(days=90), end))
+            await session.commit()
+        chunk += timedelta(days=91)
+    await refresh_analytics_views()
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE daily_appointment_stats"))
+        for view in ("analytics_daily", "analytics_weekly", "analytics_monthly"):
+            await conn.execute(text(f"ANALYZE {view}"))
+
+
+def summarize(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+    print(
+        f"{label:36} p50 {statistics.median(samples):8.3f} ms   "
+        f"p95 {p95:8.3f} ms   max {samples[-1]:8.3f} ms"
+    )
+
+
+async def main(iterations: int, skip_seed: bool):
+    if not skip_seed:
+        started = time.perf_counter()
+        await seed()
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+    start, end = date.today() - timedelta(days=DAYS), date.today()
+    async with async_session() as session:
+        for metric in ("bookings", "revenue"):
+            for bucket in ("day", "week", "month"):
+                for group_by in ("none", "speciality", "doctor"):
+                    uncached, cached, rejected = [], [], None
+                    for _ in range(iterations):
+                        response_cache.invalidate(ANALYTICS_TAG)
+                        began = time.perf_counter()
+                        try:
+                            result = await get_analytics(session, metric, start, end, bucket, group_by)
+                        except HTTPException as exc:
+                            rejected = exc.detail
+                            break
+                        uncached.append((time.perf_counter() - began) * 1000)
+                        began = time.perf_counter()
+                        await get_analytics(session, metric, start, end, bucket, group_by)
+                        cached.append((time.perf_counter() - began) * 1000)
+                    if rejected:
+                        print(f"{metric} {bucket}/{group_by}: rejected ({rejected})")
+                        continue
+                    label = f"{metric} {bucket}/{group_by} ({len(result['series'])} rows)"
+                    summarize(label, uncached)
+                    summarize("  cached", cached)
+        await session.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.skip_seed))
@@ -0,0 +1,126 @@
+"""
+Benchmark the free-slot search for a busy doctor over a month.
+
+    python -m app.scripts.bench_free_slots --iterations 200
+
+Creates (or reuses) a doctor working Mon-Sat 08:00-20:00 in 15-minute slots
+with ~80% of the next 31 days booked and a few days of leave, then times
+get_free_slots end to end (query + bitmap) and the bitmap step alone.
+Only run this against a scratch database: seeded rows are kept.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.db.session import async_session, engine
+from app.models.user import User  # noqa: F401  (registers the Doctor.user mapper)
+from app.services.schedule_service import get_free_slots, _load_template, invalidate_schedule
+from app.utils.slots import compute_free_slots
+
+BENCH_EMAIL = "bench-doctor@example.com"
+DAYS = 31
+
+SEED_SQL = [
+    """
+    INSERT INTO users (name, email, password, role, is_active)
+    VALUES ('Bench Doctor', :email, 'x', 'DOCTOR', true)
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO doctors (user_id, speciality, consultation_fee, is_available)
+    SELECT u.id, 'Cardiology', 500, true FROM users u
+    WHERE u.email = :email AND NOT EXISTS (SELECT 1 FROM doctors d WHERE d.user_id = u.id)
+    """,
+    """
+    DELETE FROM doctor_schedules WHERE doctor_id = :doctor_id
+    """,
+    """
+    INSERT INTO doctor_schedules (doctor_id, weekday, start_time, end_time, slot_minutes)
+    SELECT :doctor_id, g, time '08:00', time '20:00', 15 FROM generate_series(0, 5) g
+    """,
+    """
+    INSERT INTO doctor_schedule_exceptions (doctor_id, date, reason)
+    SELECT :doctor_id, CURRENT_DATE + g, 'leave' FROM generate_series(10, 12) g
+    WHERE NOT EXISTS (
+        SELECT 1 FROM doctor_schedule_exceptions e
+        WHERE e.doctor_id = :doctor_id AND e.date = CURRENT_DATE + g
+    )
+    """,
+    """
+    INSERT INTO appointments (user_id, doctor_id, appointment_date, appointment_time, status, payment_status)
+    SELECT :user_id, :doctor_id, CURRENT_DATE + d, time '08:00' + s * interval '15 minutes', 'BOOKED', 'PENDING'
+    FROM generate_series(0, :days - 1) d, generate_series(0, 47) s
+    WHERE (d * 48 + s) % 5 <> 0
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+
+async def seed() -> int:
+    async with engine.begin() as conn:
+        params = {"email": BENCH_EMAIL, "days": DAYS}
+        for statement in SEED_SQL[:2]:
+            await conn.execute(text(statement), params)
+        params["doctor_id"] = (await conn.execute(text(
+            "SELECT d.id FROM doctors d JOIN users u ON u.id = d.user_id WHERE u.email = :email"
+        ), params)).scalar_one()
+        params["user_id"] = (await conn.execute(text(
+            "SELECT id FROM users WHERE role = 'USER' ORDER BY id LIMIT 1"
+        ))).scalar_one()
+        for statement in SEED_SQL[2:]:
+            await conn.execute(text(statement), params)
+        await conn.execute(text("ANALYZE appointments"))
+    return params["doctor_id"]
+
+
+def summarize(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+    print(
+        f"{label:28} p50 {statistics.median(samples):7.3f} ms   "
+        f"p95 {p95:7.3f} ms   max {samples[-1]:7.3f} ms"
+    )
+
+
+async def main(iterations: int):
+    doctor_id = await seed()
+    start, end = date.today(), date.today() + timedelta(days=DAYS - 1)
+
+    async with async_session() as session:
+        invalidate_schedule(doctor_id)
+        cold = time.perf_counter()
+        result = await get_free_slots(session, doctor_id, start, end)
+        cold = (time.perf_counter() - cold) * 1000
+        free = sum(len(day["slots"]) for day in result["days"])
+        print(f"doctor {doctor_id}: {free} free slots over {DAYS} days (cold call {cold:.3f} ms)")
+
+        end_to_end = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await get_free_slots(session, doctor_id, start, end)
+            end_to_end.append((time.perf_counter() - started) * 1000)
+        await session.rollback()
+
+        _, template = await _load_template(session, doctor_id)
+
+    booked = {start + timedelta(days=d): [480 + 15 * s for s in range(48) if (d * 48 + s) % 5] for d in range(DAYS)}
+    bitmap = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        compute_free_slots(template, start, end, booked)
+        bitmap.append((time.perf_counter() - started) * 1000)
+
+    summarize("get_free_slots (month)", end_to_end)
+    summarize("compute_free_slots only", bitmap)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,166 @@
+"""
+Seed a large synthetic dataset and compare EXPLAIN ANALYZE timings of the
+service queries with and without the access-path indexes.
+
+    python -m app.scripts.explain_appointment_queries --seed 1000000
+
+The "before" run drops the indexes inside a transaction that is rolled
+back, so the schema is left untouched. Only run this against a scratch
+database: seeded rows are kept.
+"""
+import argparse
+import asyncio
+import re
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+INDEXES = [
+    "ix_appointments_user_date",
+    "ix_appointments_doctor_date",
+    "ix_appointments_doctor_status",
+    "ix_appointments_doctor_paid",
+    "ix_appointments_date",
+    "ix_appointment_documents_appointment_id",
+    "ix_payments_status",
+]
+
+# Mirrors the statements issued by the service layer
+QUERIES = {
+    "list_user_appointments": """
+        SELECT * FROM appointments WHERE user_id = :user_id
+        ORDER BY appointment_date, appointment_time, id LIMIT 10
+    """,
+    "doctor_agenda": """
+        SELECT * FROM appointments WHERE doctor_id = :doctor_id
+        AND appointment_date BETWEEN CURRENT_DATE - 30 AND CURRENT_DATE + 30
+        ORDER BY appointment_date, appointment_time, id LIMIT 50
+    """,
+    "doctor_dashboard_cancelled": """
+        SELECT count(*) FROM appointments WHERE doctor_id = :doctor_id AND status = 'CANCELLED'
+    """,
+    "doctor_dashboard_paid": """
+        SELECT count(*) FROM appointments WHERE doctor_id = :doctor_id AND payment_status = 'PAID'
+    """,
+    "dashboard_today": """
+        SELECT count(*) FROM appointments WHERE appointment_date = CURRENT_DATE
+    """,
+    "appointment_documents": """
+        SELECT * FROM appointment_documents WHERE appointment_id = :appointment_id
+    """,
+    "payments_by_status": """
+        SELECT count(*) FROM payments WHERE status = 'PENDING'
+    """,
+}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (name, email, password, role, is_active)
+    SELECT 'Seed User ' || g, 'seed-user-' || g || '@example.com', 'x', 'USER', true
+    FROM generate_series(1, :users) g
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO users (name, email, password, role, is_active)
+    SELECT 'Seed Doctor ' || g, 'seed-doctor-' || g || '@example.com', 'x', 'DOCTOR', true
+    FROM generate_series(1, :doctors) g
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO doctors (user_id, speciality, consultation_fee, is_available)
+    SELECT u.id, (ARRAY['Cardiology', 'Dermatology', 'Neurology', 'Pediatrics'])[1 + u.id % 4], 500, true
+    FROM users u
+    WHERE u.email LIKE 'seed-doctor-%' AND NOT EXISTS (SELECT 1 FROM doctors d WHERE d.user_id = u.id)
+    """,
+    """
+    WITH seed_users AS (
+        SELECT array_agg(id) AS ids FROM users WHERE email LIKE 'seed-user-%'
+    ), seed_doctors AS (
+        SELECT array_agg(d.id) AS ids FROM doctors d JOIN users u ON u.id = d.user_id
+        WHERE u.email LIKE 'seed-doctor-%'
+    )
+    INSERT INTO appointments (user_id, doctor_id, appointment_date, appointment_time, status, payment_status)
+    SELECT
+        su.ids[1 + (g % array_length(su.ids, 1))],
+        sd.ids[1 + (g % array_length(sd.ids, 1))],
+        CURRENT_DATE - 365 + (g / array_length(sd.ids, 1) / 16) % 730,
+        time '08:00' + ((g / array_length(sd.ids, 1)) % 16) * interval '30 minutes',
+        (ARRAY['BOOKED', 'COMPLETED', 'CANCELLED'])[1 + g % 3],
+        (ARRAY['PENDING', 'PAID', 'REFUNDED'])[1 + (g / 3) % 3]
+    FROM generate_series(1, :appointments) g, seed_users su, seed_doctors sd
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO payments (appointment_id, amount, method, status)
+    SELECT a.id, 500, 'card', a.payment_status
+    FROM appointments a
+    WHERE a.payment_status <> 'PENDING' AND NOT EXISTS (SELECT 1 FROM payments p WHERE p.appointment_id = a.id)
+    """,
+    """
+    INSERT INTO appointment_documents (appointment_id, uploaded_by, file_url, file_type)
+    SELECT a.id, 'USER', '/media/seed.pdf', 'PDF'
+    FROM appointments a WHERE a.id % 10 = 0
+    AND NOT EXISTS (SELECT 1 FROM appointment_documents d WHERE d.appointment_id = a.id)
+    """,
+]
+
+
+async def seed(appointments: int):
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        params = {
+            "users": max(appointments // 20, 1),
+            "doctors": max(appointments // 2000, 1),
+            "appointments": appointments,
+        }
+        for statement in SEED_SQL:
+            await conn.execute(text(statement), params)
+        await conn.execute(text("ANALYZE"))
+    print(f"Seeded up to {appointments} appointments")
+
+
+async def sample_params(conn) -> dict:
+    row = (await conn.execute(text(
+        "SELECT a.user_id, a.doctor_id, a.id AS appointment_id FROM appointments a "
+        "ORDER BY a.id DESC LIMIT 1"
+    ))).first()
+    return dict(row._mapping) if row else {"user_id": 0, "doctor_id": 0, "appointment_id": 0}
+
+
+async def explain_all(conn, params: dict) -> dict:
+    timings = {}
+    for name, sql in QUERIES.items():
+        plan = (await conn.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params)).scalars().all()
+        match = re.search(r"Execution Time: ([\d.]+) ms", plan[-1])
+        timings[name] = (float(match.group(1)) if match else float("nan"), plan[0].strip())
+    return timings
+
+
+async def main(appointments: int):
+    if appointments:
+        await seed(appointments)
+
+    async with engine.connect() as conn:
+        params = await sample_params(conn)
+
+        for index in INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        before = await explain_all(conn, params)
+        await conn.rollback()  # restores the dropped indexes
+
+        after = await explain_all(conn, params)
+        await conn.rollback()
+
+    print(f"{'query':32} {'before ms':>12} {'after ms':>12}")
+    for name in QUERIES:
+        print(f"{name:32} {before[name][0]:12.3f} {after[name][0]:12.3f}")
+        print(f"    before: {before[name][1]}")
+        print(f"    after:  {after[name][1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="number of appointments to seed first")
+    args = parser.parse_args()
+    asyncio.run(main(args.seed))
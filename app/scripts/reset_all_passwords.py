@@ -10,7 +10,7 @@ async def main():
     from app.models.user import User
 
     async with async_session() as session:
-        stmt = update(User).values(password=get_password_hash(NEW_PASSWORD))
+        stmt = update(User).values(password=await get_password_hash(NEW_PASSWORD))
         await session.execute(stmt)
         await session.commit()
         print(" All users password reset to '1234'")
@@ -1,63 +1,79 @@
 from fastapi import HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, and_, or_, true
 from datetime import date
 
-from app.db.session import async_session
+from app.core.response_cache import response_cache
 from app.models.appointment import Appointment
+from app.models.daily_appointment_stats import DailyAppointmentStats
 from app.models.doctor import Doctor
-from app.schemas.doctor import DoctorResponse
-
-async def list_appointments(skip: int = 0, limit: int = 100):
-    async with async_session() as session:
-        result = await session.execute(select(Appointment).offset(skip).limit(limit))
-        return result.scalars().all()
-
-async def cancel_appointment(appointment_id: int):
-    async with async_session() as session:
-        result = await session.execute(select(Appointment).where(Appointment.id == appointment_id))
-        appointment = result.scalar_one_or_none()
-        if not appointment:
-            raise HTTPException(status_code=404, detail="Appointment not found")
-        appointment.status = "CANCELLED"
-        await session.commit()
-        await session.refresh(appointment)
-        return appointment
-
-async def get_dashboard(skip: int = 0, limit: int = 100):
-    async with async_session() as session:
-        result = await session.execute(select(Appointment).offset(skip).limit(limit))
-        all_appointments = result.scalars().all()
-
-        total = len(all_appointments)
-        completed = sum(1 for a in all_appointments if a.status == "COMPLETED")
-        cancelled = sum(1 for a in all_appointments if a.status == "CANCELLED")
-        today = date.today()
-        today_appointments = [a for a in all_appointments if a.appointment_date == today]
-
-        doctor_result = await session.execute(select(Doctor).options(selectinload(Doctor.user)))
-        doctors = doctor_result.scalars().all()
-
-        all_doctors_list = [
-            DoctorResponse(
-                id=d.id,
-                user_id=d.user_id,
-                name=d.user.name,
-                speciality=d.speciality,
-                experience_years=d.experience_years,
-                about=d.about,
-                consultation_fee=float(d.consultation_fee),
-                is_available=d.is_available,
-                image_url=d.image_url
-            )
-            for d in doctors
-        ]
-
-        return {
-            "total_appointments": total,
-            "completed_appointments": completed,
-            "cancelled_appointments": cancelled,
-            "today_appointments_count": len(today_appointments),
-            "all_doctors_count": len(doctors),
-            "all_doctors": all_doctors_list
-        }
+from app.models.enums import AppointmentStatus
+from app.services.appointment_state import transition_appointment
+from app.services.appointment_service import APPOINTMENT_ORDER, appointment_key, serialize_appointment
+from app.services.stats_service import ADMIN_STATS_TAG
+from app.utils.pagination import paginate, make_page
+
+async def list_appointments(session, skip: int = 0, limit: int = 100, cursor: str | None = None):
+    result = await session.execute(
+        paginate(select(Appointment), APPOINTMENT_ORDER, cursor=cursor, limit=limit, skip=skip)
+    )
+    return make_page(result.scalars().all(), limit, appointment_key)
+
+async def cancel_appointment(session, appointment_id: int):
+    row = await transition_appointment(session, appointment_id, "cancel")
+    return serialize_appointment(row, row.doctor_name)
+
+async def get_dashboard(session, admin, from_date: date | None = None, to_date: date | None = None):
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+
+    today = date.today()
+    return await response_cache.get_or_compute(
+        ("admin_dashboard", admin.id, from_date, to_date, today),
+        (ADMIN_STATS_TAG,),
+        lambda: _compute_dashboard(session, from_date, to_date, today)
+    )
+
+
+async def _compute_dashboard(session, from_date: date | None, to_date: date | None, today: date):
+    """
+    Totals come from the daily rollup, so the cost grows with the number of
+    days (and doctors) in range rather than with the appointments table.
+    Without a range the totals cover every day on record.
+    """
+    in_range = []
+    if from_date:
+        in_range.append(DailyAppointmentStats.date >= from_date)
+    if to_date:
+        in_range.append(DailyAppointmentStats.date <= to_date)
+
+    result = await session.execute(
+        select(
+            DailyAppointmentStats.status,
+            func.coalesce(func.sum(DailyAppointmentStats.appointments).filter(*in_range), 0).label("appointments"),
+            func.coalesce(func.sum(DailyAppointmentStats.paid_appointments).filter(*in_range), 0).label("paid"),
+            func.coalesce(
+                func.sum(DailyAppointmentStats.appointments).filter(DailyAppointmentStats.date == today), 0
+            ).label("today")
+        )
+        .where(or_(and_(*in_range), DailyAppointmentStats.date == today) if in_range else true())
+        .group_by(DailyAppointmentStats.status)
+    )
+    by_status = {row.status: row for row in result.all()}
+
+    def count(status: str) -> int:
+        row = by_status.get(status)
+        return row.appointments if row else 0
+
+    doctors_count = await session.scalar(select(func.count()).select_from(Doctor))
+
+    return {
+        "from": from_date,
+        "to": to_date,
+        "total_appointments": sum(row.appointments for row in by_status.values()),
+        "booked_appointments": count(AppointmentStatus.BOOKED.value),
+        "completed_appointments": count(AppointmentStatus.COMPLETED.value),
+        "cancelled_appointments": count(AppointmentStatus.CANCELLED.value),
+        "paid_appointments": sum(row.paid for row in by_status.values()),
+        "today_appointments_count": sum(row.today for row in by_status.values()),
+        "all_doctors_count": doctors_count
+    }
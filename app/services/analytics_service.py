@@ -0,0 +1,132 @@
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, func, text
+
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.core.tasks import PeriodicTask
+from app.db.locks import AdvisoryLeader
+from app.db.session import async_session
+from app.models.analytics_views import ANALYTICS_VIEWS
+from app.models.doctor import Doctor
+from app.models.user import User
+
+# Results only change when the views are refreshed
+ANALYTICS_TAG = "analytics"
+
+METRICS = {
+    "bookings": ("bookings", "cancelled", "completed"),
+    "revenue": ("paid_payments", "revenue", "refunded"),
+}
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _window(from_date: date | None, to_date: date | None, bucket: str):
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(days=settings.ANALYTICS_DEFAULT_DAYS - 1)
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    if (to_date - from_date).days >= settings.ANALYTICS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window is limited to {settings.ANALYTICS_MAX_DAYS} days")
+    # Week and month buckets always cover whole calendar periods
+    return bucket_start(from_date, bucket), to_date
+
+
+def _series_query(metric: str, from_date: date, to_date: date, bucket: str, group_by: str):
+    view = ANALYTICS_VIEWS[(bucket, "doctor" if group_by == "doctor" else "speciality")]
+    measures = [func.sum(view.c[name]).label(name) for name in METRICS[metric]]
+
+    if group_by == "speciality":
+        groups = [view.c.speciality]
+    elif group_by == "doctor":
+        groups = [view.c.doctor_id, User.name.label("doctor_name")]
+    else:
+        groups = []
+
+    stmt = select(view.c.bucket, *groups, *measures).select_from(view)
+    if group_by == "doctor":
+        stmt = stmt.join(Doctor, Doctor.id == view.c.doctor_id).join(User, User.id == Doctor.user_id)
+    return (
+        stmt.where(view.c.bucket.between(from_date, to_date))
+        .group_by(view.c.bucket, *groups)
+        .order_by(view.c.bucket, *groups)
+        .limit(settings.ANALYTICS_MAX_POINTS + 1)
+    )
+
+
+def _serialize(metric: str, item: dict) -> dict:
+    if metric == "bookings":
+        item["cancellation_rate"] = round(item["cancelled"] / item["bookings"], 4) if item["bookings"] else 0.0
+    else:
+        item["revenue"] = float(item["revenue"])
+        item["refunded"] = float(item["refunded"])
+    return item
+
+
+async def get_analytics(
+    session,
+    metric: str,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    bucket: str = "day",
+    group_by: str = "none"
+):
+    """
+    Bucketed `metric` series read from the materialized views, so results
+    trail live data by up to ANALYTICS_REFRESH_INTERVAL_SECONDS.
+    """
+    from_date, to_date = _window(from_date, to_date, bucket)
+    return await response_cache.get_or_compute(
+        ("analytics", metric, from_date, to_date, bucket, group_by),
+        (ANALYTICS_TAG,),
+        lambda: _compute_analytics(session, metric, from_date, to_date, bucket, group_by),
+        ttl=settings.ANALYTICS_CACHE_TTL_SECONDS
+    )
+
+
+async def _compute_analytics(session, metric: str, from_date: date, to_date: date, bucket: str, group_by: str):
+    result = await session.execute(_series_query(metric, from_date, to_date, bucket, group_by))
+    rows = result.all()
+    if len(rows) > settings.ANALYTICS_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"More than {settings.ANALYTICS_MAX_POINTS} points; use a coarser bucket or a shorter window"
+        )
+    # Zip against the keys once; Row._mapping rebuilds them for every row
+    keys = list(result.keys())
+    return {
+        "from": from_date,
+        "to": to_date,
+        "bucket": bucket,
+        "group_by": group_by,
+        "series": [_serialize(metric, dict(zip(keys, row))) for row in rows]
+    }
+
+
+# ---------- REFRESH ----------
+async def refresh_analytics_views():
+    """Rebuild the views without blocking readers, then drop cached results."""
+    async with async_session() as session:
+        # A full rebuild can outlast the request-sized statement_timeout
+        await session.execute(text("SET LOCAL statement_timeout = 0"))
+        for view in ANALYTICS_VIEWS.values():
+            await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+        await session.commit()
+    response_cache.invalidate(ANALYTICS_TAG)
+
+
+analytics_refresher = PeriodicTask(
+    "analytics-refresher",
+    refresh_analytics_views,
+    settings.ANALYTICS_REFRESH_INTERVAL_SECONDS,
+    # Postgres serializes concurrent refreshes, so one worker does them all
+    leader=AdvisoryLeader("analytics-refresher"),
+)
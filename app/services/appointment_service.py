@@ -1,173 +1,350 @@
 # app/services/appointment_service.py
+import time
+from datetime import datetime, timedelta
 from fastapi import HTTPException
-from sqlalchemy import select, and_
-from app.models.appointment import Appointment
-from app.models.enums import AppointmentStatus, PaymentStatus
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, delete, literal, func, column, bindparam, tuple_, BigInteger, Date, Time
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from app.models.appointment import Appointment, ACTIVE_SLOT
 from app.models.doctor import Doctor
+from app.models.user import User
+from app.models.slot_hold import SlotHold
+from app.models.enums import AppointmentStatus, PaymentStatus
 from app.models.appointment_document import AppointmentDocument
-from app.db.session import async_session
+from app.core.booking_ledger import booking_ledger
+from app.core.config import settings
+from app.core.events import event_bus, APPOINTMENT_BOOKED
+from app.db.routing import replica_router
+from app.services.appointment_state import transition_appointment
+from app.services.stats_service import record_appointment_changes
+from app.utils.loaders import DoctorNameLoader
+from app.utils.pagination import paginate, make_page
 from app.utils.permissions import check_role
 
+# Keyset order shared by every appointment listing
+APPOINTMENT_ORDER = (Appointment.appointment_date, Appointment.appointment_time, Appointment.id)
+
+
+def appointment_key(appointment):
+    return (appointment.appointment_date, appointment.appointment_time, appointment.id)
+
+
+def serialize_appointment(appointment, doctor_name: str) -> dict:
+    return {
+        "id": appointment.id,
+        "doctor_id": appointment.doctor_id,
+        "doctor_name": doctor_name,
+        "appointment_date": appointment.appointment_date.isoformat(),
+        "appointment_time": appointment.appointment_time.isoformat(),
+        "status": appointment.status,
+        "payment_status": appointment.payment_status
+    }
+
 # -------------------
 # Appointment CRUD
 # -------------------
 
-async def create_appointment(user, doctor_id: int, appointment_date, appointment_time):
+async def book_slot(session, user_id: int, doctor_id: int, appointment_date, appointment_time):
+    """
+    Insert a BOOKED appointment in one statement and return it with the
+    doctor's name. Raises 404 for an unknown doctor and 409 when the slot is
+    booked or held by someone else. The caller commits.
+    """
+    now = datetime.utcnow()
+    held_by_other = (
+        select(SlotHold.expires_at)
+        .where(
+            SlotHold.doctor_id == doctor_id,
+            SlotHold.appointment_date == appointment_date,
+            SlotHold.appointment_time == appointment_time,
+            SlotHold.expires_at > now,
+            SlotHold.user_id != user_id
+        )
+    )
+
+    # INSERT ... SELECT FROM doctors yields no row for an unknown doctor or a
+    # held slot, and ON CONFLICT skips slots taken by an active appointment
+    source = select(
+        literal(user_id, BigInteger),
+        Doctor.id,
+        literal(appointment_date, Date),
+        literal(appointment_time, Time),
+        literal(AppointmentStatus.BOOKED.value),
+        literal(PaymentStatus.PENDING.value)
+    ).where(Doctor.id == doctor_id, ~held_by_other.exists())
+
+    booked = (
+        insert(Appointment)
+        .from_select(
+            ["user_id", "doctor_id", "appointment_date", "appointment_time", "status", "payment_status"],
+            source
+        )
+        .on_conflict_do_nothing(
+            index_elements=["doctor_id", "appointment_date", "appointment_time"],
+            index_where=ACTIVE_SLOT
+        )
+        .returning(*Appointment.__table__.c)
+        .cte("booked")
+    )
+    stmt = (
+        select(booked, User.name.label("doctor_name"))
+        .join(Doctor, Doctor.id == booked.c.doctor_id)
+        .join(User, User.id == Doctor.user_id)
+    )
+    row = (await session.execute(stmt)).first()
+    if row is not None:
+        return row
+
+    diagnosis = (await session.execute(
+        select(Doctor.id, held_by_other.scalar_subquery().label("hold_expires_at"))
+        .where(Doctor.id == doctor_id)
+    )).first()
+    if diagnosis is None:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+    if diagnosis.hold_expires_at is not None:
+        retry_after = max(int((diagnosis.hold_expires_at - now).total_seconds()), 1)
+        raise HTTPException(
+            status_code=409,
+            detail="Slot is on hold, try again shortly",
+            headers={"Retry-After": str(retry_after)}
+        )
+    booking_ledger.record_conflict(doctor_id, appointment_date, appointment_time)
+    raise HTTPException(status_code=409, detail="Slot already booked")
+
+
+async def release_own_holds(session, user_id: int, doctor_id: int, slots: list):
+    """Drop the caller's holds on slots they just booked directly. The caller commits."""
+    await session.execute(
+        delete(SlotHold).where(
+            SlotHold.user_id == user_id,
+            SlotHold.doctor_id == doctor_id,
+            tuple_(SlotHold.appointment_date, SlotHold.appointment_time).in_(slots)
+        )
+    )
+
+
+async def load_ledger_day(session, doctor_id: int, day):
+    """Seed the ledger with one day's active bookings, read on the primary `session`."""
+    if booking_ledger.knows(doctor_id, day):
+        return
+    snapshot_at = time.monotonic()
+    result = await session.execute(
+        select(Appointment.appointment_time)
+        .where(Appointment.doctor_id == doctor_id, Appointment.appointment_date == day, ACTIVE_SLOT)
+    )
+    booking_ledger.load_day(doctor_id, day, result.scalars().all(), snapshot_at)
+
+
+async def create_appointment(session, user, doctor_id: int, appointment_date, appointment_time):
+    check_role(user, ["USER"])
+
+    await load_ledger_day(session, doctor_id, appointment_date)
+    if booking_ledger.is_taken(doctor_id, appointment_date, appointment_time):
+        raise HTTPException(status_code=409, detail="Slot already booked")
+
+    row = await book_slot(session, user.id, doctor_id, appointment_date, appointment_time)
+    await release_own_holds(session, user.id, doctor_id, [(appointment_date, appointment_time)])
+    await record_appointment_changes(session, doctor_id, [(row.appointment_date, row.status, 1, 0)])
+    await session.commit()
+    booking_ledger.mark_booked(doctor_id, appointment_date, appointment_time)
+    replica_router.record_write(user.id)
+    event_bus.publish(APPOINTMENT_BOOKED, doctor_id=doctor_id, appointment_id=row.id)
+    return serialize_appointment(row, row.doctor_name)
+
+def expand_recurrence(rule) -> list:
+    if rule.count > settings.BATCH_BOOKING_MAX_SLOTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_BOOKING_MAX_SLOTS} slots per batch")
+    return [
+        (rule.start_date + timedelta(days=rule.every_days * n), rule.appointment_time)
+        for n in range(rule.count)
+    ]
+
+
+async def create_appointments_batch(session, user, doctor_id: int, slots: list, all_or_nothing: bool = False):
     check_role(user, ["USER"])
 
-    async with async_session() as session:
-        # Check if slot already booked
-        stmt = select(Appointment).where(
-            and_(
-                Appointment.doctor_id == doctor_id,
-                Appointment.appointment_date == appointment_date,
-                Appointment.appointment_time == appointment_time
+    if not slots:
+        raise HTTPException(status_code=400, detail="Give either slots or a recurrence rule")
+    if len(slots) > settings.BATCH_BOOKING_MAX_SLOTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_BOOKING_MAX_SLOTS} slots per batch")
+
+    statuses = {}
+    wanted = []
+    for slot in slots:
+        if slot in statuses:
+            continue
+        if booking_ledger.is_taken(doctor_id, *slot):
+            statuses[slot] = "conflict"
+        else:
+            statuses[slot] = None
+            wanted.append(slot)
+
+    booked_rows = []
+    if wanted:
+        now = datetime.utcnow()
+        requested = func.unnest(
+            bindparam("dates", [d for d, _ in wanted], type_=ARRAY(Date)),
+            bindparam("times", [t for _, t in wanted], type_=ARRAY(Time))
+        ).table_valued(column("appointment_date", Date), column("appointment_time", Time)).render_derived(name="requested")
+
+        held_by_other = select(SlotHold.id).where(
+            SlotHold.doctor_id == Doctor.id,
+            SlotHold.appointment_date == requested.c.appointment_date,
+            SlotHold.appointment_time == requested.c.appointment_time,
+            SlotHold.expires_at > now,
+            SlotHold.user_id != user.id
+        )
+        source = (
+            select(
+                literal(user.id, BigInteger),
+                Doctor.id,
+                requested.c.appointment_date,
+                requested.c.appointment_time,
+                literal(AppointmentStatus.BOOKED.value),
+                literal(PaymentStatus.PENDING.value)
             )
+            .select_from(requested)
+            .join(Doctor, Doctor.id == doctor_id)
+            .where(~held_by_other.exists())
+        )
+
+        # Every free slot goes in with one multi-row INSERT; taken ones are skipped by ON CONFLICT
+        stmt = (
+            insert(Appointment)
+            .from_select(
+                ["user_id", "doctor_id", "appointment_date", "appointment_time", "status", "payment_status"],
+                source
+            )
+            .on_conflict_do_nothing(
+                index_elements=["doctor_id", "appointment_date", "appointment_time"],
+                index_where=ACTIVE_SLOT
+            )
+            .returning(*Appointment.__table__.c)
+        )
+        booked_rows = (await session.execute(stmt)).all()
+        for row in booked_rows:
+            statuses[(row.appointment_date, row.appointment_time)] = "booked"
+
+        missing = [slot for slot in wanted if statuses[slot] is None]
+        if missing:
+            if not booked_rows and await session.scalar(select(Doctor.id).where(Doctor.id == doctor_id)) is None:
+                raise HTTPException(status_code=404, detail="Doctor not found")
+            dates = {d for d, _ in missing}
+            held = await session.execute(
+                select(SlotHold.appointment_date, SlotHold.appointment_time).where(
+                    SlotHold.doctor_id == doctor_id,
+                    SlotHold.appointment_date.in_(dates),
+                    SlotHold.expires_at > now,
+                    SlotHold.user_id != user.id
+                )
+            )
+            held = set(held.tuples().all())
+            for slot in missing:
+                statuses[slot] = "held" if slot in held else "conflict"
+                if slot not in held:
+                    booking_ledger.record_conflict(doctor_id, *slot)
+
+    appointment_ids = {(row.appointment_date, row.appointment_time): row.id for row in booked_rows}
+    seen = set()
+    results = []
+    for slot in slots:
+        results.append({
+            "appointment_date": slot[0],
+            "appointment_time": slot[1],
+            "status": "duplicate" if slot in seen else statuses[slot],
+            "appointment_id": None if slot in seen else appointment_ids.get(slot)
+        })
+        seen.add(slot)
+
+    failed = any(r["status"] in ("conflict", "held") for r in results)
+    if all_or_nothing and failed:
+        await session.rollback()
+        for r in results:
+            if r["status"] == "booked":
+                r["status"], r["appointment_id"] = "skipped", None
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Some slots are not available", "results": jsonable_encoder(results)}
         )
-        result = await session.execute(stmt)
-        if result.scalar_one_or_none():
-            raise HTTPException(status_code=400, detail="Slot already booked")
-
-        # Create appointment
-        appointment = Appointment(
-            user_id=user.id,
-            doctor_id=doctor_id,
-            appointment_date=appointment_date,
-            appointment_time=appointment_time,
-            status=AppointmentStatus.BOOKED.value,
-            payment_status=PaymentStatus.PENDING.value
+
+    if booked_rows:
+        await release_own_holds(session, user.id, doctor_id, list(appointment_ids))
+        await record_appointment_changes(
+            session, doctor_id, [(row.appointment_date, row.status, 1, 0) for row in booked_rows]
         )
-        session.add(appointment)
-        await session.commit()
-        await session.refresh(appointment)
-
-        # Get doctor info
-        stmt_doc = select(Doctor).where(Doctor.id == doctor_id)
-        res_doc = await session.execute(stmt_doc)
-        doctor = res_doc.scalar_one_or_none()
-
-        return {
-            "id": appointment.id,
-            "doctor_id": doctor_id,
-            "doctor_name": doctor.user.name if doctor else "Unknown",
-            "appointment_date": appointment.appointment_date.isoformat(),
-            "appointment_time": appointment.appointment_time.isoformat(),
-            "status": appointment.status,
-            "payment_status": appointment.payment_status
-        }
-
-async def list_user_appointments(user, skip: int = 0, limit: int = 10):
+    await session.commit()
+    for row in booked_rows:
+        booking_ledger.mark_booked(doctor_id, row.appointment_date, row.appointment_time)
+    if booked_rows:
+        replica_router.record_write(user.id)
+        event_bus.publish(APPOINTMENT_BOOKED, doctor_id=doctor_id, appointment_ids=list(appointment_ids.values()))
+
+    doctor_name = await DoctorNameLoader.for_session(session).load(doctor_id)
+    return {
+        "booked": [serialize_appointment(row, doctor_name) for row in booked_rows],
+        "results": results
+    }
+
+async def list_user_appointments(session, user, skip: int = 0, limit: int = 10, cursor: str | None = None):
     check_role(user, ["USER"])
 
-    async with async_session() as session:
-        stmt = select(Appointment).where(Appointment.user_id == user.id).offset(skip).limit(limit)
-        result = await session.execute(stmt)
-        appointments = result.scalars().all()
-
-        response = []
-        for appt in appointments:
-            stmt_doc = select(Doctor).where(Doctor.id == appt.doctor_id)
-            res_doc = await session.execute(stmt_doc)
-            doctor = res_doc.scalar_one_or_none()
-            response.append({
-                "id": appt.id,
-                "doctor_id": appt.doctor_id,
-                "doctor_name": doctor.user.name if doctor else "Unknown",
-                "appointment_date": appt.appointment_date.isoformat(),
-                "appointment_time": appt.appointment_time.isoformat(),
-                "status": appt.status,
-                "payment_status": appt.payment_status
-            })
-        return response
-
-async def list_doctor_appointments(user):
-    check_role(user, ["DOCTOR"])
-
-    async with async_session() as session:
-        stmt = select(Appointment).where(Appointment.doctor_id == user.doctor.id)
-        result = await session.execute(stmt)
-        appointments = result.scalars().all()
-        return [
-            {
-                "id": appt.id,
-                "user_id": appt.user_id,
-                "appointment_date": appt.appointment_date.isoformat(),
-                "appointment_time": appt.appointment_time.isoformat(),
-                "status": appt.status,
-                "payment_status": appt.payment_status
-            } for appt in appointments
-        ]
-
-async def cancel_appointment(user, appointment_id: int):
+    stmt = paginate(
+        select(Appointment).where(Appointment.user_id == user.id),
+        APPOINTMENT_ORDER, cursor=cursor, limit=limit, skip=skip
+    )
+    result = await session.execute(stmt)
+    page = make_page(result.scalars().all(), limit, appointment_key)
+    appointments = page["items"]
+
+    # One query resolves every doctor on the page
+    names = await DoctorNameLoader.for_session(session).load_many(
+        {appt.doctor_id for appt in appointments}
+    )
+    page["items"] = [serialize_appointment(appt, names[appt.doctor_id]) for appt in appointments]
+    return page
+
+async def cancel_appointment(session, user, appointment_id: int):
     check_role(user, ["USER"])
 
-    async with async_session() as session:
-        stmt = select(Appointment).where(
-            Appointment.id == appointment_id,
-            Appointment.user_id == user.id
-        )
-        result = await session.execute(stmt)
-        appointment = result.scalar_one_or_none()
-        if not appointment:
-            raise HTTPException(status_code=404, detail="Appointment not found")
-
-        appointment.status = AppointmentStatus.CANCELLED.value
-        await session.commit()
-        await session.refresh(appointment)
-
-        # Get doctor info
-        stmt_doc = select(Doctor).where(Doctor.id == appointment.doctor_id)
-        res_doc = await session.execute(stmt_doc)
-        doctor = res_doc.scalar_one_or_none()
-
-        return {
-            "id": appointment.id,
-            "doctor_id": appointment.doctor_id,
-            "doctor_name": doctor.user.name if doctor else "Unknown",
-            "appointment_date": appointment.appointment_date.isoformat(),
-            "appointment_time": appointment.appointment_time.isoformat(),
-            "status": appointment.status,
-            "payment_status": appointment.payment_status
-        }
+    row = await transition_appointment(session, appointment_id, "cancel", user_id=user.id)
+    return serialize_appointment(row, row.doctor_name)
 
 # -------------------
 # Appointment Documents
 # -------------------
 
-async def get_appointment_documents(user, appointment_id: int):
+async def get_appointment_documents(session, user, appointment_id: int):
     check_role(user, ["USER", "DOCTOR"])
 
-    async with async_session() as session:
-        stmt = select(AppointmentDocument).where(AppointmentDocument.appointment_id == appointment_id)
-        result = await session.execute(stmt)
-        documents = result.scalars().all()
-        return [
-            {
-                "id": doc.id,
-                "appointment_id": doc.appointment_id,
-                "uploaded_by": doc.uploaded_by,
-                "file_url": doc.file_url,
-                "file_type": doc.file_type
-            } for doc in documents
-        ]
-
-async def upload_appointment_document(user, appointment_id: int, file_url: str, file_type: str):
-    check_role(user, ["USER", "DOCTOR"])
-
-    async with async_session() as session:
-        doc = AppointmentDocument(
-            appointment_id=appointment_id,
-            uploaded_by=user.role,
-            file_url=file_url,
-            file_type=file_type
-        )
-        session.add(doc)
-        await session.commit()
-        await session.refresh(doc)
-        return {
+    stmt = select(AppointmentDocument).where(AppointmentDocument.appointment_id == appointment_id)
+    result = await session.execute(stmt)
+    documents = result.scalars().all()
+    return [
+        {
             "id": doc.id,
             "appointment_id": doc.appointment_id,
             "uploaded_by": doc.uploaded_by,
             "file_url": doc.file_url,
             "file_type": doc.file_type
-        }
+        } for doc in documents
+    ]
+
+async def upload_appointment_document(session, user, appointment_id: int, file_url: str, file_type: str):
+    check_role(user, ["USER", "DOCTOR"])
+
+    doc = AppointmentDocument(
+        appointment_id=appointment_id,
+        uploaded_by=user.role,
+        file_url=file_url,
+        file_type=file_type
+    )
+    session.add(doc)
+    await session.commit()
+    await session.refresh(doc)
+    return {
+        "id": doc.id,
+        "appointment_id": doc.appointment_id,
+        "uploaded_by": doc.uploaded_by,
+        "file_url": doc.file_url,
+        "file_type": doc.file_type
+    }
@@ -0,0 +1,137 @@
+"""
+Appointment and payment state machine.
+
+Every transition is one conditional UPDATE ... WHERE status IN (...) RETURNING,
+so the legality check and the write happen atomically in a single round
+trip. When nothing comes back, a follow-up read (only on that failure path)
+tells "not found" apart from "illegal transition".
+"""
+from fastapi import HTTPException
+from sqlalchemy import select, update, true
+
+from app.core.booking_ledger import booking_ledger
+from app.core.events import event_bus, APPOINTMENT_CANCELLED, APPOINTMENT_COMPLETED, PAYMENT_UPDATED
+from app.db.routing import replica_router
+from app.models.appointment import Appointment
+from app.models.doctor import Doctor
+from app.models.enums import AppointmentStatus, PaymentStatus
+from app.models.payment import Payment
+from app.models.user import User
+from app.services.stats_service import record_appointment_changes, status_change
+
+# action -> (statuses it may start from, resulting status, event published)
+APPOINTMENT_TRANSITIONS = {
+    "cancel": ({AppointmentStatus.BOOKED.value}, AppointmentStatus.CANCELLED.value, APPOINTMENT_CANCELLED),
+    "complete": ({AppointmentStatus.BOOKED.value}, AppointmentStatus.COMPLETED.value, APPOINTMENT_COMPLETED),
+}
+
+# target payment status -> statuses it may be reached from
+PAYMENT_TRANSITIONS = {
+    PaymentStatus.PAID.value: {PaymentStatus.PENDING.value},
+    PaymentStatus.REFUNDED.value: {PaymentStatus.PAID.value},
+}
+
+
+async def transition_appointment(
+    session,
+    appointment_id: int,
+    action: str,
+    user_id: int | None = None,
+    doctor_id: int | None = None
+):
+    """
+    Apply `action` to an appointment, optionally scoped to its patient or
+    doctor, and commit. Returns the updated row with `doctor_name`.
+    """
+    sources, target, event = APPOINTMENT_TRANSITIONS[action]
+
+    scope = [Appointment.id == appointment_id]
+    if user_id is not None:
+        scope.append(Appointment.user_id == user_id)
+    if doctor_id is not None:
+        scope.append(Appointment.doctor_id == doctor_id)
+
+    # Lock the row and keep its old status so the counters can be moved
+    previous = (
+        select(Appointment.id, Appointment.status.label("previous_status"))
+        .where(*scope)
+        .with_for_update()
+        .subquery("previous")
+    )
+    updated = (
+        update(Appointment)
+        .where(Appointment.id == previous.c.id, Appointment.status.in_(sources))
+        .values(status=target)
+        .returning(*Appointment.__table__.c, previous.c.previous_status)
+        .cte("updated")
+    )
+    row = (await session.execute(
+        select(updated, User.name.label("doctor_name"))
+        .join(Doctor, Doctor.id == updated.c.doctor_id)
+        .join(User, User.id == Doctor.user_id)
+    )).first()
+
+    if row is None:
+        current = await session.scalar(select(Appointment.status).where(*scope))
+        if current is None:
+            raise HTTPException(status_code=404, detail="Appointment not found")
+        raise HTTPException(status_code=409, detail=f"Cannot {action} an appointment that is {current}")
+
+    await record_appointment_changes(session, row.doctor_id, status_change(row, row.previous_status, target))
+    await session.commit()
+    if target == AppointmentStatus.CANCELLED.value:
+        booking_ledger.mark_free(row.doctor_id, row.appointment_date, row.appointment_time)
+    replica_router.record_write(row.user_id)
+    event_bus.publish(event, doctor_id=row.doctor_id, appointment_id=row.id)
+    return row
+
+
+async def transition_payment(session, payment_id: int, target: str):
+    """
+    Move a payment to `target` and mirror it onto appointments.payment_status
+    in the same statement, then commit. Returns the updated payment row.
+    """
+    if target not in PAYMENT_TRANSITIONS:
+        raise HTTPException(status_code=400, detail=f"Payments cannot be set to {target}")
+
+    updated = (
+        update(Payment)
+        .where(Payment.id == payment_id, Payment.status.in_(PAYMENT_TRANSITIONS[target]))
+        .values(status=target)
+        .returning(*Payment.__table__.c)
+        .cte("updated_payment")
+    )
+    synced = (
+        update(Appointment)
+        .where(Appointment.id == updated.c.appointment_id)
+        .values(payment_status=target)
+        .returning(Appointment.user_id, Appointment.doctor_id, Appointment.appointment_date, Appointment.status)
+        .cte("synced_appointment")
+    )
+    row = (await session.execute(
+        select(
+            updated,
+            synced.c.user_id,
+            synced.c.doctor_id,
+            synced.c.appointment_date,
+            synced.c.status.label("appointment_status")
+        ).outerjoin(synced, true())
+    )).first()
+
+    if row is None:
+        current = await session.scalar(select(Payment.status).where(Payment.id == payment_id))
+        if current is None:
+            raise HTTPException(status_code=404, detail="Payment not found")
+        raise HTTPException(status_code=409, detail=f"Cannot move a {current} payment to {target}")
+
+    if row.doctor_id is not None:
+        paid_delta = 1 if target == PaymentStatus.PAID.value else -1
+        await record_appointment_changes(
+            session, row.doctor_id, [(row.appointment_date, row.appointment_status, 0, paid_delta)]
+        )
+    await session.commit()
+    if row.user_id is not None:
+        replica_router.record_write(row.user_id)
+    if row.doctor_id is not None:
+        event_bus.publish(PAYMENT_UPDATED, doctor_id=row.doctor_id, payment_id=row.id, status=target)
+    return row
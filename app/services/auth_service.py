@@ -1,40 +1,187 @@
-from sqlalchemy import select
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from app.db.session import async_session
 from app.models.user import User
 from app.models.token import RefreshToken
-from app.core.security import get_password_hash, verify_password, create_access_token, create_refresh_token
+from app.core.config import settings
+from app.core.principal import get_principal
+from app.core.rate_limit import login_throttle
+from app.core.tasks import PeriodicTask
+from app.core.revocation import revocation_filter
+from app.core.security import (
+    get_password_hash, verify_password, password_needs_rehash,
+    create_access_token, create_refresh_token, decode_token, forget_token, token_digest
+)
 
-async def register_user(name, email, password, **kwargs):
+logger = logging.getLogger(__name__)
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks = set()
+
+def _refresh_expiry():
+    return datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+async def register_user(session, name, email, password, **kwargs):
+    if await session.scalar(select(User).where(User.email == email)):
+        raise HTTPException(400, "Email already exists")
+    await session.commit()  # release the connection while bcrypt runs
+    user = User(
+        name=name,
+        email=email,
+        password=await get_password_hash(password),
+        role="USER",
+        **kwargs
+    )
+    session.add(user)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Registered concurrently while the hash was computed
+        await session.rollback()
+        raise HTTPException(400, "Email already exists")
+    await session.refresh(user)
+    return user
+
+async def login_user(session, email: str, password: str, client_ip: str | None = None):
+    await login_throttle.check(email, client_ip)
+    user = await session.scalar(select(User).where(User.email == email))
+    await session.commit()  # release the connection while bcrypt runs
+    if not user or not await verify_password(password, user.password):
+        raise HTTPException(401, "Invalid credentials")
+    if not user.is_active:
+        raise HTTPException(403, "Account is disabled")
+    if password_needs_rehash(user.password):
+        task = asyncio.create_task(_rehash_password(user.id, user.password, password))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    access = create_access_token(user.id, user.role)
+    family_id = str(uuid.uuid4())
+    refresh = create_refresh_token(user.id, family_id)
+    session.add(RefreshToken(
+        user_id=user.id,
+        token=token_digest(refresh),
+        family_id=family_id,
+        expires_at=_refresh_expiry()
+    ))
+    await session.commit()
+    return access, refresh, user
+
+async def _rehash_password(user_id: int, old_hash: str, password: str):
+    """Upgrade a stored hash to the current bcrypt cost after a successful login."""
+    try:
+        new_hash = await get_password_hash(password)
+    except HTTPException:
+        return  # hasher saturated; try again on a later login
     async with async_session() as session:
-        if await session.scalar(select(User).where(User.email == email)):
-            raise HTTPException(400, "Email already exists")
-        user = User(
-            name=name,
-            email=email,
-            password=get_password_hash(password),
-            role="USER",
-            **kwargs
+        await session.execute(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
         )
-        session.add(user)
         await session.commit()
-        await session.refresh(user)
-        return user
 
-async def login_user(email: str, password: str):
-    async with async_session() as session:
-        user = await session.scalar(select(User).where(User.email == email))
-        if not user or not verify_password(password, user.password):
-            raise HTTPException(401, "Invalid credentials")
-        access = create_access_token(user.id, user.role)
-        refresh = create_refresh_token(user.id)
-        session.add(RefreshToken(user_id=user.id, token=refresh))
+async def _revoke_family(session, family_id: str):
+    result = await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id)
+        .values(is_revoked=True)
+        .returning(RefreshToken.token)
+    )
+    for token_hash in result.scalars().all():
+        revocation_filter.add(token_hash)
+
+async def refresh_tokens(session, refresh_token: str):
+    payload = decode_token(refresh_token)
+    if payload.get("type") != "refresh":
+        raise HTTPException(401, "Invalid token type")
+    token_hash = token_digest(refresh_token)
+
+    # Only a filter positive needs the extra lookup before rotating
+    if revocation_filter.might_be_revoked(token_hash):
+        stored = await session.scalar(select(RefreshToken).where(RefreshToken.token == token_hash))
+        if not stored or stored.is_revoked:
+            # A missing row was revoked and then swept; the claim still names its family
+            family_id = stored.family_id if stored else payload.get("fam")
+            if family_id:
+                await _revoke_family(session, family_id)
+                await session.commit()
+            raise HTTPException(401, "Refresh token revoked")
+
+    # Rotate: revoke the presented token in the same statement that checks it
+    result = await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token == token_hash, RefreshToken.is_revoked == False)
+        .values(is_revoked=True)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    )
+    rotated = result.first()
+    if not rotated:
+        # Unknown, or already rotated elsewhere: treat a replay as family theft
+        family_id = payload.get("fam")
+        if family_id:
+            await _revoke_family(session, family_id)
+            await session.commit()
+        raise HTTPException(401, "Refresh token revoked")
+
+    principal = await get_principal(session, rotated.user_id)
+    if not principal or not principal.is_active:
+        await session.rollback()
+        raise HTTPException(401, "User not found")
+
+    access = create_access_token(principal.id, principal.role)
+    refresh = create_refresh_token(principal.id, rotated.family_id)
+    session.add(RefreshToken(
+        user_id=principal.id,
+        token=token_digest(refresh),
+        family_id=rotated.family_id,
+        expires_at=_refresh_expiry()
+    ))
+    await session.commit()
+
+    revocation_filter.add(token_hash)
+    forget_token(refresh_token)
+    return access, refresh, principal
+
+async def logout_user(session, refresh_token: str):
+    forget_token(refresh_token)
+    token_hash = token_digest(refresh_token)
+    token = await session.scalar(select(RefreshToken).where(RefreshToken.token == token_hash))
+    if token:
+        await _revoke_family(session, token.family_id)
         await session.commit()
-        return access, refresh, user
 
-async def logout_user(refresh_token: str):
-    async with async_session() as session:
-        token = await session.scalar(select(RefreshToken).where(RefreshToken.token == refresh_token))
-        if token:
-            token.is_revoked = True
+async def sweep_refresh_tokens(
+    batch_size: int = settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE,
+    pause: float = settings.REFRESH_TOKEN_SWEEP_PAUSE_SECONDS
+) -> int:
+    """Delete expired and revoked refresh tokens in small batches; returns rows removed."""
+    removed = 0
+    while True:
+        async with async_session() as session:
+            batch = (
+                select(RefreshToken.id)
+                .where(or_(RefreshToken.expires_at < datetime.utcnow(), RefreshToken.is_revoked == True))
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await session.execute(delete(RefreshToken).where(RefreshToken.id.in_(batch)))
             await session.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    logger.info("Refresh token sweep removed %d rows", removed)
+    return removed
+
+
+refresh_token_sweeper = PeriodicTask(
+    "refresh-token-sweeper",
+    sweep_refresh_tokens,
+    settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS,
+)
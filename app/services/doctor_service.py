@@ -1,13 +1,23 @@
+import json
 from fastapi import HTTPException
 from sqlalchemy import select
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime
 
-from app.db.session import async_session
 from app.models.user import User, UserRole
 from app.models.doctor import Doctor
 from app.models.appointment import Appointment
-from app.models.enums import AppointmentStatus
+from app.core.config import settings
 from app.core.security import get_password_hash
+from app.core.principal import invalidate_principal
+from app.core.response_cache import response_cache
+from app.db.routing import replica_router
+from app.services.schedule_service import invalidate_schedule
+from app.services.appointment_service import APPOINTMENT_ORDER, appointment_key, serialize_appointment
+from app.services.appointment_state import transition_appointment
+from app.services.stats_service import get_doctor_stats, doctor_stats_tag
+from app.utils.loaders import DoctorNameLoader
+from app.utils.pagination import paginate, make_page
 
 
 def parse_dob(dob: str | None):
@@ -20,6 +30,7 @@ def parse_dob(dob: str | None):
 
 
 async def create_doctor_by_admin(
+    session,
     name: str,
     email: str,
     password: str,
@@ -31,194 +42,232 @@ async def create_doctor_by_admin(
     consultation_fee: float = None,
     image_url: str = None
 ):
-    async with async_session() as session:
-        exists = await session.execute(select(User).where(User.email == email))
-        if exists.scalar_one_or_none():
-            raise HTTPException(status_code=400, detail="Email already exists")
-
-        user = User(
-            name=name,
-            email=email,
-            password=get_password_hash(password),
-            role=UserRole.DOCTOR,
-            dob=parse_dob(dob),
-            gender=gender.upper() if gender else None,
-            is_active=True
-        )
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
-
-        doctor = Doctor(
-            user_id=user.id,
-            speciality=speciality,
-            experience_years=experience_years,
-            about=about,
-            consultation_fee=consultation_fee,
-            image_url=image_url,
-            is_available=True
-        )
-        session.add(doctor)
-        await session.commit()
-        await session.refresh(doctor)
-        return doctor
-
-
-async def list_doctors(skip: int = 0, limit: int = 100):
-    async with async_session() as session:
-        result = await session.execute(
-            select(Doctor).offset(skip).limit(limit)
-        )
-        return result.scalars().all()
-
-
-async def change_availability(doctor_id: int, is_available: bool):
-    async with async_session() as session:
-        result = await session.execute(select(Doctor).where(Doctor.id == doctor_id))
-        doctor = result.scalar_one_or_none()
-        if not doctor:
-            raise HTTPException(status_code=404, detail="Doctor not found")
-        doctor.is_available = is_available
-        await session.commit()
-        await session.refresh(doctor)
-        return doctor
-
-
-async def get_doctor_profile(user_id: int):
-    async with async_session() as session:
-        result = await session.execute(select(Doctor).where(Doctor.user_id == user_id))
-        doctor = result.scalar_one_or_none()
-        if not doctor:
-            raise HTTPException(status_code=404, detail="Doctor not found")
-
-        user = await session.get(User, user_id)
-
-        return {
-            "id": doctor.id,
-            "user_id": user.id,
-            "name": user.name,
-            "speciality": doctor.speciality,
-            "experience_years": doctor.experience_years,
-            "about": doctor.about,
-            "consultation_fee": doctor.consultation_fee,
-            "image_url": doctor.image_url,
-            "is_available": doctor.is_available
-        }
-
-
-async def update_doctor_profile(user_id: int, data):
-    async with async_session() as session:
-        result = await session.execute(select(Doctor).where(Doctor.user_id == user_id))
-        doctor = result.scalar_one_or_none()
-        if not doctor:
-            raise HTTPException(status_code=404, detail="Doctor not found")
-
-        for key, value in data.model_dump(exclude_unset=True).items():
-            setattr(doctor, key, value)
-
-        await session.commit()
-        await session.refresh(doctor)
-
-        user = await session.get(User, user_id)
-
-        return {
-            "id": doctor.id,
-            "user_id": user.id,
-            "name": user.name,
-            "speciality": doctor.speciality,
-            "experience_years": doctor.experience_years,
-            "about": doctor.about,
-            "consultation_fee": doctor.consultation_fee,
-            "image_url": doctor.image_url,
-            "is_available": doctor.is_available
-        }
-
-
-async def list_doctor_appointments(doctor_user):
-    async with async_session() as session:
-        result = await session.execute(
-            select(Appointment).where(Appointment.doctor_id == doctor_user.id)
-        )
-        return result.scalars().all()
-
-
-async def complete_appointment(doctor_user, appointment_id: int):
-    async with async_session() as session:
-        result = await session.execute(
-            select(Appointment).where(
-                Appointment.id == appointment_id,
-                Appointment.doctor_id == doctor_user.id
-            )
-        )
-        appointment = result.scalar_one_or_none()
-        if not appointment:
-            raise HTTPException(status_code=404, detail="Appointment not found")
-
-        appointment.status = AppointmentStatus.COMPLETED
-        await session.commit()
-        await session.refresh(appointment)
-        return appointment
-
-
-async def get_doctor_dashboard(doctor_user):
-    async with async_session() as session:
-        total = await session.execute(
-            select(Appointment).where(Appointment.doctor_id == doctor_user.id)
-        )
-        today = await session.execute(
-            select(Appointment).where(
-                Appointment.doctor_id == doctor_user.id,
-                Appointment.appointment_date == datetime.today().date()
-            )
-        )
-        cancelled = await session.execute(
-            select(Appointment).where(
-                Appointment.doctor_id == doctor_user.id,
-                Appointment.status == AppointmentStatus.CANCELLED
-            )
-        )
-        paid = await session.execute(
-            select(Appointment).where(
-                Appointment.doctor_id == doctor_user.id,
-                Appointment.payment_status == "PAID"
-            )
+    exists = await session.execute(select(User).where(User.email == email))
+    if exists.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="Email already exists")
+    await session.commit()  # release the connection while bcrypt runs
+
+    user = User(
+        name=name,
+        email=email,
+        password=await get_password_hash(password),
+        role=UserRole.DOCTOR,
+        dob=parse_dob(dob),
+        gender=gender.upper() if gender else None,
+        is_active=True
+    )
+    session.add(user)
+    try:
+        await session.flush()
+    except IntegrityError:
+        # Registered concurrently while the hash was computed
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Email already exists")
+
+    doctor = Doctor(
+        user_id=user.id,
+        speciality=speciality,
+        experience_years=experience_years,
+        about=about,
+        consultation_fee=consultation_fee,
+        image_url=image_url,
+        is_available=True
+    )
+    session.add(doctor)
+    await session.commit()
+    await session.refresh(doctor)
+    return doctor
+
+
+async def list_doctors(session, skip: int = 0, limit: int = 100, cursor: str | None = None):
+    result = await session.execute(
+        paginate(select(Doctor), (Doctor.id,), cursor=cursor, limit=limit, skip=skip)
+    )
+    return make_page(result.scalars().all(), limit, lambda d: (d.id,))
+
+
+async def change_availability(session, doctor_id: int, is_available: bool):
+    result = await session.execute(select(Doctor).where(Doctor.id == doctor_id))
+    doctor = result.scalar_one_or_none()
+    if not doctor:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+    doctor.is_available = is_available
+    await session.commit()
+    await session.refresh(doctor)
+    invalidate_principal(doctor.user_id)
+    invalidate_schedule(doctor.id)
+    return doctor
+
+
+async def get_doctor_profile(session, user_id: int):
+    result = await session.execute(select(Doctor).where(Doctor.user_id == user_id))
+    doctor = result.scalar_one_or_none()
+    if not doctor:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+
+    user = doctor.user
+
+    return {
+        "id": doctor.id,
+        "user_id": user.id,
+        "name": user.name,
+        "speciality": doctor.speciality,
+        "experience_years": doctor.experience_years,
+        "about": doctor.about,
+        "consultation_fee": doctor.consultation_fee,
+        "image_url": doctor.image_url,
+        "is_available": doctor.is_available
+    }
+
+
+async def update_doctor_profile(session, user_id: int, data):
+    result = await session.execute(select(Doctor).where(Doctor.user_id == user_id))
+    doctor = result.scalar_one_or_none()
+    if not doctor:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+
+    for key, value in data.model_dump(exclude_unset=True).items():
+        setattr(doctor, key, value)
+
+    await session.commit()
+    await session.refresh(doctor)
+    invalidate_principal(user_id)
+
+    user = await session.get(User, user_id)
+
+    return {
+        "id": doctor.id,
+        "user_id": user.id,
+        "name": user.name,
+        "speciality": doctor.speciality,
+        "experience_years": doctor.experience_years,
+        "about": doctor.about,
+        "consultation_fee": doctor.consultation_fee,
+        "image_url": doctor.image_url,
+        "is_available": doctor.is_available
+    }
+
+
+# ---------- AGENDA ----------
+AGENDA_COLUMNS = (
+    Appointment.id,
+    Appointment.doctor_id,
+    Appointment.appointment_date,
+    Appointment.appointment_time,
+    Appointment.status,
+    Appointment.payment_status
+)
+
+
+def doctor_agenda_query(doctor_id: int, from_date=None, to_date=None, statuses=None):
+    stmt = select(*AGENDA_COLUMNS).where(Appointment.doctor_id == doctor_id)
+    if from_date is not None:
+        stmt = stmt.where(Appointment.appointment_date >= from_date)
+    if to_date is not None:
+        stmt = stmt.where(Appointment.appointment_date <= to_date)
+    if statuses:
+        stmt = stmt.where(Appointment.status.in_([getattr(s, "value", s) for s in statuses]))
+    return stmt
+
+
+async def list_doctor_appointments(
+    session,
+    doctor_user,
+    limit: int = 50,
+    cursor: str | None = None,
+    from_date=None,
+    to_date=None,
+    statuses=None
+):
+    stmt = paginate(
+        doctor_agenda_query(doctor_user.doctor_id, from_date, to_date, statuses),
+        APPOINTMENT_ORDER, cursor=cursor, limit=limit
+    )
+    result = await session.execute(stmt)
+    page = make_page(result.all(), limit, appointment_key)
+
+    doctor_name = await DoctorNameLoader.for_session(session).load(doctor_user.doctor_id)
+    page["items"] = [serialize_appointment(row, doctor_name) for row in page["items"]]
+    return page
+
+
+async def stream_doctor_appointments(session_factory, doctor_id: int, from_date=None, to_date=None, statuses=None):
+    """
+    Yield the agenda as NDJSON from a server-side cursor, one chunk per
+    fetched batch, so memory stays flat however long the history is.
+    Uses its own session because it outlives the request's dependencies.
+    """
+    stmt = (
+        doctor_agenda_query(doctor_id, from_date, to_date, statuses)
+        .order_by(*APPOINTMENT_ORDER)
+        .execution_options(yield_per=settings.AGENDA_STREAM_BATCH_SIZE)
+    )
+    async with session_factory() as session:
+        doctor_name = await DoctorNameLoader.for_session(session).load(doctor_id)
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            yield "".join(json.dumps(serialize_appointment(row, doctor_name)) + "\n" for row in rows)
+
+
+async def complete_appointment(session, doctor_user, appointment_id: int):
+    row = await transition_appointment(
+        session, appointment_id, "complete", doctor_id=doctor_user.doctor_id
+    )
+    replica_router.record_write(doctor_user.id)
+    return serialize_appointment(row, row.doctor_name)
+
+
+async def get_doctor_dashboard(session, doctor_user):
+    today = date.today()
+    return await response_cache.get_or_compute(
+        ("doctor_dashboard", doctor_user.id, today),
+        (doctor_stats_tag(doctor_user.doctor_id),),
+        lambda: _compute_doctor_dashboard(session, doctor_user.doctor_id)
+    )
+
+
+async def _compute_doctor_dashboard(session, doctor_id: int):
+    stats = await get_doctor_stats(session, doctor_id)
+    return {
+        "total_appointments": stats["total_appointments"],
+        "today_appointments": stats["today_appointments"],
+        "cancelled_appointments": stats["cancelled_appointments"],
+        "paid_appointments": stats["paid_appointments"],
+        "booked_appointments": stats["booked_appointments"],
+        "completed_appointments": stats["completed_appointments"]
+    }
+
+
+async def list_public_doctors(session, limit: int = 100, cursor: str | None = None):
+    stmt = paginate(
+        select(
+            Doctor.id,
+            Doctor.speciality,
+            Doctor.experience_years,
+            Doctor.about,
+            Doctor.consultation_fee,
+            Doctor.image_url,
+            Doctor.is_available,
+            User.name
         )
-
-        return {
-            "total_appointments": len(total.scalars().all()),
-            "today_appointments": len(today.scalars().all()),
-            "cancelled_appointments": len(cancelled.scalars().all()),
-            "paid_appointments": len(paid.scalars().all())
+        .join(User, User.id == Doctor.user_id)
+        .where(User.is_active == True),
+        (Doctor.id,), cursor=cursor, limit=limit
+    )
+    result = await session.execute(stmt)
+    page = make_page(result.all(), limit, lambda row: (row.id,))
+
+    page["items"] = [
+        {
+            "id": row.id,
+            "name": row.name,
+            "speciality": row.speciality,
+            "experience_years": row.experience_years,
+            "about": row.about,
+            "consultation_fee": row.consultation_fee,
+            "image_url": row.image_url,
+            "is_available": row.is_available
         }
-
-
-async def list_public_doctors():
-    async with async_session() as session:
-        result = await session.execute(
-            select(
-                Doctor.id,
-                Doctor.speciality,
-                Doctor.experience_years,
-                Doctor.about,
-                Doctor.consultation_fee,
-                Doctor.image_url,
-                Doctor.is_available,
-                User.name
-            )
-            .join(User, User.id == Doctor.user_id)
-            .where(User.is_active == True)
-        )
-
-        return [
-            {
-                "id": row.id,
-                "name": row.name,
-                "speciality": row.speciality,
-                "experience_years": row.experience_years,
-                "about": row.about,
-                "consultation_fee": row.consultation_fee,
-                "image_url": row.image_url,
-                "is_available": row.is_available
-            }
-            for row in result.all()
-        ]
+        for row in page["items"]
+    ]
+    return page
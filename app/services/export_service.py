@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.models.appointment import Appointment
+from app.models.payment import Payment
+from app.services.appointment_service import APPOINTMENT_ORDER
+
+APPOINTMENT_EXPORT_COLUMNS = (
+    Appointment.id,
+    Appointment.user_id,
+    Appointment.doctor_id,
+    Appointment.appointment_date,
+    Appointment.appointment_time,
+    Appointment.status,
+    Appointment.payment_status,
+    Appointment.created_at,
+)
+
+PAYMENT_EXPORT_COLUMNS = (
+    Payment.id,
+    Payment.appointment_id,
+    Appointment.user_id,
+    Appointment.doctor_id,
+    Appointment.appointment_date,
+    Payment.amount,
+    Payment.method,
+    Payment.status,
+    Payment.created_at,
+)
+
+
+def _check_range(from_date, to_date):
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+
+
+def appointment_export_query(from_date=None, to_date=None, statuses=None):
+    """Appointments dated from..to (inclusive), in agenda order."""
+    _check_range(from_date, to_date)
+    stmt = select(*APPOINTMENT_EXPORT_COLUMNS)
+    if from_date is not None:
+        stmt = stmt.where(Appointment.appointment_date >= from_date)
+    if to_date is not None:
+        stmt = stmt.where(Appointment.appointment_date <= to_date)
+    if statuses:
+        stmt = stmt.where(Appointment.status.in_([getattr(s, "value", s) for s in statuses]))
+    return stmt.order_by(*APPOINTMENT_ORDER)
+
+
+def payment_export_query(from_date=None, to_date=None, statuses=None):
+    """Payments created from..to (inclusive), in id order."""
+    _check_range(from_date, to_date)
+    stmt = select(*PAYMENT_EXPORT_COLUMNS).join(Appointment, Appointment.id == Payment.appointment_id)
+    if from_date is not None:
+        stmt = stmt.where(Payment.created_at >= from_date)
+    if to_date is not None:
+        stmt = stmt.where(Payment.created_at < to_date + timedelta(days=1))
+    if statuses:
+        stmt = stmt.where(Payment.status.in_([getattr(s, "value", s) for s in statuses]))
+    return stmt.order_by(Payment.id)
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_export(session_factory, stmt, format: str = "csv"):
+    """
+    Yield `stmt` as CSV (with a header row) or NDJSON from a server-side
+    cursor, one chunk per fetched batch, so memory stays flat whatever the
+    row count. Uses its own session because it outlives the request's
+    dependencies.
+    """
+    stmt = stmt.execution_options(yield_per=settings.EXPORT_STREAM_BATCH_SIZE)
+    async with session_factory() as session:
+        # Each FETCH is short, but the sort behind a full export is not
+        await session.execute(text("SET LOCAL statement_timeout = 0"))
+        result = await session.stream(stmt)
+        keys = list(result.keys())
+        if format == "csv":
+            yield _csv_chunk([keys])
+        async for rows in result.partitions():
+            if format == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield "".join(
+                    json.dumps({key: _json_value(value) for key, value in zip(keys, row)}) + "\n"
+                    for row in rows
+                )
@@ -0,0 +1,186 @@
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, func, literal, BigInteger, Date, Time, DateTime
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.booking_ledger import booking_ledger
+from app.core.config import settings
+from app.core.events import event_bus, APPOINTMENT_BOOKED
+from app.core.tasks import DeadlineTimer, PeriodicTask
+from app.db.routing import replica_router
+from app.db.session import async_session
+from app.models.appointment import Appointment, ACTIVE_SLOT
+from app.models.doctor import Doctor
+from app.models.slot_hold import SlotHold
+from app.services.appointment_service import book_slot, serialize_appointment
+from app.services.stats_service import record_appointment_changes
+from app.utils.permissions import check_role
+
+logger = logging.getLogger(__name__)
+
+
+def _serialize_hold(row) -> dict:
+    return {
+        "id": row.id,
+        "doctor_id": row.doctor_id,
+        "appointment_date": row.appointment_date,
+        "appointment_time": row.appointment_time,
+        "expires_at": row.expires_at
+    }
+
+
+# ---------- EXPIRY ----------
+async def expire_holds(hold_ids: list) -> int:
+    """Delete holds whose deadline passed; a hold taken over since then has a later expiry and survives."""
+    async with async_session() as session:
+        result = await session.execute(
+            delete(SlotHold).where(SlotHold.id.in_(hold_ids), SlotHold.expires_at <= datetime.utcnow())
+        )
+        await session.commit()
+    return result.rowcount
+
+
+async def sweep_expired_holds() -> int:
+    """Catch-all for holds whose timer lived in a worker that has since stopped."""
+    async with async_session() as session:
+        result = await session.execute(delete(SlotHold).where(SlotHold.expires_at <= datetime.utcnow()))
+        await session.commit()
+    if result.rowcount:
+        logger.info("Slot hold sweep removed %d rows", result.rowcount)
+    return result.rowcount
+
+
+async def load_pending_holds() -> int:
+    """Re-arm the timer for live holds after a restart."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(SlotHold.id, SlotHold.expires_at).where(SlotHold.expires_at > datetime.utcnow())
+        )
+        rows = result.all()
+    for hold_id, expires_at in rows:
+        hold_timer.schedule(hold_id, expires_at)
+    return len(rows)
+
+
+hold_timer = DeadlineTimer("slot-hold-timer", expire_holds)
+
+slot_hold_sweeper = PeriodicTask(
+    "slot-hold-sweeper",
+    sweep_expired_holds,
+    settings.SLOT_HOLD_SWEEP_INTERVAL_SECONDS,
+)
+
+
+# ---------- HOLD / CONFIRM / RELEASE ----------
+async def create_hold(session, user, doctor_id: int, appointment_date, appointment_time):
+    check_role(user, ["USER"])
+
+    if booking_ledger.is_taken(doctor_id, appointment_date, appointment_time):
+        raise HTTPException(status_code=409, detail="Slot already booked")
+
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=settings.SLOT_HOLD_SECONDS)
+
+    slot_booked = select(Appointment.id).where(
+        Appointment.doctor_id == Doctor.id,
+        Appointment.appointment_date == appointment_date,
+        Appointment.appointment_time == appointment_time,
+        ACTIVE_SLOT
+    )
+    active_holds = (
+        select(func.count())
+        .select_from(SlotHold)
+        .where(SlotHold.user_id == user.id, SlotHold.expires_at > now)
+        .scalar_subquery()
+    )
+    source = select(
+        literal(user.id, BigInteger),
+        Doctor.id,
+        literal(appointment_date, Date),
+        literal(appointment_time, Time),
+        literal(expires_at, DateTime),
+        literal(now, DateTime)
+    ).where(
+        Doctor.id == doctor_id,
+        Doctor.is_available == True,
+        ~slot_booked.exists(),
+        active_holds < settings.SLOT_HOLD_MAX_PER_USER
+    )
+
+    # Only an expired hold is taken over in place; a live one, even the
+    # caller's own, is not renewed, so nobody can block a slot indefinitely
+    stmt = insert(SlotHold).from_select(
+        ["user_id", "doctor_id", "appointment_date", "appointment_time", "expires_at", "created_at"],
+        source
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["doctor_id", "appointment_date", "appointment_time"],
+        set_={
+            "user_id": stmt.excluded.user_id,
+            "expires_at": stmt.excluded.expires_at,
+            "created_at": stmt.excluded.created_at
+        },
+        where=SlotHold.expires_at <= now
+    ).returning(*SlotHold.__table__.c)
+
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        doctor = (await session.execute(
+            select(Doctor.is_available, active_holds.label("active_holds")).where(Doctor.id == doctor_id)
+        )).first()
+        if doctor is None:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+        if not doctor.is_available:
+            raise HTTPException(status_code=409, detail="Doctor is not available")
+        if doctor.active_holds >= settings.SLOT_HOLD_MAX_PER_USER:
+            raise HTTPException(status_code=409, detail="Too many active holds")
+        raise HTTPException(status_code=409, detail="Slot already booked or held")
+
+    await session.commit()
+    hold_timer.schedule(row.id, row.expires_at)
+    return _serialize_hold(row)
+
+
+async def confirm_hold(session, user, hold_id: int):
+    check_role(user, ["USER"])
+
+    # Consuming the hold and inserting the appointment share one transaction,
+    # so other bookers keep seeing the hold until the appointment is visible
+    result = await session.execute(
+        delete(SlotHold)
+        .where(
+            SlotHold.id == hold_id,
+            SlotHold.user_id == user.id,
+            SlotHold.expires_at > datetime.utcnow()
+        )
+        .returning(SlotHold.doctor_id, SlotHold.appointment_date, SlotHold.appointment_time)
+    )
+    hold = result.first()
+    if hold is None:
+        raise HTTPException(status_code=410, detail="Hold expired or not found")
+
+    row = await book_slot(session, user.id, hold.doctor_id, hold.appointment_date, hold.appointment_time)
+    await record_appointment_changes(session, hold.doctor_id, [(row.appointment_date, row.status, 1, 0)])
+    await session.commit()
+    hold_timer.cancel(hold_id)
+    booking_ledger.mark_booked(hold.doctor_id, hold.appointment_date, hold.appointment_time)
+    replica_router.record_write(user.id)
+    event_bus.publish(APPOINTMENT_BOOKED, doctor_id=hold.doctor_id, appointment_id=row.id)
+    return serialize_appointment(row, row.doctor_name)
+
+
+async def release_hold(session, user, hold_id: int):
+    check_role(user, ["USER"])
+
+    result = await session.execute(
+        delete(SlotHold)
+        .where(SlotHold.id == hold_id, SlotHold.user_id == user.id)
+        .returning(SlotHold.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    await session.commit()
+    hold_timer.cancel(hold_id)
+    return {"detail": "Hold released"}
@@ -0,0 +1,232 @@
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, literal, cast, union_all, Time
+
+from app.core.booking_ledger import booking_ledger
+from app.core.config import settings
+from app.db.session import engine
+from app.models.appointment import Appointment, ACTIVE_SLOT
+from app.models.doctor import Doctor
+from app.models.doctor_schedule import DoctorSchedule, DoctorScheduleException
+from app.models.slot_hold import SlotHold
+from app.utils.cache import TTLCache
+from app.utils.slots import GRANULARITY_MINUTES, compute_free_slots, to_minutes
+
+# doctor_id -> (is_available, {weekday: [(start_min, end_min, slot_minutes)]})
+schedule_cache = TTLCache(
+    maxsize=settings.SCHEDULE_CACHE_MAX_SIZE,
+    ttl=settings.SCHEDULE_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_schedule(doctor_id: int):
+    schedule_cache.invalidate(doctor_id)
+
+
+def _check_window(start, end):
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+    if to_minutes(start) % GRANULARITY_MINUTES or to_minutes(end) % GRANULARITY_MINUTES or start.second or end.second:
+        raise HTTPException(status_code=400, detail=f"Times must be on a {GRANULARITY_MINUTES}-minute boundary")
+
+
+# ---------- WEEKLY TEMPLATE ----------
+async def _load_template(session, doctor_id: int):
+    cached = schedule_cache.get(doctor_id)
+    if cached is not None:
+        return cached
+
+    result = await session.execute(
+        select(
+            Doctor.is_available,
+            DoctorSchedule.weekday,
+            DoctorSchedule.start_time,
+            DoctorSchedule.end_time,
+            DoctorSchedule.slot_minutes
+        )
+        .outerjoin(DoctorSchedule, DoctorSchedule.doctor_id == Doctor.id)
+        .where(Doctor.id == doctor_id)
+        .order_by(DoctorSchedule.weekday, DoctorSchedule.start_time)
+    )
+    rows = result.all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+
+    template = defaultdict(list)
+    for row in rows:
+        if row.weekday is not None:
+            template[row.weekday].append(
+                (to_minutes(row.start_time), to_minutes(row.end_time), row.slot_minutes)
+            )
+    cached = (bool(rows[0].is_available), dict(template))
+    schedule_cache.set(doctor_id, cached)
+    return cached
+
+
+async def get_schedule(session, doctor_id: int):
+    windows = await session.execute(
+        select(DoctorSchedule)
+        .where(DoctorSchedule.doctor_id == doctor_id)
+        .order_by(DoctorSchedule.weekday, DoctorSchedule.start_time)
+    )
+    exceptions = await session.execute(
+        select(DoctorScheduleException)
+        .where(
+            DoctorScheduleException.doctor_id == doctor_id,
+            DoctorScheduleException.date >= date.today()
+        )
+        .order_by(DoctorScheduleException.date)
+    )
+    return {
+        "windows": windows.scalars().all(),
+        "exceptions": exceptions.scalars().all()
+    }
+
+
+async def replace_schedule(session, doctor_id: int, windows):
+    by_day = defaultdict(list)
+    for window in windows:
+        _check_window(window.start_time, window.end_time)
+        if window.slot_minutes % GRANULARITY_MINUTES:
+            raise HTTPException(status_code=400, detail=f"slot_minutes must be a multiple of {GRANULARITY_MINUTES}")
+        by_day[window.weekday].append(window)
+
+    for day_windows in by_day.values():
+        day_windows.sort(key=lambda w: w.start_time)
+        for earlier, later in zip(day_windows, day_windows[1:]):
+            if later.start_time < earlier.end_time:
+                raise HTTPException(status_code=400, detail="Schedule windows overlap")
+
+    await session.execute(delete(DoctorSchedule).where(DoctorSchedule.doctor_id == doctor_id))
+    session.add_all([
+        DoctorSchedule(
+            doctor_id=doctor_id,
+            weekday=w.weekday,
+            start_time=w.start_time,
+            end_time=w.end_time,
+            slot_minutes=w.slot_minutes
+        )
+        for w in windows
+    ])
+    await session.commit()
+    invalidate_schedule(doctor_id)
+    return await get_schedule(session, doctor_id)
+
+
+async def add_schedule_exception(session, doctor_id: int, data):
+    if (data.start_time is None) != (data.end_time is None):
+        raise HTTPException(status_code=400, detail="Give both start_time and end_time, or neither for a full day")
+    if data.start_time is not None:
+        _check_window(data.start_time, data.end_time)
+
+    exception = DoctorScheduleException(
+        doctor_id=doctor_id,
+        date=data.date,
+        start_time=data.start_time,
+        end_time=data.end_time,
+        reason=data.reason
+    )
+    session.add(exception)
+    await session.commit()
+    await session.refresh(exception)
+    return exception
+
+
+async def delete_schedule_exception(session, doctor_id: int, exception_id: int):
+    result = await session.execute(
+        delete(DoctorScheduleException)
+        .where(
+            DoctorScheduleException.id == exception_id,
+            DoctorScheduleException.doctor_id == doctor_id
+        )
+        .returning(DoctorScheduleException.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Schedule exception not found")
+    await session.commit()
+    return {"detail": "Schedule exception deleted"}
+
+
+# ---------- FREE SLOTS ----------
+async def get_free_slots(session, doctor_id: int, from_date: date | None = None, to_date: date | None = None):
+    from_date = from_date or date.today()
+    to_date = to_date or from_date + timedelta(days=6)
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days >= settings.SLOT_SEARCH_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {settings.SLOT_SEARCH_MAX_DAYS} days")
+
+    is_available, template = await _load_template(session, doctor_id)
+    if not is_available or not template:
+        return {"doctor_id": doctor_id, "days": []}
+
+    # Booked slots, live holds and exceptions in one round trip; the booked half
+    # is served by the partial unique index on (doctor_id, appointment_date, appointment_time)
+    booked_rows = (
+        select(
+            Appointment.appointment_date.label("day"),
+            Appointment.appointment_time.label("start_time"),
+            cast(None, Time).label("end_time"),
+            literal("booked").label("kind")
+        )
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.appointment_date.between(from_date, to_date),
+            ACTIVE_SLOT
+        )
+    )
+    held_rows = (
+        select(
+            SlotHold.appointment_date,
+            SlotHold.appointment_time,
+            cast(None, Time),
+            literal("held")
+        )
+        .where(
+            SlotHold.doctor_id == doctor_id,
+            SlotHold.appointment_date.between(from_date, to_date),
+            SlotHold.expires_at > datetime.utcnow()
+        )
+    )
+    exception_rows = (
+        select(
+            DoctorScheduleException.date,
+            DoctorScheduleException.start_time,
+            DoctorScheduleException.end_time,
+            literal("off")
+        )
+        .where(
+            DoctorScheduleException.doctor_id == doctor_id,
+            DoctorScheduleException.date.between(from_date, to_date)
+        )
+    )
+    snapshot_at = time.monotonic()
+    result = await session.execute(union_all(booked_rows, held_rows, exception_rows))
+
+    booked = defaultdict(list)
+    taken = defaultdict(list)
+    blocked = defaultdict(list)
+    for day, start, end, kind in result.tuples():
+        if kind == "off":
+            blocked[day].append((None, None) if start is None else (to_minutes(start), to_minutes(end)))
+            continue
+        if kind == "booked":
+            booked[day].append(start)
+        taken[day].append(to_minutes(start))
+
+    # The full booked set per day is in hand, so refresh the booking ledger;
+    # a lagging replica could re-block slots this worker has since freed
+    if session.bind is engine:
+        day = from_date
+        while day <= to_date:
+            booking_ledger.load_day(doctor_id, day, booked.get(day, ()), snapshot_at)
+            day += timedelta(days=1)
+
+    free = compute_free_slots(template, from_date, to_date, taken, blocked)
+    return {
+        "doctor_id": doctor_id,
+        "days": [{"date": day, "slots": slots} for day, slots in free.items() if slots]
+    }
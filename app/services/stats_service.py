@@ -0,0 +1,260 @@
+import logging
+from datetime import date
+
+from sqlalchemy import select, update, func, or_, exists, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.events import event_bus, APPOINTMENT_EVENTS
+from app.core.response_cache import response_cache
+from app.core.tasks import PeriodicTask
+from app.db.locks import AdvisoryLeader
+from app.db.session import async_session
+from app.models.appointment import Appointment
+from app.models.daily_appointment_stats import DailyAppointmentStats
+from app.models.doctor import Doctor
+from app.models.doctor_stats import DoctorStats
+from app.models.enums import AppointmentStatus, PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = (
+    "total_appointments",
+    "booked_appointments",
+    "completed_appointments",
+    "cancelled_appointments",
+    "paid_appointments",
+)
+
+# Appointment status -> the counter that tracks it
+STATUS_COUNTERS = {
+    AppointmentStatus.BOOKED.value: "booked_appointments",
+    AppointmentStatus.COMPLETED.value: "completed_appointments",
+    AppointmentStatus.CANCELLED.value: "cancelled_appointments",
+}
+
+
+def counted_columns():
+    """COUNT(*) FILTER (...) over appointments, one column per counter."""
+    return (
+        func.count().label("total_appointments"),
+        func.count().filter(Appointment.status == AppointmentStatus.BOOKED.value).label("booked_appointments"),
+        func.count().filter(Appointment.status == AppointmentStatus.COMPLETED.value).label("completed_appointments"),
+        func.count().filter(Appointment.status == AppointmentStatus.CANCELLED.value).label("cancelled_appointments"),
+        func.count().filter(Appointment.payment_status == PaymentStatus.PAID.value).label("paid_appointments"),
+    )
+
+
+# ---------- CACHE INVALIDATION ----------
+# Response cache tags for anything computed from these statistics
+ADMIN_STATS_TAG = "stats:admin"
+
+
+def doctor_stats_tag(doctor_id: int) -> str:
+    return f"stats:doctor:{doctor_id}"
+
+
+def _invalidate_stats(doctor_id: int, **payload):
+    response_cache.invalidate(ADMIN_STATS_TAG, doctor_stats_tag(doctor_id))
+
+
+for _event in APPOINTMENT_EVENTS:
+    event_bus.subscribe(_event, _invalidate_stats)
+
+
+# ---------- INCREMENTAL UPDATES ----------
+async def bump_doctor_stats(session, doctor_id: int, **deltas: int):
+    """Add `deltas` to the doctor's counters; runs in the caller's transaction."""
+    values = {name: deltas.get(name, 0) for name in COUNTERS}
+    stmt = insert(DoctorStats).values(doctor_id=doctor_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DoctorStats.doctor_id],
+        set_={
+            **{name: getattr(DoctorStats, name) + getattr(stmt.excluded, name) for name, delta in values.items() if delta},
+            "updated_at": func.now()
+        }
+    )
+    await session.execute(stmt)
+
+
+async def bump_daily_stats(session, doctor_id: int, changes: dict):
+    """Add {(date, status): (appointments, paid)} deltas to the daily rollup."""
+    rows = [
+        {"date": day, "doctor_id": doctor_id, "status": status, "appointments": count, "paid_appointments": paid}
+        for (day, status), (count, paid) in changes.items()
+        if count or paid
+    ]
+    if not rows:
+        return
+    stmt = insert(DailyAppointmentStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyAppointmentStats.date, DailyAppointmentStats.doctor_id, DailyAppointmentStats.status],
+        set_={
+            "appointments": DailyAppointmentStats.appointments + stmt.excluded.appointments,
+            "paid_appointments": DailyAppointmentStats.paid_appointments + stmt.excluded.paid_appointments
+        }
+    )
+    await session.execute(stmt)
+
+
+async def record_appointment_changes(session, doctor_id: int, changes):
+    """
+    Apply (date, status, appointments, paid) deltas for one doctor to both
+    the daily rollup and doctor_stats, in the caller's transaction.
+    """
+    daily = {}
+    counters = dict.fromkeys(COUNTERS, 0)
+    for day, status, count, paid in changes:
+        previous_count, previous_paid = daily.get((day, status), (0, 0))
+        daily[(day, status)] = (previous_count + count, previous_paid + paid)
+        counters["total_appointments"] += count
+        counters[STATUS_COUNTERS[status]] += count
+        counters["paid_appointments"] += paid
+    await bump_daily_stats(session, doctor_id, daily)
+    await bump_doctor_stats(session, doctor_id, **counters)
+
+
+def status_change(row, previous: str, current: str) -> list:
+    """Changes that move one appointment (and its payment) between statuses."""
+    paid = int(row.payment_status == PaymentStatus.PAID.value)
+    return [
+        (row.appointment_date, previous, -1, -paid),
+        (row.appointment_date, current, 1, paid),
+    ]
+
+
+# ---------- READS ----------
+async def get_doctor_stats(session, doctor_id: int) -> dict:
+    today = date.today()
+    today_count = (
+        select(func.count())
+        .select_from(Appointment)
+        .where(Appointment.doctor_id == doctor_id, Appointment.appointment_date == today)
+        .scalar_subquery()
+    )
+    row = (await session.execute(
+        select(*(getattr(DoctorStats, name) for name in COUNTERS), today_count.label("today_appointments"))
+        .where(DoctorStats.doctor_id == doctor_id)
+    )).first()
+    if row is None:
+        row = await count_doctor_stats(session, doctor_id, today)
+    return dict(row._mapping)
+
+
+async def count_doctor_stats(session, doctor_id: int, today: date | None = None):
+    """Reconciliation path: every counter from one COUNT(*) FILTER scan."""
+    today = today or date.today()
+    result = await session.execute(
+        select(
+            *counted_columns(),
+            func.count().filter(Appointment.appointment_date == today).label("today_appointments")
+        )
+        .where(Appointment.doctor_id == doctor_id)
+    )
+    return result.first()
+
+
+# ---------- REPAIR ----------
+async def _reconcile_doctor(session, doctor_id: int) -> bool:
+    """Recount one doctor under its counter row lock; True if it had drifted."""
+    # The row lock makes concurrent bumps wait until the recount commits. A
+    # bump already holding it commits first, and the COUNT's fresh snapshot
+    # then includes that change, so no increment is lost either way.
+    await session.execute(insert(DoctorStats).values(doctor_id=doctor_id).on_conflict_do_nothing())
+    stored = (await session.execute(
+        select(*(getattr(DoctorStats, name) for name in COUNTERS))
+        .where(DoctorStats.doctor_id == doctor_id)
+        .with_for_update()
+    )).first()
+    counted = (await session.execute(
+        select(*counted_columns()).where(Appointment.doctor_id == doctor_id)
+    )).first()
+    if tuple(stored) == tuple(counted):
+        return False
+    await session.execute(
+        update(DoctorStats)
+        .where(DoctorStats.doctor_id == doctor_id)
+        .values(**counted._mapping, updated_at=func.now())
+    )
+    return True
+
+
+async def reconcile_doctor_stats() -> int:
+    """
+    Recount every doctor, one short transaction each, and overwrite counters
+    that drifted; returns how many doctors were repaired.
+    """
+    repaired = []
+    async with async_session() as session:
+        doctor_ids = (await session.execute(select(Doctor.id).order_by(Doctor.id))).scalars().all()
+        await session.commit()
+        for doctor_id in doctor_ids:
+            # A doctor with a very long history can outlast the request-sized timeout
+            await session.execute(text("SET LOCAL statement_timeout = 0"))
+            if await _reconcile_doctor(session, doctor_id):
+                repaired.append(doctor_id)
+            await session.commit()
+
+    if repaired:
+        logger.warning("doctor_stats drift repaired for %d doctors", len(repaired))
+        for doctor_id in repaired:
+            _invalidate_stats(doctor_id)
+    return len(repaired)
+
+
+async def rebuild_daily_stats(session, start: date, end: date) -> int:
+    """
+    Recount the rollup for appointments dated start..end and zero rows with
+    nothing left behind them; the caller commits. Returns the number of
+    rows that had drifted.
+    """
+    counted = (
+        select(
+            Appointment.appointment_date,
+            Appointment.doctor_id,
+            Appointment.status,
+            func.count(),
+            func.count().filter(Appointment.payment_status == PaymentStatus.PAID.value)
+        )
+        .where(Appointment.appointment_date.between(start, end))
+        .group_by(Appointment.appointment_date, Appointment.doctor_id, Appointment.status)
+    )
+    stmt = insert(DailyAppointmentStats).from_select(
+        ["date", "doctor_id", "status", "appointments", "paid_appointments"], counted
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyAppointmentStats.date, DailyAppointmentStats.doctor_id, DailyAppointmentStats.status],
+        set_={
+            "appointments": stmt.excluded.appointments,
+            "paid_appointments": stmt.excluded.paid_appointments
+        },
+        where=or_(
+            DailyAppointmentStats.appointments != stmt.excluded.appointments,
+            DailyAppointmentStats.paid_appointments != stmt.excluded.paid_appointments
+        )
+    ).returning(DailyAppointmentStats.date)
+    written = len((await session.execute(stmt)).all())
+
+    # Rows emptied by status changes stay at zero; only nonzero orphans drifted
+    emptied = await session.execute(
+        update(DailyAppointmentStats)
+        .where(
+            DailyAppointmentStats.date.between(start, end),
+            or_(DailyAppointmentStats.appointments != 0, DailyAppointmentStats.paid_appointments != 0),
+            ~exists().where(
+                Appointment.appointment_date == DailyAppointmentStats.date,
+                Appointment.doctor_id == DailyAppointmentStats.doctor_id,
+                Appointment.status == DailyAppointmentStats.status
+            )
+        )
+        .values(appointments=0, paid_appointments=0)
+    )
+    return written + emptied.rowcount
+
+
+doctor_stats_reconciler = PeriodicTask(
+    "doctor-stats-reconciler",
+    reconcile_doctor_stats,
+    settings.DOCTOR_STATS_RECONCILE_INTERVAL_SECONDS,
+    leader=AdvisoryLeader("doctor-stats-reconciler"),
+)
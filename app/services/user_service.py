@@ -1,6 +1,6 @@
-from app.db.session import async_session
 from sqlalchemy import select
 from app.models.user import User
+from app.core.principal import invalidate_principal
 from typing import Optional
 from fastapi import HTTPException
 from datetime import datetime
@@ -15,20 +15,18 @@ def parse_dob(dob: str | None):
         raise HTTPException(status_code=400, detail="DOB must be in YYYY-MM-DD format")
 
 
-async def get_user_by_id(user_id: int) -> Optional[User]:
-    async with async_session() as session:
-        result = await session.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+async def get_user_by_id(session, user_id: int) -> Optional[User]:
+    result = await session.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
 
 
-async def get_user_by_email(email: str) -> Optional[User]:
-    async with async_session() as session:
-        result = await session.execute(select(User).where(User.email == email))
-        return result.scalar_one_or_none()
+async def get_user_by_email(session, email: str) -> Optional[User]:
+    result = await session.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
 
 
-async def get_user_profile(user_id: int) -> dict | None:
-    user = await get_user_by_id(user_id)
+async def get_user_profile(session, user_id: int) -> dict | None:
+    user = await get_user_by_id(session, user_id)
     if not user:
         return None
     return {
@@ -44,37 +42,47 @@ async def get_user_profile(user_id: int) -> dict | None:
     }
 
 
-async def update_user_profile(user_id: int, data) -> dict | None:
+async def update_user_profile(session, user_id: int, data) -> dict | None:
     """
     `data` is expected to be a Pydantic UserUpdate model.
     """
-    async with async_session() as session:
-        result = await session.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user:
-            return None
-
-        update_data = data.model_dump(exclude_unset=True)
-
-        # Convert dob string to date
-        if "dob" in update_data and update_data["dob"]:
-            update_data["dob"] = parse_dob(update_data["dob"])
-
-        for key, value in update_data.items():
-            setattr(user, key, value)
-
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
-
-        return {
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "phone": user.phone,
-            "dob": user.dob.isoformat() if user.dob else None,
-            "role": user.role,
-            "gender": user.gender,
-            "image_url": user.image_url,
-            "is_active": user.is_active
-        }
+    user = await get_user_by_id(session, user_id)
+    if not user:
+        return None
+
+    update_data = data.model_dump(exclude_unset=True)
+
+    # Convert dob string to date
+    if "dob" in update_data and update_data["dob"]:
+        update_data["dob"] = parse_dob(update_data["dob"])
+
+    for key, value in update_data.items():
+        setattr(user, key, value)
+
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    invalidate_principal(user.id)
+
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "phone": user.phone,
+        "dob": user.dob.isoformat() if user.dob else None,
+        "role": user.role,
+        "gender": user.gender,
+        "image_url": user.image_url,
+        "is_active": user.is_active
+    }
+
+
+async def set_user_active(session, user_id: int, is_active: bool) -> dict:
+    user = await get_user_by_id(session, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.is_active = is_active
+    await session.commit()
+    # The next request re-reads the flag instead of trusting a cached principal
+    invalidate_principal(user.id)
+    return await get_user_profile(session, user.id)
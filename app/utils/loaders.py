@@ -0,0 +1,37 @@
+from sqlalchemy import select
+
+from app.models.doctor import Doctor
+from app.models.user import User
+
+
+class DoctorNameLoader:
+    """
+    Batches doctor-name lookups for a result set into a single query.
+    One loader lives in `session.info`, so names resolved earlier in the
+    same request are not fetched again.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._names: dict[int, str] = {}
+
+    @classmethod
+    def for_session(cls, session) -> "DoctorNameLoader":
+        loader = session.info.get("doctor_name_loader")
+        if loader is None:
+            loader = session.info["doctor_name_loader"] = cls(session)
+        return loader
+
+    async def load_many(self, doctor_ids) -> dict[int, str]:
+        missing = {doctor_id for doctor_id in doctor_ids if doctor_id not in self._names}
+        if missing:
+            result = await self.session.execute(
+                select(Doctor.id, User.name)
+                .join(User, User.id == Doctor.user_id)
+                .where(Doctor.id.in_(missing))
+            )
+            self._names.update(result.tuples().all())
+        return {doctor_id: self._names.get(doctor_id, "Unknown") for doctor_id in doctor_ids}
+
+    async def load(self, doctor_id: int) -> str:
+        return (await self.load_many([doctor_id]))[doctor_id]
@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import date, datetime, time
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+MAX_PAGE_SIZE = 500
+# Cursor values are compared against BIGINT keys; anything wider fails in Postgres
+_BIGINT_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+def _to_json(value):
+    if isinstance(value, (date, time, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(value, python_type):
+    if value is None:
+        return None
+    if python_type in (date, time, datetime):
+        return python_type.fromisoformat(value)
+    if python_type is int:
+        value = int(value)
+        if value not in _BIGINT_RANGE:
+            raise ValueError("cursor value out of range")
+        return value
+    return python_type(value)
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(columns):
+            raise ValueError("cursor length mismatch")
+        return [_from_json(v, col.type.python_type) for v, col in zip(values, columns)]
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(stmt, columns, cursor: str | None = None, limit: int = 10, skip: int = 0):
+    """
+    Order `stmt` by `columns` and fetch one page (plus one look-ahead row).
+    A cursor seeks past the last row of the previous page; `skip` is kept
+    as an OFFSET fallback for older clients.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(*columns).limit(limit + 1)
+
+
+def make_page(rows, limit: int, key) -> dict:
+    """Build `{"items", "next_cursor"}` from rows fetched with `paginate`."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = list(rows)
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(key(items[-1])) if has_more else None,
+    }
@@ -0,0 +1,81 @@
+"""
+Free-slot computation on per-day bitmaps.
+
+A day is an int whose bit `i` covers minutes [5*i, 5*i + 5), so a whole day
+fits in 288 bits and "is this slot free" is two mask operations.
+"""
+from datetime import date, time, timedelta
+
+GRANULARITY_MINUTES = 5
+DEFAULT_SLOT_MINUTES = 30
+
+
+def to_minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def from_minutes(minutes: int) -> time:
+    return time(minutes // 60, minutes % 60)
+
+
+def span_mask(start: int, end: int) -> int:
+    """Bits covering minutes [start, end), widened to whole 5-minute cells."""
+    first = start // GRANULARITY_MINUTES
+    last = -(-end // GRANULARITY_MINUTES)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def _slot_length(windows, minute: int) -> int:
+    for start, end, slot_minutes in windows:
+        if start <= minute < end:
+            return slot_minutes
+    return DEFAULT_SLOT_MINUTES
+
+
+def compute_free_slots(
+    template: dict[int, list[tuple[int, int, int]]],
+    start_date: date,
+    end_date: date,
+    booked: dict[date, list[int]] | None = None,
+    blocked: dict[date, list[tuple[int | None, int | None]]] | None = None,
+) -> dict[date, list[time]]:
+    """
+    `template` maps weekday -> [(start_min, end_min, slot_minutes)], `booked`
+    maps date -> appointment start minutes and `blocked` maps date ->
+    [(start_min, end_min)] exceptions where (None, None) is a day off.
+    Returns the free slot start times for every date in the inclusive range.
+    """
+    booked = booked or {}
+    blocked = blocked or {}
+    free: dict[date, list[time]] = {}
+
+    day = start_date
+    while day <= end_date:
+        windows = template.get(day.weekday(), ())
+        slots: list[time] = []
+
+        working = 0
+        for start, end, _ in windows:
+            working |= span_mask(start, end)
+        for start, end in blocked.get(day, ()):
+            working &= ~(span_mask(0, 24 * 60) if start is None else span_mask(start, end))
+
+        if working:
+            busy = 0
+            for minute in booked.get(day, ()):
+                busy |= span_mask(minute, minute + _slot_length(windows, minute))
+
+            available = working & ~busy
+            for start, end, slot_minutes in windows:
+                for minute in range(start, end - slot_minutes + 1, slot_minutes):
+                    mask = span_mask(minute, minute + slot_minutes)
+                    if available & mask == mask:
+                        slots.append(from_minutes(minute))
+            slots.sort()
+
+        free[day] = slots
+        day += timedelta(days=1)
+
+    return free
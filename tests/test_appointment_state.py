@@ -0,0 +1,112 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import select
+
+from app.models.appointment import Appointment
+from app.models.doctor_stats import DoctorStats
+from app.models.user import User
+from app.services.appointment_service import create_appointment
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2031, 9, 1)
+
+
+@pytest.fixture
+async def booking(db, make_user, make_doctor, principal):
+    """A BOOKED appointment plus headers for its patient, its doctor and an admin."""
+    doctor = await make_doctor()
+    doctor_user = await db.get(User, doctor.user_id)
+    patient = await make_user()
+    row = await create_appointment(db, await principal(patient), doctor.id, DAY, time(9, 0))
+    return {
+        "id": row["id"],
+        "doctor_id": doctor.id,
+        "doctor_name": doctor_user.name,
+        "patient": patient,
+        "doctor_user": doctor_user,
+        "admin": await make_user(role="ADMIN")
+    }
+
+
+async def _state(db, booking) -> tuple:
+    status = await db.scalar(select(Appointment.status).where(Appointment.id == booking["id"]))
+    stats = await db.get(DoctorStats, booking["doctor_id"], populate_existing=True)
+    return status, stats.booked_appointments, stats.completed_appointments, stats.cancelled_appointments
+
+
+async def test_admin_cancel_response_shape(client, booking, auth_headers):
+    response = await client.post(
+        f"/api/admin/appointments/{booking['id']}/cancel", headers=await auth_headers(booking["admin"])
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": booking["id"],
+        "doctor_id": booking["doctor_id"],
+        "doctor_name": booking["doctor_name"],
+        "appointment_date": DAY.isoformat(),
+        "appointment_time": "09:00:00",
+        "status": "CANCELLED",
+        "payment_status": "PENDING"
+    }
+
+
+async def test_double_cancel_is_a_409_and_changes_nothing(client, db, booking, auth_headers):
+    headers = await auth_headers(booking["admin"])
+    url = f"/api/admin/appointments/{booking['id']}/cancel"
+    assert (await client.post(url, headers=headers)).status_code == 200
+    before = await _state(db, booking)
+    assert before == ("CANCELLED", 0, 0, 1)
+
+    response = await client.post(url, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot cancel an appointment that is CANCELLED"
+    # The patient's own cancel takes the same path
+    response = await client.post(
+        f"/api/user/appointments/{booking['id']}/cancel", headers=await auth_headers(booking["patient"])
+    )
+    assert response.status_code == 409
+    assert await _state(db, booking) == before
+
+
+async def test_completed_appointment_cannot_be_cancelled(client, db, booking, auth_headers):
+    response = await client.patch(
+        f"/api/doctor/appointments/{booking['id']}/complete", headers=await auth_headers(booking["doctor_user"])
+    )
+    assert response.status_code == 200
+    before = await _state(db, booking)
+    assert before == ("COMPLETED", 0, 1, 0)
+
+    response = await client.post(
+        f"/api/admin/appointments/{booking['id']}/cancel", headers=await auth_headers(booking["admin"])
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot cancel an appointment that is COMPLETED"
+    assert await _state(db, booking) == before
+
+
+async def test_cancelled_appointment_cannot_be_completed(client, db, booking, auth_headers):
+    await client.post(
+        f"/api/admin/appointments/{booking['id']}/cancel", headers=await auth_headers(booking["admin"])
+    )
+    before = await _state(db, booking)
+
+    response = await client.patch(
+        f"/api/doctor/appointments/{booking['id']}/complete", headers=await auth_headers(booking["doctor_user"])
+    )
+    assert response.status_code == 409
+    assert await _state(db, booking) == before
+
+
+async def test_unknown_or_foreign_appointment_is_a_404(client, booking, make_user, auth_headers):
+    response = await client.post(
+        "/api/admin/appointments/999999999/cancel", headers=await auth_headers(booking["admin"])
+    )
+    assert response.status_code == 404
+
+    stranger = await make_user()
+    response = await client.post(
+        f"/api/user/appointments/{booking['id']}/cancel", headers=await auth_headers(stranger)
+    )
+    assert response.status_code == 404
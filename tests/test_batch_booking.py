@@ -0,0 +1,127 @@
+from datetime import date, time, timedelta
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import func, select
+
+from app.core.booking_ledger import booking_ledger
+from app.core.config import settings
+from app.models.appointment import Appointment
+from app.models.enums import AppointmentStatus, PaymentStatus
+from app.models.slot_hold import SlotHold
+from app.schemas.appointment import RecurrenceRule
+from app.services.appointment_service import create_appointments_batch, expand_recurrence
+from app.services.hold_service import create_hold
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2031, 8, 4)
+A, B, C, D = (DAY, time(9, 0)), (DAY, time(9, 30)), (DAY, time(10, 0)), (DAY, time(10, 30))
+
+
+# ---------- Recurrence ----------
+def test_expand_recurrence_spaces_slots():
+    rule = RecurrenceRule(start_date=DAY, appointment_time=time(9, 0), every_days=14, count=3)
+    assert expand_recurrence(rule) == [
+        (DAY, time(9, 0)), (DAY + timedelta(days=14), time(9, 0)), (DAY + timedelta(days=28), time(9, 0))
+    ]
+
+
+def test_expand_recurrence_caps_the_count():
+    at_cap = RecurrenceRule(start_date=DAY, appointment_time=time(9, 0), count=settings.BATCH_BOOKING_MAX_SLOTS)
+    assert len(expand_recurrence(at_cap)) == settings.BATCH_BOOKING_MAX_SLOTS
+
+    over = RecurrenceRule(start_date=DAY, appointment_time=time(9, 0), count=settings.BATCH_BOOKING_MAX_SLOTS + 1)
+    with pytest.raises(HTTPException) as exc:
+        expand_recurrence(over)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("fields", [{"count": 0}, {"count": 2, "every_days": 0}, {"count": 2, "every_days": 29}])
+def test_recurrence_rule_bounds(fields):
+    with pytest.raises(ValidationError):
+        RecurrenceRule(start_date=DAY, appointment_time=time(9, 0), **fields)
+
+
+# ---------- Batches ----------
+@pytest.fixture
+def ledger():
+    booking_ledger._days.clear()
+    yield booking_ledger
+    booking_ledger._days.clear()
+
+
+@pytest.fixture
+async def contested(db, make_user, make_doctor, principal):
+    """A doctor whose slot A is booked by someone else, B held by someone else and C held by `me`."""
+    doctor = await make_doctor()
+    me, other = await principal(await make_user()), await principal(await make_user())
+    db.add(Appointment(
+        user_id=other.id, doctor_id=doctor.id, appointment_date=A[0], appointment_time=A[1],
+        status=AppointmentStatus.BOOKED.value, payment_status=PaymentStatus.PENDING.value
+    ))
+    await db.commit()
+    await create_hold(db, other, doctor.id, *B)
+    await create_hold(db, me, doctor.id, *C)
+    return doctor.id, me
+
+
+async def _holds(db, doctor_id: int) -> set:
+    result = await db.execute(
+        select(SlotHold.appointment_date, SlotHold.appointment_time).where(SlotHold.doctor_id == doctor_id)
+    )
+    return set(result.tuples().all())
+
+
+async def test_partial_batch_reports_each_slot(db, contested, ledger):
+    doctor_id, me = contested
+    result = await create_appointments_batch(db, me, doctor_id, [A, B, C, D, D])
+
+    assert [r["status"] for r in result["results"]] == ["conflict", "held", "booked", "booked", "duplicate"]
+    ids = [r["appointment_id"] for r in result["results"]]
+    assert ids[0] is None and ids[1] is None and ids[4] is None
+    assert sorted(ids[2:4]) == sorted(row["id"] for row in result["booked"])
+
+    # Only the booked slots are marked; the DB conflict is remembered, the hold is not
+    assert ledger.is_taken(doctor_id, *C) and ledger.is_taken(doctor_id, *D)
+    assert ledger.is_taken(doctor_id, *A)
+    assert not ledger.is_taken(doctor_id, *B)
+
+    # My hold on C went with the booking; the other user's hold on B stays
+    assert await _holds(db, doctor_id) == {B}
+
+
+async def test_all_or_nothing_books_nothing(db, contested, ledger):
+    doctor_id, me = contested
+    with pytest.raises(HTTPException) as exc:
+        await create_appointments_batch(db, me, doctor_id, [A, C, D], all_or_nothing=True)
+
+    assert exc.value.status_code == 409
+    assert [r["status"] for r in exc.value.detail["results"]] == ["conflict", "skipped", "skipped"]
+    assert all(r["appointment_id"] is None for r in exc.value.detail["results"])
+    count = select(func.count()).select_from(Appointment).where(Appointment.doctor_id == doctor_id)
+    assert await db.scalar(count) == 1
+    assert not ledger.is_taken(doctor_id, *C) and not ledger.is_taken(doctor_id, *D)
+    assert await _holds(db, doctor_id) == {B, C}
+
+
+async def test_all_or_nothing_books_everything_when_free(db, make_user, make_doctor, principal, ledger):
+    doctor = await make_doctor()
+    me = await principal(await make_user())
+    result = await create_appointments_batch(db, me, doctor.id, [C, D], all_or_nothing=True)
+    assert [r["status"] for r in result["results"]] == ["booked", "booked"]
+
+
+async def test_batch_limits(db, make_user, make_doctor, principal):
+    doctor = await make_doctor()
+    me = await principal(await make_user())
+    too_many = [(DAY + timedelta(days=n), time(9, 0)) for n in range(settings.BATCH_BOOKING_MAX_SLOTS + 1)]
+    for slots in ([], too_many):
+        with pytest.raises(HTTPException) as exc:
+            await create_appointments_batch(db, me, doctor.id, slots)
+        assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        await create_appointments_batch(db, me, doctor.id + 10_000, [A])
+    assert exc.value.status_code == 404
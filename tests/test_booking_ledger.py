@@ -0,0 +1,169 @@
+from datetime import date, time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+import app.core.booking_ledger as ledger_module
+import app.utils.cache as cache_module
+from app.core.booking_ledger import BookingLedger, booking_ledger
+from app.models.appointment import Appointment
+from app.models.enums import AppointmentStatus, PaymentStatus
+from app.services.appointment_service import create_appointment
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2031, 6, 2)
+NINE, TEN = time(9, 0), time(10, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    monkeypatch.setattr(ledger_module, "clock", clock)
+    return clock
+
+
+@pytest.fixture
+def ledger(clock):
+    return BookingLedger(maxsize=100, ttl=5)
+
+
+def test_unknown_day_is_a_miss(ledger):
+    assert not ledger.knows(1, DAY)
+    assert not ledger.is_taken(1, DAY, NINE)
+    assert ledger.stats()["misses"] == 1
+
+
+def test_load_day_replaces_the_day(ledger, clock):
+    ledger.load_day(1, DAY, [NINE, TEN], as_of=clock.now)
+    assert ledger.knows(1, DAY)
+    assert ledger.is_taken(1, DAY, NINE) and ledger.is_taken(1, DAY, TEN)
+    assert not ledger.is_taken(2, DAY, NINE)
+
+    clock.now += 1
+    ledger.load_day(1, DAY, [TEN], as_of=clock.now)
+    assert not ledger.is_taken(1, DAY, NINE)
+    assert ledger.is_taken(1, DAY, TEN)
+    assert ledger.stats()["loads"] == 2
+
+
+def test_mark_booked_and_mark_free(ledger):
+    ledger.mark_booked(1, DAY, NINE)
+    assert ledger.is_taken(1, DAY, NINE)
+    ledger.mark_free(1, DAY, NINE)
+    assert ledger.knows(1, DAY)
+    assert not ledger.is_taken(1, DAY, NINE)
+
+
+def test_times_with_seconds_are_never_rejected(ledger, clock):
+    ledger.load_day(1, DAY, [time(9, 0, 30)], as_of=clock.now)
+    ledger.mark_booked(1, DAY, time(9, 0, 30))
+    assert not ledger.is_taken(1, DAY, time(9, 0, 30))
+    assert not ledger.is_taken(1, DAY, NINE)
+
+
+def test_snapshot_older_than_a_local_change_is_ignored(ledger, clock):
+    ledger.load_day(1, DAY, [NINE], as_of=clock.now)
+
+    # A free-slot query starts, then this worker cancels the 09:00 booking
+    clock.now += 1
+    snapshot_at = clock.now
+    clock.now += 1
+    ledger.mark_free(1, DAY, NINE)
+
+    ledger.load_day(1, DAY, [NINE], as_of=snapshot_at)
+    assert not ledger.is_taken(1, DAY, NINE)
+    assert ledger.stats()["stale_loads"] == 1
+
+    # A snapshot taken after the change is applied
+    clock.now += 1
+    ledger.load_day(1, DAY, [TEN], as_of=clock.now)
+    assert ledger.is_taken(1, DAY, TEN)
+
+
+def test_mark_free_on_an_unknown_day_blocks_older_snapshots(ledger, clock):
+    snapshot_at = clock.now
+    clock.now += 1
+    ledger.mark_free(1, DAY, NINE)
+    ledger.load_day(1, DAY, [NINE], as_of=snapshot_at)
+    assert not ledger.is_taken(1, DAY, NINE)
+
+
+def test_only_loads_restart_the_ttl(ledger, clock):
+    ledger.load_day(1, DAY, [NINE], as_of=clock.now)
+    clock.now += 4
+    ledger.mark_booked(1, DAY, TEN)
+    clock.now += 2
+    # In-place changes do not extend the entry past the load's TTL
+    assert not ledger.knows(1, DAY)
+
+    ledger.load_day(1, DAY, [NINE], as_of=clock.now)
+    clock.now += 4
+    ledger.load_day(1, DAY, [NINE], as_of=clock.now)
+    clock.now += 4
+    assert ledger.knows(1, DAY)
+
+
+def test_disabled_ledger_never_rejects(clock):
+    ledger = BookingLedger(maxsize=100, ttl=5, enabled=False)
+    ledger.load_day(1, DAY, [NINE], as_of=clock.now)
+    ledger.mark_booked(1, DAY, NINE)
+    assert not ledger.knows(1, DAY)
+    assert not ledger.is_taken(1, DAY, NINE)
+
+
+@pytest.fixture
+def empty_ledger():
+    booking_ledger._days.clear()
+    yield booking_ledger
+    booking_ledger._days.clear()
+
+
+async def test_booking_on_a_miss_loads_the_day_from_the_primary(db, make_user, make_doctor, principal, empty_ledger):
+    doctor = await make_doctor()
+    other, me = await make_user(), await make_user()
+    # Booked through another worker, so this worker's ledger has never seen it
+    db.add(Appointment(
+        user_id=other.id, doctor_id=doctor.id, appointment_date=DAY, appointment_time=NINE,
+        status=AppointmentStatus.BOOKED.value, payment_status=PaymentStatus.PENDING.value
+    ))
+    await db.commit()
+
+    before = empty_ledger.stats()
+    with pytest.raises(HTTPException) as exc:
+        await create_appointment(db, await principal(me), doctor.id, DAY, NINE)
+    assert exc.value.status_code == 409
+    after = empty_ledger.stats()
+    assert after["loads"] == before["loads"] + 1
+    assert after["rejected"] == before["rejected"] + 1
+    assert after["stale_passes"] == before["stale_passes"]
+
+
+async def test_cancellation_elsewhere_is_bookable_after_the_ttl(
+    db, make_user, make_doctor, principal, empty_ledger, clock
+):
+    doctor = await make_doctor()
+    first, second = await make_user(), await make_user()
+    booked = await create_appointment(db, await principal(first), doctor.id, DAY, TEN)
+
+    # Another worker cancels; this worker's ledger still has the bit set
+    await db.execute(
+        update(Appointment).where(Appointment.id == booked["id"]).values(status=AppointmentStatus.CANCELLED.value)
+    )
+    await db.commit()
+    with pytest.raises(HTTPException):
+        await create_appointment(db, await principal(second), doctor.id, DAY, TEN)
+
+    clock.now += empty_ledger._days.ttl
+    rebooked = await create_appointment(db, await principal(second), doctor.id, DAY, TEN)
+    assert rebooked["id"] != booked["id"]
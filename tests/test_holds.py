@@ -0,0 +1,164 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.core.tasks import DeadlineTimer
+from app.models.slot_hold import SlotHold
+from app.services.appointment_service import create_appointment
+from app.services.hold_service import create_hold, expire_holds, hold_timer
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2030, 1, 1, 12, 0)
+DAY = date(2031, 7, 7)
+NINE = time(9, 0)
+
+
+def at(seconds: float) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+
+async def _noop(keys):
+    pass
+
+
+# ---------- DeadlineTimer ----------
+def test_due_keys_come_out_in_deadline_order():
+    timer = DeadlineTimer("test", _noop, clock=lambda: T0)
+    timer.schedule("c", at(3))
+    timer.schedule("a", at(1))
+    timer.schedule("b", at(2))
+
+    assert timer._pop_due(at(0.5)) == []
+    assert timer._pop_due(at(2)) == ["a", "b"]
+    assert timer.stats()["pending"] == 1
+    assert timer.stats()["next_deadline"] == at(3).isoformat()
+
+
+def test_cancelled_keys_never_fire():
+    timer = DeadlineTimer("test", _noop)
+    timer.schedule("a", at(1))
+    timer.schedule("b", at(1))
+    timer.cancel("a")
+    timer.cancel("missing")
+    assert timer._pop_due(at(5)) == ["b"]
+
+
+def test_rearming_replaces_the_deadline():
+    timer = DeadlineTimer("test", _noop)
+    timer.schedule("later", at(1))
+    timer.schedule("later", at(5))
+    timer.schedule("sooner", at(5))
+    timer.schedule("sooner", at(1))
+
+    assert timer._pop_due(at(2)) == ["sooner"]
+    assert timer._pop_due(at(5)) == ["later"]
+    assert timer._pop_due(at(10)) == []
+
+
+def test_stale_entries_are_compacted():
+    timer = DeadlineTimer("test", _noop)
+    for n in range(200):
+        timer.schedule("key", at(100 + n))
+    timer._pop_due(at(0))
+    assert timer.stats()["heap_size"] <= 2 * timer.stats()["pending"] + 64
+
+
+async def test_running_timer_fires_and_survives_failures():
+    fired, calls = [], 0
+
+    async def on_expire(keys):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("boom")
+        fired.extend(keys)
+
+    timer = DeadlineTimer("test", on_expire)
+    timer.start()
+    try:
+        timer.schedule("first", datetime.utcnow() + timedelta(seconds=60))
+        # An earlier deadline wakes the sleeping loop
+        timer.schedule("failing", datetime.utcnow() + timedelta(milliseconds=20))
+        await asyncio.sleep(0.1)
+        timer.schedule("second", datetime.utcnow() + timedelta(milliseconds=20))
+        await asyncio.sleep(0.1)
+    finally:
+        await timer.stop()
+
+    assert fired == ["second"]
+    assert timer.stats()["failures"] == 1
+    assert timer.stats()["fired"] == 1
+    assert timer.stats()["pending"] == 1
+
+
+# ---------- Holds ----------
+async def _hold_count(db, doctor_id: int) -> int:
+    return await db.scalar(select(func.count()).select_from(SlotHold).where(SlotHold.doctor_id == doctor_id))
+
+
+async def test_live_hold_cannot_be_held_again(db, make_user, make_doctor, principal):
+    doctor = await make_doctor()
+    me, other = await principal(await make_user()), await principal(await make_user())
+    await create_hold(db, me, doctor.id, DAY, NINE)
+
+    for user in (me, other):
+        with pytest.raises(HTTPException) as exc:
+            await create_hold(db, user, doctor.id, DAY, NINE)
+        assert exc.value.status_code == 409
+        assert exc.value.detail == "Slot already booked or held"
+
+
+async def test_expired_hold_is_taken_over(db, make_user, make_doctor, principal):
+    doctor = await make_doctor()
+    me, other = await principal(await make_user()), await principal(await make_user())
+    hold = await create_hold(db, me, doctor.id, DAY, NINE)
+    await db.execute(
+        update(SlotHold).where(SlotHold.id == hold["id"]).values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    await db.commit()
+
+    taken = await create_hold(db, other, doctor.id, DAY, NINE)
+    assert taken["id"] == hold["id"]
+    # The old deadline fires, but the row now belongs to a live hold
+    assert await expire_holds([hold["id"]]) == 0
+    assert await _hold_count(db, doctor.id) == 1
+
+
+async def test_hold_expires_on_its_deadline(db, make_user, make_doctor, principal, monkeypatch):
+    monkeypatch.setattr(settings, "SLOT_HOLD_SECONDS", 0.1)
+    doctor = await make_doctor()
+    hold_timer.start()
+    try:
+        await create_hold(db, await principal(await make_user()), doctor.id, DAY, NINE)
+        assert await _hold_count(db, doctor.id) == 1
+        await asyncio.sleep(0.3)
+    finally:
+        await hold_timer.stop()
+    assert await _hold_count(db, doctor.id) == 0
+
+
+async def test_direct_booking_removes_the_callers_hold(db, make_user, make_doctor, principal):
+    doctor = await make_doctor()
+    me = await principal(await make_user())
+    await create_hold(db, me, doctor.id, DAY, NINE)
+
+    booked = await create_appointment(db, me, doctor.id, DAY, NINE)
+    assert booked["status"] == "BOOKED"
+    assert await _hold_count(db, doctor.id) == 0
+
+
+async def test_someone_elses_hold_blocks_a_direct_booking(db, make_user, make_doctor, principal):
+    doctor = await make_doctor()
+    me, other = await principal(await make_user()), await principal(await make_user())
+    await create_hold(db, me, doctor.id, DAY, NINE)
+
+    with pytest.raises(HTTPException) as exc:
+        await create_appointment(db, other, doctor.id, DAY, NINE)
+    assert exc.value.status_code == 409
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    assert await _hold_count(db, doctor.id) == 1
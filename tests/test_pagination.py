@@ -0,0 +1,83 @@
+import base64
+from datetime import date, time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.appointment import Appointment
+from app.models.enums import AppointmentStatus, PaymentStatus
+from app.services.admin_service import list_appointments
+from app.services.appointment_service import APPOINTMENT_ORDER
+from app.utils.pagination import decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+def _raw(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    values = [date(2026, 3, 1), time(9, 30), 42]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, APPOINTMENT_ORDER) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _raw("not json"),
+    _raw("5"),
+    _raw('{"a": 1}'),
+    _raw('["2026-03-01", "09:30:00"]'),
+    _raw('["2026-03-01", "09:30:00", 1, 2]'),
+    _raw('["March 1st", "09:30:00", 1]'),
+    _raw('["2026-03-01", 930, 1]'),
+    _raw('["2026-03-01", "09:30:00", "one"]'),
+    _raw('["2026-03-01", "09:30:00", [1]]'),
+    _raw('["2026-03-01", "09:30:00", Infinity]'),
+    _raw('["2026-03-01", "09:30:00", 1000000000000000000000000]'),
+    base64.urlsafe_b64encode(b"\xff\xfe\x00").decode(),
+])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, APPOINTMENT_ORDER)
+    assert exc.value.status_code == 400
+
+
+async def test_pages_have_no_gaps_or_duplicates_on_equal_sort_keys(db, make_user, make_doctor):
+    patient = await make_user()
+    doctors = [await make_doctor() for _ in range(3)]
+    # Every doctor is booked at the same two times, so (date, time) ties across rows
+    for doctor in doctors:
+        for at in (time(9, 0), time(9, 30)):
+            db.add(Appointment(
+                user_id=patient.id,
+                doctor_id=doctor.id,
+                appointment_date=date(2031, 5, 5),
+                appointment_time=at,
+                status=AppointmentStatus.BOOKED.value,
+                payment_status=PaymentStatus.PENDING.value
+            ))
+    await db.commit()
+
+    expected = (await db.scalars(select(Appointment.id).order_by(*APPOINTMENT_ORDER))).all()
+    seen, cursor = [], None
+    while True:
+        page = await list_appointments(db, limit=4, cursor=cursor)
+        seen.extend(row.id for row in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert len(set(seen)) == len(seen)
+
+
+async def test_tampered_cursor_is_a_400_over_http(client, make_user, auth_headers):
+    headers = await auth_headers(await make_user(role="ADMIN"))
+    for cursor in ("garbage", encode_cursor(["2026-03-01", "09:30:00", 10 ** 24])):
+        response = await client.get("/api/admin/appointments", params={"cursor": cursor}, headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
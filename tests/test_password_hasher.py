@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+import app.core.password_hasher as hasher_module
+from app.core.password_hasher import PasswordHasher, _calibrate, _hash, password_hasher
+from app.models.user import User
+from app.services import auth_service
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queue=1, rounds=4)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_hash_and_verify_round_trip(hasher):
+    hashed = await hasher.hash("s3cret")
+
+    assert hashed.startswith("$2b$04$")
+    assert await hasher.verify("s3cret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+
+
+async def test_rejects_with_503_once_workers_and_queue_are_full(hasher):
+    running = [asyncio.create_task(hasher.hash(f"password-{n}")) for n in range(2)]
+    await asyncio.sleep(0)  # both are now pending in the pool
+
+    with pytest.raises(HTTPException) as excinfo:
+        await hasher.hash("one too many")
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "1"}
+    await asyncio.gather(*running)
+
+
+async def test_stats_count_calls_rejections_and_pending(hasher):
+    running = [asyncio.create_task(hasher.hash("password")) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException):
+        await hasher.verify("password", "$2b$04$" + "x" * 53)
+    hashed, _ = await asyncio.gather(*running)
+    await hasher.verify("password", hashed)
+
+    stats = hasher.stats()
+    assert stats["hash_calls"] == 2
+    assert stats["verify_calls"] == 2
+    assert stats["rejected"] == 1
+    assert stats["max_pending"] == 2
+    assert stats["pending"] == 0
+    assert stats["workers"] == 1
+    assert stats["rounds"] == 4
+    assert stats["avg_ms"] > 0
+    assert stats["max_ms"] >= stats["avg_ms"]
+
+
+def test_needs_update_flags_only_cheaper_hashes():
+    hasher = PasswordHasher(rounds=5)
+
+    assert hasher.needs_update(_hash("password", 4))
+    assert not hasher.needs_update(_hash("password", 5))
+    # Written by a node that calibrated higher; must not be downgraded
+    assert not hasher.needs_update(_hash("password", 6))
+
+
+def _fake_bcrypt(monkeypatch):
+    """Each round doubles the cost: 1 ms at cost 4, 2 ms at 5, ..."""
+    clock = SimpleNamespace(now=0.0)
+
+    def context_for(rounds):
+        def hash_(password):
+            clock.now += 2 ** (rounds - 4) / 1000
+        return SimpleNamespace(hash=hash_)
+
+    monkeypatch.setattr(hasher_module, "_context_for", context_for)
+    monkeypatch.setattr(hasher_module, "time", SimpleNamespace(perf_counter=lambda: clock.now))
+
+
+def test_calibrate_picks_the_highest_cost_within_budget(monkeypatch):
+    _fake_bcrypt(monkeypatch)
+    # 8 costs 16 ms; 9 would cost 32 ms, so the search stops without trying it
+    assert _calibrate(target_ms=20, min_rounds=4) == 8
+    assert _calibrate(target_ms=16, min_rounds=4) == 8
+
+
+def test_calibrate_never_goes_below_min_rounds(monkeypatch):
+    _fake_bcrypt(monkeypatch)
+    assert _calibrate(target_ms=0.5, min_rounds=6) == 6
+
+
+async def test_calibrate_sets_rounds(hasher):
+    assert await hasher.calibrate(target_ms=0.001, min_rounds=4) == 4
+    assert hasher.rounds == 4
+    assert (await hasher.hash("password")).startswith("$2b$04$")
+
+
+async def _stored_hash(db, user_id: int) -> str:
+    return await db.scalar(select(User.password).where(User.id == user_id))
+
+
+async def test_login_rehashes_a_cheaper_hash(db, make_user, login, monkeypatch):
+    user = await make_user()
+    assert (await _stored_hash(db, user.id)).startswith("$2b$04$")
+
+    monkeypatch.setattr(password_hasher, "rounds", 5)
+    await login(user)
+    await asyncio.gather(*auth_service._background_tasks)
+
+    stored = await _stored_hash(db, user.id)
+    assert stored.startswith("$2b$05$")
+    assert await password_hasher.verify(PASSWORD, stored)
+
+
+async def test_login_keeps_a_costlier_hash(db, make_user, login):
+    user = await make_user()
+    costlier = _hash(PASSWORD, 5)
+    await db.execute(update(User).where(User.id == user.id).values(password=costlier))
+    await db.commit()
+
+    await login(user)
+    assert not auth_service._background_tasks
+    assert await _stored_hash(db, user.id) == costlier
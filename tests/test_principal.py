@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.principal import principal_cache
+from app.models.user import User
+from app.schemas.doctor import DoctorUpdate
+from app.schemas.user import UserUpdate
+from app.services.doctor_service import change_availability, update_doctor_profile
+from app.services.user_service import set_user_active, update_user_profile
+
+pytestmark = pytest.mark.anyio
+
+
+def _profile(**fields) -> UserUpdate:
+    return UserUpdate(**{"name": None, "phone": None, "dob": None, "image_url": None, "gender": None, **fields})
+
+
+async def test_principal_is_cached(db, make_user, principal):
+    user = await make_user()
+    first = await principal(user)
+    assert principal_cache.get(user.id) is first
+    assert await principal(user) is first
+
+
+async def test_profile_write_evicts_principal(db, make_user, principal):
+    user = await make_user()
+    await principal(user)
+    await update_user_profile(db, user.id, _profile(name="Renamed"))
+    assert principal_cache.get(user.id) is None
+
+
+async def test_role_change_is_seen_after_eviction(db, make_user, principal):
+    user = await make_user()
+    assert (await principal(user)).role == "USER"
+    await db.execute(update(User).where(User.id == user.id).values(role="ADMIN"))
+    await db.commit()
+    # Until some write evicts it the cached snapshot is served
+    assert (await principal(user)).role == "USER"
+    await update_user_profile(db, user.id, _profile(name="Promoted", phone="555-0100"))
+    assert (await principal(user)).role == "ADMIN"
+
+
+async def test_active_flag_write_evicts_principal(db, make_user, principal):
+    user = await make_user()
+    assert (await principal(user)).is_active
+    await set_user_active(db, user.id, False)
+    assert principal_cache.get(user.id) is None
+    assert not (await principal(user)).is_active
+
+
+async def test_doctor_writes_evict_principal(db, make_doctor, principal):
+    doctor = await make_doctor()
+    user = await db.get(User, doctor.user_id)
+
+    await principal(user)
+    await update_doctor_profile(db, user.id, DoctorUpdate(about="Updated"))
+    assert principal_cache.get(user.id) is None
+
+    await principal(user)
+    await change_availability(db, doctor.id, False)
+    assert principal_cache.get(user.id) is None
+
+
+async def test_deactivated_user_is_rejected_on_next_request(client, make_user, auth_headers):
+    user = await make_user()
+    admin = await make_user(role="ADMIN")
+    headers = await auth_headers(user)
+    assert (await client.get("/api/user/profile", headers=headers)).status_code == 200
+
+    response = await client.patch(
+        f"/api/admin/users/{user.id}/active",
+        params={"is_active": "false"},
+        headers=await auth_headers(admin)
+    )
+    assert response.status_code == 200
+    assert response.json()["is_active"] is False
+
+    # The access token is still valid, but the principal is re-read
+    response = await client.get("/api/user/profile", headers=headers)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Account is disabled"
+
+
+async def test_deactivated_user_cannot_log_in(client, make_user):
+    user = await make_user(is_active=False)
+    response = await client.post("/api/auth/login", data={"email": user.email, "password": "secret-password"})
+    assert response.status_code == 403
@@ -0,0 +1,147 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import (
+    InMemoryRateLimitBackend, LoginThrottle, RateLimitBackend, login_throttle, set_rate_limit_backend
+)
+from app.services.auth_service import login_user
+
+pytestmark = pytest.mark.anyio
+
+WINDOW = 60
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ExplodingSession:
+    """Fails the test if login touches the database."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"session.{name} used before the throttle rejected the login")
+
+
+@pytest.fixture(autouse=True)
+def _limits(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_EMAIL", 3)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 5)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_WINDOW_SECONDS", WINDOW)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def throttle(clock):
+    return LoginThrottle(InMemoryRateLimitBackend(clock=clock))
+
+
+async def _rejected(throttle, email: str, ip: str | None = "10.0.0.1") -> HTTPException | None:
+    try:
+        await throttle.check(email, ip)
+    except HTTPException as exc:
+        assert exc.status_code == 429
+        return exc
+    return None
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+async def test_email_window_slides(throttle, clock):
+    for offset in (0, 40, 50):
+        clock.now = 1000 + offset
+        assert not await _rejected(throttle, "a@example.com")
+
+    clock.now = 1000 + 55
+    assert await _rejected(throttle, "a@example.com")
+    # Only the attempt made at t=0 has left the window
+    clock.now = 1000 + WINDOW + 1
+    assert not await _rejected(throttle, "a@example.com")
+    assert await _rejected(throttle, "a@example.com")
+
+
+async def test_email_key_is_normalized(throttle):
+    for email in ("a@example.com", " A@Example.com", "a@EXAMPLE.COM "):
+        assert not await _rejected(throttle, email, ip=None)
+    assert await _rejected(throttle, "a@example.com", ip=None)
+    assert not await _rejected(throttle, "b@example.com", ip=None)
+
+
+async def test_ip_limit_spans_emails(throttle):
+    for n in range(5):
+        assert not await _rejected(throttle, f"user{n}@example.com")
+    assert await _rejected(throttle, "fresh@example.com")
+    assert not await _rejected(throttle, "fresh@example.com", ip="10.0.0.2")
+
+
+async def test_retry_after_counts_down_to_the_oldest_attempt(throttle, clock):
+    for offset in (0, 10, 20):
+        clock.now = 1000 + offset
+        await throttle.check("a@example.com", None)
+
+    clock.now = 1000 + 30
+    assert (await _rejected(throttle, "a@example.com", None)).headers["Retry-After"] == "30"
+    clock.now = 1000 + 59.5
+    # Rounded up, and never below one second
+    assert (await _rejected(throttle, "a@example.com", None)).headers["Retry-After"] == "1"
+    clock.now = 1000 + 30.2
+    assert (await _rejected(throttle, "a@example.com", None)).headers["Retry-After"] == "30"
+
+
+async def test_counters(throttle):
+    for _ in range(3):
+        await throttle.check("a@example.com", "10.0.0.1")
+    # The IP attempt is recorded even though the email limit turned it away
+    assert await _rejected(throttle, "a@example.com")
+    await throttle.check("b@example.com", "10.0.0.1")
+    assert await _rejected(throttle, "c@example.com")
+
+    assert throttle.stats() == {
+        "backend": "InMemoryRateLimitBackend",
+        "allowed": 4,
+        "rejected_email": 1,
+        "rejected_ip": 1,
+    }
+
+
+async def test_disabled_throttle_allows_everything(throttle, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_ENABLED", False)
+    for _ in range(10):
+        await throttle.check("a@example.com", "10.0.0.1")
+    assert throttle.stats()["allowed"] == 0
+
+
+async def test_keys_are_bounded(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2, clock=clock)
+    for key in ("a", "b", "c"):
+        await backend.hit(key, 1, WINDOW)
+    assert list(backend._windows) == ["b", "c"]
+
+
+async def test_login_is_rejected_before_db_or_bcrypt(clock):
+    previous = login_throttle.backend
+    set_rate_limit_backend(InMemoryRateLimitBackend(clock=clock))
+    try:
+        for _ in range(3):
+            await login_throttle.check("victim@example.com", "10.0.0.9")
+        verify_calls = password_hasher.stats()["verify_calls"]
+
+        with pytest.raises(HTTPException) as exc:
+            await login_user(ExplodingSession(), "victim@example.com", "guess", client_ip="10.0.0.9")
+        assert exc.value.status_code == 429
+        assert password_hasher.stats()["verify_calls"] == verify_calls
+    finally:
+        set_rate_limit_backend(previous)
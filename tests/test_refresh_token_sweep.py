@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.revocation import RevocationFilter, revocation_filter
+from app.core.security import token_digest
+from app.models.token import RefreshToken
+from app.services.auth_service import sweep_refresh_tokens
+
+pytestmark = pytest.mark.anyio
+
+
+def _row(user_id: int, expires_in: timedelta, is_revoked: bool = False) -> RefreshToken:
+    return RefreshToken(
+        user_id=user_id,
+        token=uuid.uuid4().hex,
+        family_id=str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + expires_in,
+        is_revoked=is_revoked
+    )
+
+
+async def test_sweep_removes_dead_rows_in_batches(db, make_user):
+    await sweep_refresh_tokens(batch_size=100, pause=0)
+    user = await make_user()
+    live = [_row(user.id, timedelta(days=1)) for _ in range(2)]
+    dead = (
+        [_row(user.id, timedelta(days=1), is_revoked=True) for _ in range(3)]
+        + [_row(user.id, -timedelta(minutes=1)) for _ in range(2)]
+    )
+    db.add_all(live + dead)
+    await db.commit()
+
+    assert await sweep_refresh_tokens(batch_size=2, pause=0) == 5
+    remaining = await db.scalars(select(RefreshToken.token).where(RefreshToken.user_id == user.id))
+    assert sorted(remaining.all()) == sorted(row.token for row in live)
+    assert await sweep_refresh_tokens(batch_size=2, pause=0) == 0
+
+
+@pytest.mark.parametrize("rebuilt", [False, True])
+async def test_replay_after_sweep_still_revokes_the_family(client, db, make_user, login, rebuilt):
+    tokens = await login(await make_user())
+    response = await client.post("/api/auth/refresh", data={"refresh_token": tokens["refresh_token"]})
+    rotated = response.json()["refresh_token"]
+
+    # The rotated-away row is gone, so only the token's `fam` claim names the family
+    await sweep_refresh_tokens(batch_size=100, pause=0)
+    if rebuilt:
+        await revocation_filter.rebuild()
+    count = select(func.count()).select_from(RefreshToken)
+    assert await db.scalar(count.where(RefreshToken.token == token_digest(tokens["refresh_token"]))) == 0
+
+    response = await client.post("/api/auth/refresh", data={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    response = await client.post("/api/auth/refresh", data={"refresh_token": rotated})
+    assert response.status_code == 401
+
+
+async def test_rebuilt_filter_contains_surviving_revoked_digests(db, make_user):
+    user = await make_user()
+    revoked = [_row(user.id, timedelta(days=1), is_revoked=True) for _ in range(20)]
+    db.add_all(revoked)
+    await db.commit()
+
+    fresh = RevocationFilter(settings.REVOCATION_FILTER_CAPACITY, settings.REVOCATION_FILTER_ERROR_RATE)
+    assert not any(fresh.might_be_revoked(row.token) for row in revoked)
+    await fresh.rebuild()
+    assert all(fresh.might_be_revoked(row.token) for row in revoked)
+    assert fresh.stats()["entries"] >= len(revoked)
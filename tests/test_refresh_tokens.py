@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.token import RefreshToken
+from app.core.security import token_digest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _refresh(client, refresh_token: str):
+    return await client.post("/api/auth/refresh", data={"refresh_token": refresh_token})
+
+
+async def _family_rows(db, family_id: str):
+    result = await db.execute(select(RefreshToken).where(RefreshToken.family_id == family_id))
+    return result.scalars().all()
+
+
+async def test_rotation_rejects_the_old_token(client, make_user, login):
+    tokens = await login(await make_user())
+
+    response = await _refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    response = await _refresh(client, tokens["refresh_token"])
+    assert response.status_code == 401
+
+
+async def test_replaying_a_rotated_token_revokes_the_family(client, db, make_user, login):
+    tokens = await login(await make_user())
+    rotated = (await _refresh(client, tokens["refresh_token"])).json()
+    family_id = await db.scalar(
+        select(RefreshToken.family_id).where(RefreshToken.token == token_digest(rotated["refresh_token"]))
+    )
+
+    # The stolen old token is replayed; the legitimate holder's newer token dies with it
+    assert (await _refresh(client, tokens["refresh_token"])).status_code == 401
+    assert (await _refresh(client, rotated["refresh_token"])).status_code == 401
+
+    rows = await _family_rows(db, family_id)
+    assert len(rows) == 2
+    assert all(row.is_revoked for row in rows)
+
+
+async def test_logout_revokes_the_family(client, db, make_user, login):
+    user = await make_user()
+    tokens = await login(user)
+    rotated = (await _refresh(client, tokens["refresh_token"])).json()
+    other_session = await login(user)
+
+    response = await client.post("/api/auth/logout", data={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 200
+    assert (await _refresh(client, rotated["refresh_token"])).status_code == 401
+
+    family_id = await db.scalar(
+        select(RefreshToken.family_id).where(RefreshToken.token == token_digest(rotated["refresh_token"]))
+    )
+    assert all(row.is_revoked for row in await _family_rows(db, family_id))
+
+    # Other logins keep their own family
+    assert (await _refresh(client, other_session["refresh_token"])).status_code == 200
+
+
+async def test_access_token_is_not_a_refresh_token(client, make_user, login):
+    tokens = await login(await make_user())
+    assert (await _refresh(client, tokens["access_token"])).status_code == 401
@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.db.session import async_session
+from app.models.user import User
+from app.services.auth_service import register_user
+from app.services.doctor_service import create_doctor_by_admin
+
+pytestmark = pytest.mark.anyio
+
+
+async def _race(register, email: str, attempts: int = 5) -> list:
+    async def attempt():
+        async with async_session() as session:
+            try:
+                await register(session, email)
+                return 200
+            except HTTPException as exc:
+                return exc.status_code
+
+    return await asyncio.gather(*(attempt() for _ in range(attempts)))
+
+
+async def _users_with_email(db, email: str) -> int:
+    return await db.scalar(select(func.count()).select_from(User).where(User.email == email))
+
+
+async def test_register_rejects_an_existing_email(db):
+    email = f"taken-{uuid.uuid4().hex}@example.com"
+    await register_user(db, "First", email, "password")
+
+    with pytest.raises(HTTPException) as excinfo:
+        await register_user(db, "Second", email, "password")
+    assert excinfo.value.status_code == 400
+
+
+async def test_concurrent_registrations_of_one_email_give_one_user_and_400s(db):
+    email = f"race-{uuid.uuid4().hex}@example.com"
+
+    statuses = await _race(lambda session, email: register_user(session, "Racer", email, "password"), email)
+
+    assert sorted(statuses) == [200, 400, 400, 400, 400]
+    assert await _users_with_email(db, email) == 1
+
+
+async def test_concurrent_doctor_creation_for_one_email_gives_one_doctor_and_400s(db):
+    email = f"doctor-race-{uuid.uuid4().hex}@example.com"
+
+    statuses = await _race(
+        lambda session, email: create_doctor_by_admin(session, "Dr Race", email, "password", speciality="General"),
+        email
+    )
+
+    assert sorted(statuses) == [200, 400, 400, 400, 400]
+    assert await _users_with_email(db, email) == 1
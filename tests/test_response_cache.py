@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app.core.response_cache import ResponseCache
+from app.db.session import get_db
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(maxsize=100, ttl=60)
+
+
+class Compute:
+    """A computation that blocks until released and counts its runs."""
+
+    def __init__(self, value="result"):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_misses_share_one_compute(cache):
+    compute = Compute()
+    callers = [asyncio.create_task(cache.get_or_compute("key", ("tag",), compute)) for _ in range(10)]
+    await _settle()
+    compute.release.set()
+
+    assert await asyncio.gather(*callers) == ["result"] * 10
+    assert compute.calls == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 9
+    assert stats["inflight"] == 0
+
+    assert await cache.get_or_compute("key", ("tag",), compute) == "result"
+    assert cache.stats()["hits"] == 1
+    assert compute.calls == 1
+
+
+async def test_invalidate_drops_only_tagged_entries(cache):
+    compute = Compute()
+    compute.release.set()
+    await cache.get_or_compute("a", ("doctor:1",), compute)
+    await cache.get_or_compute("b", ("doctor:2",), compute)
+    await cache.get_or_compute("c", ("doctor:1", "admin"), compute)
+
+    cache.invalidate("doctor:1")
+    await cache.get_or_compute("a", ("doctor:1",), compute)
+    await cache.get_or_compute("b", ("doctor:2",), compute)
+    await cache.get_or_compute("c", ("doctor:1", "admin"), compute)
+    assert compute.calls == 5
+    assert cache.stats()["hits"] == 1
+
+
+async def test_compute_overlapping_an_invalidation_is_not_stored(cache):
+    compute = Compute("before commit")
+    caller = asyncio.create_task(cache.get_or_compute("key", ("tag",), compute))
+    await _settle()
+
+    cache.invalidate("tag")
+    compute.release.set()
+    # Callers still get the value, but the next lookup recomputes
+    assert await caller == "before commit"
+    assert cache.stats()["stale_skips"] == 1
+    compute.value = "after commit"
+    assert await cache.get_or_compute("key", ("tag",), compute) == "after commit"
+    assert compute.calls == 2
+
+
+async def test_failures_reach_every_waiter_and_are_not_cached(cache):
+    compute = Compute(RuntimeError("database down"))
+    callers = [asyncio.create_task(cache.get_or_compute("key", ("tag",), compute)) for _ in range(3)]
+    await _settle()
+    compute.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert compute.calls == 1
+
+    compute.value = "recovered"
+    assert await cache.get_or_compute("key", ("tag",), compute) == "recovered"
+
+
+async def test_waiter_takes_over_when_the_computing_caller_is_cancelled(cache):
+    first = Compute("never")
+    computing = asyncio.create_task(cache.get_or_compute("key", ("tag",), first))
+    await _settle()
+    second = Compute("second")
+    second.release.set()
+    waiting = asyncio.create_task(cache.get_or_compute("key", ("tag",), second))
+    await _settle()
+
+    computing.cancel()
+    assert await waiting == "second"
+    assert second.calls == 1
+
+
+async def test_disabled_cache_always_computes():
+    cache = ResponseCache(maxsize=100, ttl=60, enabled=False)
+    compute = Compute()
+    compute.release.set()
+    for _ in range(3):
+        await cache.get_or_compute("key", ("tag",), compute)
+    assert compute.calls == 3
+
+
+@pytest.mark.parametrize("path", ["/api/admin/dashboard", "/api/admin/analytics/{metric}", "/api/doctor/dashboard"])
+def test_cached_routes_compute_on_the_primary(path):
+    route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path)
+    db = next(dep for dep in route.dependant.dependencies if dep.name == "db")
+    assert db.call is get_db
@@ -0,0 +1,101 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from app.utils.slots import compute_free_slots, from_minutes, span_mask, to_minutes
+
+MONDAY = date(2030, 1, 7)
+
+
+def m(hour: int, minute: int = 0) -> int:
+    return hour * 60 + minute
+
+
+def t(hour: int, minute: int = 0) -> time:
+    return time(hour, minute)
+
+
+def slots_on(day: date, template, booked=None, blocked=None) -> list[time]:
+    return compute_free_slots(template, day, day, booked, blocked)[day]
+
+
+MORNING = {MONDAY.weekday(): [(m(9), m(11), 30)]}
+
+
+def test_span_mask_widens_to_whole_cells():
+    assert span_mask(0, 5) == 0b1
+    assert span_mask(5, 15) == 0b110
+    assert span_mask(7, 8) == 0b10
+    assert span_mask(3, 11) == 0b111
+    assert span_mask(10, 10) == 0
+
+
+def test_minutes_round_trip_drops_seconds():
+    assert to_minutes(time(9, 7, 59)) == m(9, 7)
+    assert from_minutes(m(13, 45)) == t(13, 45)
+
+
+def test_free_day_yields_every_slot():
+    assert slots_on(MONDAY, MORNING) == [t(9), t(9, 30), t(10), t(10, 30)]
+
+
+def test_every_date_in_range_is_present():
+    free = compute_free_slots(MORNING, MONDAY, MONDAY + timedelta(days=6))
+    assert list(free) == [MONDAY + timedelta(days=n) for n in range(7)]
+    assert all(free[day] == [] for day in free if day != MONDAY)
+
+
+def test_booked_slot_is_removed():
+    assert slots_on(MONDAY, MORNING, booked={MONDAY: [m(9, 30)]}) == [t(9), t(10), t(10, 30)]
+
+
+def test_day_off_blocks_everything():
+    assert slots_on(MONDAY, MORNING, blocked={MONDAY: [(None, None)]}) == []
+
+
+def test_partial_exception_blocks_overlapping_slots_only():
+    blocked = {MONDAY: [(m(9, 10), m(9, 20)), (m(10, 30), m(12))]}
+    assert slots_on(MONDAY, MORNING, blocked=blocked) == [t(9, 30), t(10)]
+
+
+def test_exception_on_another_day_is_ignored():
+    other = MONDAY + timedelta(days=7)
+    assert slots_on(MONDAY, MORNING, blocked={other: [(None, None)]}) == [t(9), t(9, 30), t(10), t(10, 30)]
+
+
+def test_booking_off_the_slot_grid_blocks_both_slots_it_crosses():
+    # 09:15-09:45 overlaps the 09:00 and 09:30 slots
+    assert slots_on(MONDAY, MORNING, booked={MONDAY: [m(9, 15)]}) == [t(10), t(10, 30)]
+
+
+def test_mixed_slot_lengths():
+    template = {MONDAY.weekday(): [(m(9), m(10), 30), (m(10), m(11), 20)]}
+    assert slots_on(MONDAY, template) == [t(9), t(9, 30), t(10), t(10, 20), t(10, 40)]
+
+    # A booking takes the length of the window it starts in
+    assert slots_on(MONDAY, template, booked={MONDAY: [m(10, 20)]}) == [t(9), t(9, 30), t(10), t(10, 40)]
+    # 09:45 + 30 minutes runs into the first 20-minute slot
+    assert slots_on(MONDAY, template, booked={MONDAY: [m(9, 45)]}) == [t(9), t(10, 20), t(10, 40)]
+
+
+def test_booking_outside_any_window_uses_the_default_length():
+    template = {MONDAY.weekday(): [(m(9), m(10), 15)]}
+    # An off-template 08:40 booking is taken to last 30 minutes, into 09:10
+    assert slots_on(MONDAY, template, booked={MONDAY: [m(8, 40)]}) == [t(9, 15), t(9, 30), t(9, 45)]
+
+
+def test_non_whole_five_minute_times():
+    template = {MONDAY.weekday(): [(m(9, 3), m(10, 3), 30)]}
+    assert slots_on(MONDAY, template) == [t(9, 3), t(9, 33)]
+
+    # 09:29:59 truncates to 09:29, whose span still overlaps the 09:00 and 09:30 slots
+    booked = {MONDAY: [to_minutes(time(9, 29, 59))]}
+    assert slots_on(MONDAY, MORNING, booked=booked) == [t(10), t(10, 30)]
+
+    # A minute-granular exception still clears every cell it touches
+    assert slots_on(MONDAY, MORNING, blocked={MONDAY: [(m(9, 58), m(9, 59))]}) == [t(9), t(10), t(10, 30)]
+
+
+@pytest.mark.parametrize("booked", [[m(9)], [m(9), m(9)]])
+def test_duplicate_bookings_are_harmless(booked):
+    assert slots_on(MONDAY, MORNING, booked={MONDAY: booked}) == [t(9, 30), t(10), t(10, 30)]
@@ -0,0 +1,71 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import (
+    _create_token, create_access_token, decode_token, forget_token, token_cache, token_digest
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def _expires_in(token: str) -> float:
+    _, expires_at = token_cache._data[token_digest(token)]
+    return expires_at - time.monotonic()
+
+
+def test_decoded_claims_are_memoized():
+    token = create_access_token(1, "USER")
+    claims = decode_token(token)
+    hits = token_cache.hits
+    assert decode_token(token) == claims
+    assert token_cache.hits == hits + 1
+
+
+def test_callers_cannot_mutate_cached_claims():
+    token = create_access_token(1, "USER")
+    decode_token(token)["role"] = "ADMIN"
+    assert decode_token(token)["role"] == "USER"
+
+
+def test_cache_entry_never_outlives_exp():
+    token = _create_token({"sub": "1", "type": "access"}, timedelta(seconds=30))
+    exp = decode_token(token)["exp"]
+    assert 0 < _expires_in(token) <= exp - time.time() + 0.01
+
+
+def test_expired_token_is_rejected_after_being_cached():
+    token = _create_token({"sub": "1", "type": "access"}, timedelta(seconds=2))
+    exp = decode_token(token)["exp"]
+    assert token_digest(token) in token_cache._data
+
+    # jose compares `exp` against whole seconds, so wait out the second after it
+    time.sleep(exp + 1.05 - time.time())
+    assert token_cache.get(token_digest(token)) is None
+    with pytest.raises(HTTPException) as exc:
+        decode_token(token)
+    assert exc.value.status_code == 401
+    assert token_digest(token) not in token_cache._data
+
+
+def test_forget_token_evicts_the_entry():
+    token = create_access_token(1, "USER")
+    decode_token(token)
+    forget_token(token)
+    assert token_digest(token) not in token_cache._data
+    misses = token_cache.misses
+    decode_token(token)
+    assert token_cache.misses == misses + 1
+
+
+def test_invalid_token_is_not_cached():
+    with pytest.raises(HTTPException):
+        decode_token("not-a-token")
+    assert len(token_cache) == 0